@@ -0,0 +1,33 @@
+import timeit
+
+s = """
+import pymunk
+# print("pymunk.version", pymunk.version)
+body = pymunk.Body(body_type=pymunk.Body.STATIC)
+shapes = [
+    pymunk.Segment(body, (x * 10, 0), (x * 10 + 10, 5), 1) for x in range(20000)
+]
+bodies = [pymunk.Body(1, 10) for x in range(5000)]
+for i, b in enumerate(bodies):
+    b.position = i % 100 * 5, i // 100 * 5 + 10
+circles = [pymunk.Circle(b, 1) for b in bodies]
+"""
+
+# Add (and remove) a level of 20000 static segments and 5000 dynamic circles
+print(
+    min(
+        timeit.repeat(
+            """
+space = pymunk.Space()
+space.add_many(body, *shapes)
+space.add_many(*bodies, *circles)
+space.remove(*shapes)
+space.remove(*circles, *bodies)
+space.remove(body)
+""",
+            setup=s,
+            repeat=5,
+            number=1,
+        )
+    )
+)
@@ -14,3 +14,40 @@ s.on_collision(pre_solve=f)
 """
 
 print(min(timeit.repeat("s.step(0.01)", setup=s, repeat=10)))
+
+s = """
+import pymunk
+
+
+def make_space(reuse_arbiters):
+    space = pymunk.Space()
+    space.reuse_arbiters = reuse_arbiters
+    space.gravity = 0, -100
+    for i in range(2000):
+        body = pymunk.Body(1, 10)
+        body.position = i % 50 * 9, 5 + i // 50 * 9
+        space.add(body, pymunk.Circle(body, 5))
+    space.add(pymunk.Segment(space.static_body, (-10, 0), (460, 0), 1))
+
+    def pre_solve(arb, space, data):
+        a, b = arb.shapes
+        for p in arb.contact_point_set.points:
+            p.distance
+
+    space.on_collision(pre_solve=pre_solve)
+    space.step(0.01)
+    return space
+
+
+new_space = make_space(False)
+reuse_space = make_space(True)
+"""
+
+# Step 2000 overlapping circles with a pre_solve callback reading the shapes
+# and contact points, with a new and with a reused Arbiter for each call
+tests = [
+    ("new arbiters", "new_space.step(0.0001)"),
+    ("reuse_arbiters", "reuse_space.step(0.0001)"),
+]
+for name, stmt in tests:
+    print(name, min(timeit.repeat(stmt, setup=s, number=10, repeat=5)))
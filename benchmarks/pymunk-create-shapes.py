@@ -0,0 +1,48 @@
+import timeit
+
+s = """
+import array
+import pymunk
+import pymunk.batch
+# print("pymunk.version", pymunk.version)
+n = 50000
+endpoints = array.array("d", [v for x in range(n) for v in (x, 0, x + 1, 1)])
+vertices = array.array(
+    "d", [v for x in range(n) for v in (x, 0, x + 1, 0, x + 1, 1)]
+)
+offsets = list(range(0, 3 * n, 3))
+"""
+
+# Create 50000 segments and 50000 triangles, one by one and in bulk
+tests = [
+    (
+        "segments",
+        """
+b = pymunk.Body(body_type=pymunk.Body.STATIC)
+shapes = [pymunk.Segment(b, (x, 0), (x + 1, 1), 1) for x in range(n)]
+""",
+    ),
+    (
+        "create_segments",
+        """
+b = pymunk.Body(body_type=pymunk.Body.STATIC)
+shapes = pymunk.batch.create_segments(b, endpoints, 1)
+""",
+    ),
+    (
+        "polys",
+        """
+b = pymunk.Body(body_type=pymunk.Body.STATIC)
+shapes = [pymunk.Poly(b, [(x, 0), (x + 1, 0), (x + 1, 1)]) for x in range(n)]
+""",
+    ),
+    (
+        "create_polys",
+        """
+b = pymunk.Body(body_type=pymunk.Body.STATIC)
+shapes = pymunk.batch.create_polys(b, vertices, offsets)
+""",
+    ),
+]
+for name, stmt in tests:
+    print(name, min(timeit.repeat(stmt, setup=s, repeat=5, number=1)))
@@ -0,0 +1,47 @@
+import gc
+import tracemalloc
+
+import pymunk
+import pymunk.batch
+
+# print("pymunk.version", pymunk.version)
+
+# Python memory used per object, measured with tracemalloc. Memory allocated
+# by Chipmunk itself is not included.
+n = 100000
+
+
+def measure(name, create):
+    gc.collect()
+    tracemalloc.start()
+    objects = create()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(name, round(size / n), "bytes")
+    return objects
+
+
+measure("body", lambda: [pymunk.Body(1, 1) for _ in range(n)])
+
+body = pymunk.Body(1, 1)
+measure("circle", lambda: [pymunk.Circle(body, 1) for _ in range(n)])
+body = pymunk.Body(1, 1)
+measure(
+    "create_circles",
+    lambda: pymunk.batch.create_circles(
+        body, memoryview(bytes(16 * n)).cast("d"), memoryview(bytes(8 * n)).cast("d")
+    ),
+)
+
+
+def body_and_circle_in_space():
+    space = pymunk.Space()
+    for i in range(n):
+        b = pymunk.Body(1, 1)
+        b.position = i % 1000 * 3, i // 1000 * 3
+        space.add(b, pymunk.Circle(b, 1))
+    return space
+
+
+measure("body and circle in space", body_and_circle_in_space)
@@ -0,0 +1,32 @@
+import timeit
+
+s = """
+import array
+import pymunk
+import pymunk.batch
+# print("pymunk.version", pymunk.version)
+n = 100000
+endpoints = array.array("d", [v for x in range(n) for v in (x, 0, x + 1, 0)])
+"""
+
+# Create 100000 static segments and add them to a space, as separate shapes
+# and as a StaticGeometry
+tests = [
+    (
+        "create_segments",
+        """
+space = pymunk.Space()
+shapes = pymunk.batch.create_segments(space.static_body, endpoints, 1)
+space.add(*shapes)
+""",
+    ),
+    (
+        "static_geometry",
+        """
+space = pymunk.Space()
+space.add(pymunk.StaticGeometry.from_segments(endpoints, 1))
+""",
+    ),
+]
+for name, stmt in tests:
+    print(name, min(timeit.repeat(stmt, setup=s, repeat=5, number=1)))
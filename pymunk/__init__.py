@@ -68,7 +68,10 @@ __all__ = [
     "PointQueryInfo",
     "ShapeQueryInfo",
     "SpaceDebugDrawOptions",
+    "SpacePool",
+    "StaticGeometry",
     "Vec2d",
+    "VelocityIntegrator",
 ]
 
 from typing import Any, Sequence, cast
@@ -90,8 +93,11 @@ from .shape_filter import ShapeFilter
 from .shapes import Circle, Poly, Segment, Shape
 from .space import Space
 from .space_debug_draw_options import SpaceDebugDrawOptions
+from .space_pool import SpacePool
+from .static_geometry import StaticGeometry
 from .transform import Transform
 from .vec2d import Vec2d
+from .velocity_integrator import VelocityIntegrator
 
 # import logging
 # logging.getLogger(__name__).addHandler(logging.NullHandler())
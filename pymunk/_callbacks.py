@@ -203,7 +203,7 @@ def ext_cpCollisionBeginFunc(
     _arb: ffi.CData, _space: ffi.CData, data: ffi.CData
 ) -> None:
     handler = ffi.from_handle(data)
-    handler._begin(Arbiter(_arb, handler._space), handler._space, handler.data["begin"])
+    handler._begin(handler._arbiter(_arb, 0), handler._space, handler.data["begin"])
 
 
 @ffi.def_extern()
@@ -212,7 +212,7 @@ def ext_cpCollisionPreSolveFunc(
 ) -> None:
     handler = ffi.from_handle(data)
     handler._pre_solve(
-        Arbiter(_arb, handler._space), handler._space, handler.data["pre_solve"]
+        handler._arbiter(_arb, 1), handler._space, handler.data["pre_solve"]
     )
 
 
@@ -222,7 +222,7 @@ def ext_cpCollisionPostSolveFunc(
 ) -> None:
     handler = ffi.from_handle(data)
     handler._post_solve(
-        Arbiter(_arb, handler._space), handler._space, handler.data["post_solve"]
+        handler._arbiter(_arb, 2), handler._space, handler.data["post_solve"]
     )
 
 
@@ -238,7 +238,7 @@ def ext_cpCollisionSeparateFunc(
         # this try is needed since a separate callback will be called
         # if a colliding object is removed, regardless if its in a
         # step or not. Meaning the unlock must succeed
-        handler._separate(Arbiter(_arb, space), space, handler.data["separate"])
+        handler._separate(handler._arbiter(_arb, 3), space, handler.data["separate"])
     finally:
         space._locked = orig_locked
 
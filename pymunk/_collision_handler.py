@@ -48,6 +48,28 @@ class CollisionHandler(object):
 
         self._data: dict[Any, Any] = {}
 
+        # One pooled Arbiter per callback, used when Space.reuse_arbiters is
+        # set. A separate callback can run while another callback of the same
+        # handler is still using its Arbiter, so they can not be shared.
+        self._arbiters = tuple(Arbiter(ffi.NULL, space) for _ in range(4))
+
+    def _set_func(self, name: str, func: Any) -> None:
+        data = self._space._global_handler_data
+        if data is not None and self._handler == (
+            lib.cpSpaceAddGlobalCollisionHandler(self._space._space)
+        ):
+            # The functions of the global handler are wrapped by
+            # pymunk.batch.set_space_arbiters or set_collision_events, which
+            # will call this func when done.
+            setattr(data, name, func)
+        else:
+            setattr(self._handler, name, func)
+
+    def _arbiter(self, _arb: ffi.CData, index: int) -> Arbiter:
+        if self._space._reuse_arbiters:
+            return self._arbiters[index]._reset(_arb)
+        return Arbiter(_arb, self._space)
+
     @property
     def data(self) -> dict[Any, Any]:
         """Data property that get passed on into the
@@ -78,9 +100,9 @@ class CollisionHandler(object):
         self._begin = func
 
         if self._begin == None:
-            self._handler.beginFunc = ffi.addressof(lib, "DoNothing")
+            self._set_func("beginFunc", ffi.addressof(lib, "DoNothing"))
         else:
-            self._handler.beginFunc = lib.ext_cpCollisionBeginFunc
+            self._set_func("beginFunc", lib.pmPythonCollisionHandler.beginFunc)
 
     @property
     def pre_solve(self) -> Optional[_CollisionCallback]:
@@ -100,9 +122,9 @@ class CollisionHandler(object):
         self._pre_solve = func
 
         if self._pre_solve == None:
-            self._handler.preSolveFunc = ffi.addressof(lib, "DoNothing")
+            self._set_func("preSolveFunc", ffi.addressof(lib, "DoNothing"))
         else:
-            self._handler.preSolveFunc = lib.ext_cpCollisionPreSolveFunc
+            self._set_func("preSolveFunc", lib.pmPythonCollisionHandler.preSolveFunc)
 
     @property
     def post_solve(self) -> Optional[_CollisionCallback]:
@@ -122,9 +144,9 @@ class CollisionHandler(object):
         self._post_solve = func
 
         if self._post_solve == None:
-            self._handler.postSolveFunc = ffi.addressof(lib, "DoNothing")
+            self._set_func("postSolveFunc", ffi.addressof(lib, "DoNothing"))
         else:
-            self._handler.postSolveFunc = lib.ext_cpCollisionPostSolveFunc
+            self._set_func("postSolveFunc", lib.pmPythonCollisionHandler.postSolveFunc)
 
     @property
     def separate(self) -> Optional[_CollisionCallback]:
@@ -144,6 +166,6 @@ class CollisionHandler(object):
         self._separate = func
 
         if self._separate == None:
-            self._handler.separateFunc = ffi.addressof(lib, "DoNothing")
+            self._set_func("separateFunc", ffi.addressof(lib, "DoNothing"))
         else:
-            self._handler.separateFunc = lib.ext_cpCollisionSeparateFunc
+            self._set_func("separateFunc", lib.pmPythonCollisionHandler.separateFunc)
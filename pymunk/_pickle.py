@@ -10,6 +10,8 @@ class PickleMixin:
     and copy.
     """
 
+    __slots__ = ()
+
     _pickle_attrs_init: ClassVar[list[str]] = []
     _pickle_attrs_general: ClassVar[list[str]] = []
     _pickle_attrs_skip: ClassVar[list[str]] = []
@@ -33,7 +35,9 @@ class PickleMixin:
         for a in type(self)._pickle_attrs_general:
             d["general"].append((a, self.__getattribute__(a)))
 
-        for k, v in self.__dict__.items():
+        # Objects with __slots__ only have a __dict__ if a custom attribute
+        # has been set.
+        for k, v in getattr(self, "__dict__", {}).items():
             if k[0] != "_":
                 d["custom"].append((k, v))
 
@@ -4,6 +4,8 @@ from typing import Any
 class TypingAttrMixing:
     """Type helper mixin to make mypy accept dynamic attributes."""
 
+    __slots__ = ()
+
     def __setattr__(self, name: str, value: Any) -> None:
         """Override default setattr to make sure type checking works."""
         super().__setattr__(name, value)
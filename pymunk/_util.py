@@ -1,4 +1,15 @@
 import weakref
 from typing import Any
 
+from ._chipmunk_cffi import ffi
+
 _dead_ref: weakref.ref[Any] = weakref.ref(set())
+
+
+def _check_offsets(offsets: ffi.CData, vertex_count: int) -> None:
+    count = len(offsets)
+    for i in range(count):
+        end = offsets[i + 1] if i + 1 < count else vertex_count
+        assert (
+            0 <= offsets[i] < end
+        ), "The offsets must be increasing and inside the vertices"
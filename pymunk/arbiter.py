@@ -1,7 +1,7 @@
 __docformat__ = "reStructuredText"
 
 
-from typing import TYPE_CHECKING, Any, Sequence
+from typing import TYPE_CHECKING, Any, Optional, Sequence
 
 if TYPE_CHECKING:
     from .space import Space
@@ -25,7 +25,9 @@ class Arbiter(object):
         hold onto a reference to an arbiter as you don't know when it will be
         destroyed! Use them within the callback where they are given to you
         and then forget about them or copy out the information you need from
-        them.
+        them. This is especially important when
+        :py:attr:`Space.reuse_arbiters` is enabled, since the same Arbiter
+        object is then reused for the following collisions.
     """
 
     def __init__(self, _arbiter: ffi.CData, space: "Space") -> None:
@@ -38,6 +40,17 @@ class Arbiter(object):
 
         self._arbiter = _arbiter
         self._space = space
+        self._shapes: Optional[tuple["Shape", "Shape"]] = None
+        self._contact_point_set: Optional[ContactPointSet] = None
+        # Buffer for pmArbiterGetContactData, kept when the Arbiter is reused
+        self._contact_data: Optional[ffi.CData] = None
+
+    def _reset(self, _arbiter: ffi.CData) -> "Arbiter":
+        # Used to reuse a pooled Arbiter for another collision
+        self._arbiter = _arbiter
+        self._shapes = None
+        self._contact_point_set = None
+        return self
 
     @property
     def process_collision(self) -> bool:
@@ -67,9 +80,18 @@ class Arbiter(object):
         """Contact point sets make getting contact information from the
         Arbiter simpler.
 
+        The point set is cached, so reading it several times in the same
+        callback is cheap.
+
         Return `ContactPointSet`"""
-        _set = lib.cpArbiterGetContactPointSet(self._arbiter)
-        return ContactPointSet._from_cp(_set)
+        if self._contact_point_set is None:
+            if self._contact_data is None:
+                self._contact_data = ffi.new("cpFloat[12]")
+            count = lib.pmArbiterGetContactData(self._arbiter, self._contact_data)
+            self._contact_point_set = ContactPointSet._from_contact_data(
+                count, ffi.unpack(self._contact_data, 2 + count * 5)
+            )
+        return self._contact_point_set
 
     @contact_point_set.setter
     def contact_point_set(self, point_set: ContactPointSet) -> None:
@@ -92,6 +114,7 @@ class Arbiter(object):
             raise Exception(msg)
 
         lib.cpArbiterSetContactPointSet(self._arbiter, ffi.addressof(_set))
+        self._contact_point_set = None
 
     @property
     def bodies(self) -> tuple["Body", "Body"]:
@@ -116,15 +139,18 @@ class Arbiter(object):
         """Get the shapes in the order that they were defined in the
         collision handler associated with this arbiter
         """
-        shapeA_p = ffi.new("cpShape *[1]")
-        shapeB_p = ffi.new("cpShape *[1]")
-
-        lib.cpArbiterGetShapes(self._arbiter, shapeA_p, shapeB_p)
-
-        a, b = Shape._from_cp_shape(shapeA_p[0]), Shape._from_cp_shape(shapeB_p[0])
-        assert a is not None
-        assert b is not None
-        return a, b
+        if self._shapes is None:
+            # Same as cpArbiterGetShapes, without allocating the out params
+            _arb = self._arbiter
+            if _arb.swapped:
+                cp_a, cp_b = _arb.b, _arb.a
+            else:
+                cp_a, cp_b = _arb.a, _arb.b
+            a, b = Shape._from_cp_shape(cp_a), Shape._from_cp_shape(cp_b)
+            assert a is not None
+            assert b is not None
+            self._shapes = a, b
+        return self._shapes
 
     @property
     def restitution(self) -> float:
@@ -57,6 +57,37 @@ True
 >>> list(memoryview(data.float_buf()).cast("d"))
 []
 
+Shape data, for example to draw the shapes, can be extracted in the same way.
+Here the world space center of each circle is returned:
+
+>>> data.clear()
+>>> pymunk.batch.get_space_shapes(
+...     s,
+...     pymunk.batch.ShapeFields.SHAPE_ID | pymunk.batch.ShapeFields.CIRCLE_CENTER,
+...     data,
+... )
+>>> len(memoryview(data.int_buf()).cast("P"))
+2
+>>> [round(x, 2) for x in memoryview(data.float_buf()).cast("d")]
+[1.0, 2.0, 3.0, 4.0]
+
+Queries can be batched as well. The query inputs are passed in as an array of
+floats, and the index of the query together with the id of each shape hit is
+returned:
+
+>>> data.clear()
+>>> import array
+>>> pymunk.batch.space_point_query(
+...     s,
+...     array.array("d", [-2, 2, 100, 100, 6, 4]),
+...     0,
+...     pymunk.ShapeFilter(),
+...     data,
+... )
+>>> c1, c2 = list(b1.shapes)[0], list(b2.shapes)[0]
+>>> list(memoryview(data.int_buf()).cast("P")) == [0, c1.id, 2, c2.id]
+True
+
 
 To set data
 ===========
@@ -73,15 +104,41 @@ __docformat__ = "reStructuredText"
 __all__ = [
     "BodyFields",
     "ArbiterFields",
+    "ShapeFields",
+    "BufferLayout",
     "Buffer",
+    "BodyGroup",
+    "VectorSpace",
     "get_space_bodies",
+    "get_space_bodies_interpolated",
+    "get_body_group",
+    "set_body_group",
     "get_space_arbiters",
+    "set_space_arbiters",
+    "set_velocity_hook",
+    "CollisionEvents",
+    "set_collision_events",
+    "get_space_shapes",
+    "space_point_query",
+    "space_segment_query",
+    "space_segment_query_first",
+    "space_bb_query",
+    "create_circles",
+    "create_segments",
+    "create_polys",
+    "structured_dtypes",
+    "structured_arrays",
+    "column_arrays",
 ]
 
-from enum import Flag
-from typing import Any
+from enum import Enum, Flag
+from typing import Any, Callable, Iterable, Optional, Sequence, Union
 
 from ._chipmunk_cffi import ffi, lib
+from ._util import _check_offsets
+from .body import Body
+from .shape_filter import ShapeFilter
+from .shapes import Circle, Poly, Segment
 from .space import Space
 
 
@@ -138,18 +195,133 @@ class ArbiterFields(Flag):
     """:py:attr:`pymunk.ContactPoint.point_b` of contact 2. X and Y stored in float_buf."""
     DISTANCE_2 = lib.DISTANCE_2
     """:py:attr:`pymunk.ContactPoint.distance` of contact 2. Value stored in float_buf."""
+
+    RESTITUTION = lib.RESTITUTION
+    """:py:attr:`pymunk.Arbiter.restitution`. Value stored in float_buf."""
+    FRICTION = lib.FRICTION
+    """:py:attr:`pymunk.Arbiter.friction`. Value stored in float_buf."""
+    SURFACE_VELOCITY = lib.SURFACE_VELOCITY
+    """:py:attr:`pymunk.Arbiter.surface_velocity`. X and Y stored in float_buf."""
+    ALL = 0x1FFF
+    """All the fields except RESTITUTION, FRICTION and SURFACE_VELOCITY, which
+    are left out to keep the layout of ALL unchanged."""
+
+
+class ShapeFields(Flag):
+    """Flag fields to specify shape properties to get.
+
+    Fields that only apply to one kind of shape (like CIRCLE_CENTER) are
+    filled with zeros for shapes of the other kinds, so that every shape
+    takes up the same space in the buffers. The exception is POLY_VERTICES
+    where the number of vertices varies between shapes.
+    """
+
+    SHAPE_ID = lib.SHAPE_ID
+    """:py:attr:`pymunk.Shape.id`. Value stored in int_buf. The shapes of a
+    :py:class:`pymunk.StaticGeometry` all have the id of the geometry."""
+    BODY_ID = lib.SHAPE_BODY_ID
+    """:py:attr:`pymunk.Body.id` of the shape's body. Value stored in int_buf."""
+    SHAPE_TYPE = lib.SHAPE_TYPE
+    """Kind of shape, 0 for Circle, 1 for Segment and 2 for Poly. Value
+    stored in int_buf."""
+    BB = lib.SHAPE_BB
+    """:py:attr:`pymunk.Shape.bb`. Left, bottom, right and top stored in
+    float_buf."""
+    RADIUS = lib.SHAPE_RADIUS
+    """Radius of the shape (:py:attr:`pymunk.Circle.radius`,
+    :py:attr:`pymunk.Segment.radius` or :py:attr:`pymunk.Poly.radius`).
+    Value stored in float_buf."""
+    CIRCLE_CENTER = lib.CIRCLE_CENTER
+    """World space center of a :py:class:`pymunk.Circle`. X and Y stored in
+    float_buf."""
+    SEGMENT_ENDPOINTS = lib.SEGMENT_ENDPOINTS
+    """World space endpoints a and b of a :py:class:`pymunk.Segment`. X and Y
+    of a followed by X and Y of b stored in float_buf."""
+    POLY_VERTICES = lib.POLY_VERTICES
+    """World space vertices of a :py:class:`pymunk.Poly`. Number of vertices
+    stored in int_buf, X and Y of each vertex stored in float_buf."""
     ALL = 0xFFFF
     """All the fields"""
 
 
+class CollisionEvents(Flag):
+    """Flag fields to specify the collision events to record with
+    :py:func:`set_collision_events`."""
+
+    BEGIN = lib.COLLISION_BEGIN
+    """Two shapes started touching, like the begin callback of
+    :py:meth:`pymunk.Space.on_collision`."""
+    POST_SOLVE = lib.COLLISION_POST_SOLVE
+    """Two shapes are touching and the collision has been solved, like the
+    post_solve callback."""
+    SEPARATE = lib.COLLISION_SEPARATE
+    """Two shapes stopped touching, like the separate callback."""
+    ALL = 0xFFFF
+    """All the events"""
+
+
+class BufferLayout(Enum):
+    """How the data of several objects and fields is ordered in a Buffer."""
+
+    INTERLEAVED = 0
+    """All the fields of the first object, followed by all the fields of the
+    second object and so on (array of structs). This is the default."""
+    COLUMNS = 1
+    """Each field of all objects in its own contiguous segment, one segment
+    after the other in field order (struct of arrays). For example, with
+    POSITION and ANGLE the float data is the x and y of all positions
+    followed by the angles of all bodies.
+
+    The int and float data are segmented separately, so a field in int_buf
+    does not take up any space in float_buf and the other way around."""
+
+
+def _layout_passes(fields: Flag, layout: BufferLayout) -> list[int]:
+    # The field values to iterate the objects with, one pass each. Fields are
+    # always written in ascending bit order, matching the interleaved layout.
+    if layout == BufferLayout.INTERLEAVED:
+        return [fields.value]
+    return [
+        f.value
+        for f in type(fields)
+        if f.value & fields.value and f.value & (f.value - 1) == 0
+    ]
+
+
 class Buffer(object):
     _int_arr: ffi.CData = None
     _float_arr: ffi.CData = None
 
-    def __init__(self) -> None:
-        """Create a empty BatchData object."""
-        self._float_arr = lib.pmFloatArrayNew(0)
-        self._int_arr = lib.pmIntArrayNew(0)
+    def __init__(self, capacity: Union[None, int, tuple[int, int]] = None) -> None:
+        """Create a empty BatchData object.
+
+        By default the internal arrays grow as needed when data is written to
+        them. If capacity is set the arrays are instead allocated once with
+        the given size and never grown. Capacity is either a single int used
+        for both arrays, or a tuple of (int capacity, float capacity),
+        counted in number of values.
+
+        Writing more data than fits in a fixed capacity Buffer raises a
+        BufferError after the call, with the data that did fit written. Use
+        :py:meth:`required_size` to find out how much space the call needed.
+        """
+        if capacity is None:
+            self._float_arr = lib.pmFloatArrayNew(0)
+            self._int_arr = lib.pmIntArrayNew(0)
+        else:
+            if isinstance(capacity, int):
+                int_capacity = float_capacity = capacity
+            else:
+                int_capacity, float_capacity = capacity
+            assert (
+                int_capacity >= 0 and float_capacity >= 0
+            ), "The capacity can not be negative"
+            self._float_arr = lib.pmFloatArrayNew(float_capacity)
+            self._float_arr.max = float_capacity
+            self._float_arr.fixed = 1
+            self._int_arr = lib.pmIntArrayNew(int_capacity)
+            self._int_arr.max = int_capacity
+            self._int_arr.fixed = 1
 
         self._int_buf = None
 
@@ -162,7 +334,30 @@ class Buffer(object):
         arrays by calling clear, than to create a new object each step.
         """
         self._float_arr.num = 0
+        self._float_arr.overflow = 0
         self._int_arr.num = 0
+        self._int_arr.overflow = 0
+
+    def required_size(self) -> tuple[int, int]:
+        """Return the number of int and float values written to the buffer
+        since it was last cleared, including values that did not fit in a
+        fixed capacity buffer.
+
+        Can be used to size a fixed capacity Buffer.
+        """
+        return (
+            self._int_arr.num + self._int_arr.overflow,
+            self._float_arr.num + self._float_arr.overflow,
+        )
+
+    def _check_overflow(self) -> None:
+        if self._int_arr.overflow or self._float_arr.overflow:
+            int_size, float_size = self.required_size()
+            raise BufferError(
+                f"Buffer capacity exceeded. Required {int_size} ints and "
+                f"{float_size} floats, but the capacity is "
+                f"{self._int_arr.max} ints and {self._float_arr.max} floats."
+            )
 
     def float_buf(self) -> ffi.buffer:
         """Return a CFFI buffer object of the floating point data in the
@@ -179,6 +374,9 @@ class Buffer(object):
         buffer should be an array of floats, implmenting the buffer/memoryview
         interface like a numpy array or array.array.
 
+        The buffer is never grown, so data written to this Buffer later on
+        has to fit in the supplied buffer, same as with a fixed capacity.
+
         (From Python 3.12 the buffer argument will be typed as
         collections.abc.Buffer)
 
@@ -188,6 +386,9 @@ class Buffer(object):
         self._float_arr.arr = arr
         self._float_arr.max = len(arr)
         self._float_arr.num = len(arr)
+        # The memory is owned by buffer and can not be reallocated.
+        self._float_arr.fixed = 1
+        self._float_arr.overflow = 0
 
     def int_buf(self) -> ffi.buffer:
         """Return a CFFI buffer object of the integer data in the internal
@@ -204,6 +405,9 @@ class Buffer(object):
         buffer should be an array of ints, implmenting the buffer/memoryview
         interface like a numpy array or array.array.
 
+        The buffer is never grown, so data written to this Buffer later on
+        has to fit in the supplied buffer, same as with a fixed capacity.
+
         (From Python 3.12 the buffer argument will be typed as
         collections.abc.Buffer)
         """
@@ -212,38 +416,133 @@ class Buffer(object):
         self._int_arr.arr = arr
         self._int_arr.max = len(arr)
         self._int_arr.num = len(arr)
+        # The memory is owned by buffer and can not be reallocated.
+        self._int_arr.fixed = 1
+        self._int_arr.overflow = 0
+
 
+class BodyGroup(object):
+    """A fixed selection of bodies to get or set data for.
 
-def get_space_bodies(space: Space, fields: BodyFields, buffers: Buffer) -> None:
+    Use together with :py:func:`get_body_group` and :py:func:`set_body_group`
+    when only a few of the bodies in a space need to be read or updated.
+    The data is read and written in the same order as the bodies were passed
+    in when the group was created.
+
+    The group keeps a reference to its bodies. The bodies do not need to be
+    added to a space.
+    """
+
+    def __init__(self, bodies: Iterable[Body]) -> None:
+        """Create a group from the bodies."""
+        self._bodies = list(bodies)
+        self._cp_bodies = ffi.new("cpBody *[]", [b._body for b in self._bodies])
+
+    @property
+    def bodies(self) -> list[Body]:
+        """The bodies in the group, in order."""
+        return list(self._bodies)
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+
+def get_space_bodies(
+    space: Space,
+    fields: BodyFields,
+    buffers: Buffer,
+    layout: BufferLayout = BufferLayout.INTERLEAVED,
+) -> None:
     """Get data for all bodies in the space.
 
     Filter out the fields you are interested in with the fields property.
 
-    The data is returned in the batched_data buffers.
+    The data is returned in the batched_data buffers, ordered as specified by
+    layout.
     """
     _data = ffi.new("pmBatchedData *")
-    _data.fields = fields.value
     _data.floatArray = buffers._float_arr
     _data.intArray = buffers._int_arr
 
-    lib.cpSpaceEachBody(
-        space._space,
-        ffi.addressof(lib, "pmSpaceBodyGetIteratorFuncBatched"),
-        _data,
-    )
+    for field_value in _layout_passes(fields, layout):
+        _data.fields = field_value
+        lib.cpSpaceEachBody(
+            space._space,
+            ffi.addressof(lib, "pmSpaceBodyGetIteratorFuncBatched"),
+            _data,
+        )
 
+    buffers._check_overflow()
+
+
+def get_space_bodies_interpolated(
+    space: Space,
+    alpha: float,
+    fields: BodyFields,
+    buffers: Buffer,
+    layout: BufferLayout = BufferLayout.INTERLEAVED,
+) -> None:
+    """Get the transforms of all bodies in the space, interpolated between
+    the previous and the current step.
+
+    Requires :py:attr:`pymunk.Space.keep_previous_transforms` to be enabled
+    on the space. An alpha of 0 gives the position and angle from before the
+    last step, and 1 gives the current ones. Use the alpha returned by
+    :py:meth:`pymunk.Space.advance`.
+
+    Only BODY_ID, POSITION and ANGLE are supported. Bodies added since the
+    last step get their current transform.
+
+    >>> import pymunk, pymunk.batch
+    >>> s = pymunk.Space()
+    >>> s.keep_previous_transforms = True
+    >>> b = pymunk.Body(1, 1)
+    >>> b.velocity = 10, 0
+    >>> s.add(b)
+    >>> alpha = s.advance(0.15, 0.1)
+    >>> data = pymunk.batch.Buffer()
+    >>> pymunk.batch.get_space_bodies_interpolated(
+    ...     s, alpha, pymunk.batch.BodyFields.POSITION, data)
+    >>> b.position
+    Vec2d(1.0, 0.0)
+    >>> [round(x, 2) for x in memoryview(data.float_buf()).cast("d")]
+    [0.5, 0.0]
+    """
+    assert (
+        space.keep_previous_transforms
+    ), "keep_previous_transforms must be enabled on the space"
+    supported = BodyFields.BODY_ID | BodyFields.POSITION | BodyFields.ANGLE
+    assert (
+        fields & supported == fields
+    ), "Only BODY_ID, POSITION and ANGLE can be interpolated"
 
-def set_space_bodies(space: Space, fields: BodyFields, buffers: Buffer) -> None:
+    _data = ffi.new("pmBatchedData *")
+    _data.floatArray = buffers._float_arr
+    _data.intArray = buffers._int_arr
+
+    for field_value in _layout_passes(fields, layout):
+        _data.fields = field_value
+        lib.pmSpaceInterpolateBodies(space._space, space._previous_data(), alpha, _data)
+
+    buffers._check_overflow()
+
+
+def set_space_bodies(
+    space: Space,
+    fields: BodyFields,
+    buffers: Buffer,
+    layout: BufferLayout = BufferLayout.INTERLEAVED,
+) -> None:
     """Set data for all bodies in the space.
 
     Filter out the fields you want to set with the fields property.
 
-    The data to update is passed in the batched_data buffers.
+    The data to update is passed in the batched_data buffers, ordered as
+    specified by layout.
 
     Note that BODY_ID is not possible to set, if BODY_ID is set it will read the value from the buffer, but not do the update.
     """
     _data = ffi.new("pmBatchedData *")
-    _data.fields = fields.value
     _data.floatArray = buffers._float_arr
     _data.intArray = buffers._int_arr
 
@@ -251,29 +550,901 @@ def set_space_bodies(space: Space, fields: BodyFields, buffers: Buffer) -> None:
     orig_float_num = buffers._float_arr.num
     buffers._float_arr.num = 0
 
-    lib.cpSpaceEachBody(
-        space._space,
-        ffi.addressof(lib, "pmSpaceBodySetIteratorFuncBatched"),
-        _data,
-    )
+    for field_value in _layout_passes(fields, layout):
+        _data.fields = field_value
+        lib.cpSpaceEachBody(
+            space._space,
+            ffi.addressof(lib, "pmSpaceBodySetIteratorFuncBatched"),
+            _data,
+        )
 
     buffers._float_arr.num = orig_float_num
 
 
-def get_space_arbiters(space: Space, fields: ArbiterFields, buffers: Buffer) -> None:
+def get_body_group(
+    group: BodyGroup,
+    fields: BodyFields,
+    buffers: Buffer,
+    layout: BufferLayout = BufferLayout.INTERLEAVED,
+) -> None:
+    """Get data for the bodies in the group.
+
+    Works like :py:func:`get_space_bodies`, but only the bodies in the group
+    are included, in the order of the group.
+    """
+    _data = ffi.new("pmBatchedData *")
+    _data.floatArray = buffers._float_arr
+    _data.intArray = buffers._int_arr
+
+    for field_value in _layout_passes(fields, layout):
+        _data.fields = field_value
+        lib.pmBodyArrayGetBatched(group._cp_bodies, len(group._bodies), _data)
+
+    buffers._check_overflow()
+
+
+def set_body_group(
+    group: BodyGroup,
+    fields: BodyFields,
+    buffers: Buffer,
+    layout: BufferLayout = BufferLayout.INTERLEAVED,
+) -> None:
+    """Set data for the bodies in the group.
+
+    Works like :py:func:`set_space_bodies`, but only the bodies in the group
+    are updated, in the order of the group.
+    """
+    _data = ffi.new("pmBatchedData *")
+    _data.floatArray = buffers._float_arr
+    _data.intArray = buffers._int_arr
+
+    # To iterate from the beginning of the array, num should start at 0
+    orig_float_num = buffers._float_arr.num
+    buffers._float_arr.num = 0
+
+    for field_value in _layout_passes(fields, layout):
+        _data.fields = field_value
+        lib.pmBodyArraySetBatched(group._cp_bodies, len(group._bodies), _data)
+
+    buffers._float_arr.num = orig_float_num
+
+
+class VectorSpace(object):
+    """Many copies of a template space, stepped and updated together.
+
+    Made for reinforcement learning and similar workloads with many small
+    and identical environments. The copies are created from the template
+    with :py:meth:`pymunk.Space.copy`, and each step:
+
+    1. Sets the action fields of the selected bodies in all copies from one
+       array of actions.
+    2. Steps all copies with a :py:class:`pymunk.SpacePool`.
+    3. Gets the observation fields of the selected bodies in all copies into
+       one preallocated array.
+
+    The actions and observations are float arrays with the shape (number of
+    copies, number of bodies, number of values per body), with the values of
+    each body ordered in the same way as :py:func:`set_body_group` and
+    :py:func:`get_body_group` expect. Only fields stored in float_buf can be
+    used, so BODY_ID is not allowed.
+
+    >>> import pymunk, pymunk.batch
+    >>> template = pymunk.Space()
+    >>> b = pymunk.Body(1, 1)
+    >>> template.add(b)
+    >>> vs = pymunk.batch.VectorSpace(
+    ...     template,
+    ...     3,
+    ...     pymunk.batch.BodyFields.VELOCITY,
+    ...     pymunk.batch.BodyFields.POSITION,
+    ... )
+    >>> import array
+    >>> vs.step(1, array.array("d", [1, 0, 2, 0, 3, 0]))
+    >>> list(memoryview(vs.observation_buffer.float_buf()).cast("d"))
+    [1.0, 0.0, 2.0, 0.0, 3.0, 0.0]
+    """
+
+    def __init__(
+        self,
+        template: Space,
+        count: int,
+        action_fields: BodyFields,
+        observation_fields: BodyFields,
+        bodies: Optional[Iterable[Body]] = None,
+        threads: int = 1,
+    ) -> None:
+        """Create count copies of the template space.
+
+        :param template: Space to copy
+        :param count: Number of copies
+        :param action_fields: Body fields set from the actions each step
+        :param observation_fields: Body fields written to the observations
+            each step
+        :param bodies: Bodies in the template to include, in order. Defaults
+            to all non static bodies.
+        :param threads: Number of threads used to step the copies
+        """
+        assert (
+            BodyFields.BODY_ID not in action_fields
+            and BodyFields.BODY_ID not in observation_fields
+        ), "Only float fields can be used in a VectorSpace"
+        template_bodies = list(template.bodies)
+        if bodies is None:
+            bodies = [b for b in template_bodies if b.body_type != Body.STATIC]
+        index = {b: i for i, b in enumerate(template_bodies)}
+        self._indices = [index[b] for b in bodies]
+
+        self._template = template
+        self._threads = threads
+        self.action_fields = action_fields
+        """Body fields set from the actions."""
+        self.observation_fields = observation_fields
+        """Body fields written to the observations."""
+
+        self._spaces = [template.copy() for _ in range(count)]
+
+        self._action_width = _float_width(action_fields)
+        self._observation_width = _float_width(observation_fields)
+        self._actions = Buffer()
+        self._observations = Buffer(
+            capacity=(0, count * len(self._indices) * self._observation_width)
+        )
+        self._observations_array: Any = None
+        self._update()
+
+    def _update(self) -> None:
+        from .space_pool import SpacePool
+
+        self._pool = SpacePool(self._spaces, self._threads)
+        group: list[Body] = []
+        for space in self._spaces:
+            space_bodies = list(space.bodies)
+            group.extend(space_bodies[i] for i in self._indices)
+        self._group = BodyGroup(group)
+        self._observations.clear()
+        get_body_group(self._group, self.observation_fields, self._observations)
+
+    @property
+    def spaces(self) -> list[Space]:
+        """The copies of the template space, in order."""
+        return list(self._spaces)
+
+    def __len__(self) -> int:
+        return len(self._spaces)
+
+    @property
+    def observation_buffer(self) -> Buffer:
+        """The Buffer with the observations of the last step."""
+        return self._observations
+
+    @property
+    def observations(self) -> Any:
+        """Zero-copy NumPy array of the observations of the last step, with
+        shape (number of copies, number of bodies, number of values per
+        body).
+
+        The array is allocated once and updated in place each step.
+
+        .. note::
+            Requires NumPy. NumPy is not a dependency of Pymunk and needs to
+            be installed separately.
+        """
+        if self._observations_array is None:
+            import numpy as np
+
+            arr = self._observations._float_arr
+            self._observations_array = np.frombuffer(
+                ffi.buffer(arr.arr, ffi.sizeof("cpFloat") * arr.max),
+                dtype=np.float64,
+            ).reshape(len(self._spaces), len(self._indices), self._observation_width)
+        return self._observations_array
+
+    def step(self, dt: float, actions: Any = None) -> None:
+        """Apply the actions, step all the copies and update the observations.
+
+        :param dt: Time step length
+        :param actions: Array of floats implementing the buffer/memoryview
+            interface, like a numpy array or array.array, with the shape
+            (number of copies, number of bodies, number of values per body).
+            If None no actions are set.
+        """
+        if actions is not None:
+            self._actions.set_float_buf(actions)
+            assert self._actions._float_arr.num == len(self._group) * (
+                self._action_width
+            ), "The actions do not match the number of bodies and fields"
+            set_body_group(self._group, self.action_fields, self._actions)
+
+        self._pool.step(dt)
+
+        self._observations.clear()
+        get_body_group(self._group, self.observation_fields, self._observations)
+
+    def reset(self, indices: Iterable[int]) -> None:
+        """Replace the copies with the given indices with new copies of the
+        template, and update their observations.
+        """
+        for i in indices:
+            self._spaces[i] = self._template.copy()
+        self._update()
+
+
+def get_space_arbiters(
+    space: Space,
+    fields: ArbiterFields,
+    buffers: Buffer,
+    layout: BufferLayout = BufferLayout.INTERLEAVED,
+) -> None:
     """Get data for all active arbiters in the space.
 
     Filter out the fields you are interested in with the fields property.
 
-    The data is returned in the batched_data buffers.
+    The data is returned in the batched_data buffers, ordered as specified by
+    layout.
     """
     _data = ffi.new("pmBatchedData *")
-    _data.fields = fields.value
     _data.floatArray = buffers._float_arr
     _data.intArray = buffers._int_arr
 
+    for field_value in _layout_passes(fields, layout):
+        _data.fields = field_value
+        lib.cpSpaceEachCachedArbiter(
+            space._space,
+            ffi.addressof(lib, "pmSpaceArbiterIteratorFuncBatched"),
+            _data,
+        )
+
+    buffers._check_overflow()
+
+
+def set_space_arbiters(space: Space, fields: ArbiterFields, buffers: Buffer) -> None:
+    """Set data for all cached arbiters in the space.
+
+    Filter out the fields you want to set with the fields property. Only
+    RESTITUTION, FRICTION and SURFACE_VELOCITY can be set, any other fields
+    are ignored.
+
+    The data to update is passed in the batched_data buffers, in the same
+    order as the arbiters are returned by :py:func:`get_space_arbiters`.
+
+    Normally the space recalculates these values from the shapes each step,
+    which is why they usually have to be set from a pre_solve callback.
+    Arbiters updated with this function will instead keep getting the
+    values set each step, until this function is called again. The values
+    are copied, so the buffers can be cleared and reused after the call. This makes it possible to
+    calculate the values for all arbiters at once between steps, without a
+    Python callback for each arbiter.
+
+    Arbiters created after the call use the normal calculated values.
+    """
+    # The values are copied, so that the buffers can be reused by the caller
+    # while the space keeps applying the values each step.
+    count = buffers._float_arr.num
+    overrides = ffi.gc(lib.pmFloatArrayNew(count), lib.pmFloatArrayFree)
+    ffi.memmove(overrides.arr, buffers._float_arr.arr, count * ffi.sizeof("cpFloat"))
+
+    _data = ffi.new("pmBatchedData *")
+    _data.fields = fields.value
+    _data.floatArray = overrides
+    _data.intArray = buffers._int_arr
+
     lib.cpSpaceEachCachedArbiter(
         space._space,
-        ffi.addressof(lib, "pmSpaceArbiterIteratorFuncBatched"),
+        ffi.addressof(lib, "pmSpaceArbiterSetIteratorFuncBatched"),
         _data,
     )
+    overrides.num = count
+
+    data = space._get_global_handler_data()
+    data.overridesFields = fields.value
+    data.overridesArray = overrides
+    # Keep the copy alive as long as the space might read from it.
+    space._global_handler_buffers["overrides"] = overrides
+
+
+def set_collision_events(
+    space: Space, events: CollisionEvents, buffers: Optional[Buffer]
+) -> None:
+    """Record collision events of the space in a Buffer, instead of calling
+    a Python callback for each of them.
+
+    While set, each event of the given kinds is appended to buffers when it
+    happens, both during :py:meth:`pymunk.Space.step` and when a shape is
+    removed from the space. No Python code runs for the events, so a space
+    without other callbacks can still be stepped without the GIL, for
+    example by :py:class:`pymunk.SpacePool`. Read the events after the step
+    and then clear the buffers, they are never cleared by the space.
+
+    Each event is stored as 7 values in int_buf:
+
+    * event (the value of the :py:class:`CollisionEvents` flag)
+    * :py:attr:`pymunk.Shape.id` of shape A and B
+    * :py:attr:`pymunk.Body.id` of body A and B
+    * :py:attr:`pymunk.Shape.collision_type` of shape A and B
+
+    and 6 values in float_buf:
+
+    * X and Y of :py:attr:`pymunk.Arbiter.total_impulse`. Only POST_SOLVE
+      events have an impulse, the other events store 0.
+    * X and Y of :py:attr:`pymunk.Arbiter.normal`.
+    * X and Y of :py:attr:`pymunk.ContactPoint.point_a` of the first contact
+      point, or 0 if there are no contact points (like in SEPARATE events).
+
+    The shapes are in the same order as :py:attr:`pymunk.Arbiter.shapes`
+    would have in a callback of the global collision handler.
+
+    With a fixed capacity Buffer events that do not fit are dropped, which
+    can be checked with :py:meth:`Buffer.required_size`.
+
+    Set buffers to None to stop recording. The recording is not copied or
+    pickled with the space.
+
+    >>> import pymunk, pymunk.batch
+    >>> s = pymunk.Space()
+    >>> b1 = pymunk.Body(1, 1)
+    >>> c1 = pymunk.Circle(b1, 4)
+    >>> c1.collision_type = 2
+    >>> b2 = pymunk.Body(1, 1)
+    >>> b2.position = 3, 0
+    >>> c2 = pymunk.Circle(b2, 4)
+    >>> s.add(b1, c1, b2, c2)
+    >>> events = pymunk.batch.Buffer()
+    >>> pymunk.batch.set_collision_events(
+    ...     s, pymunk.batch.CollisionEvents.BEGIN, events
+    ... )
+    >>> s.step(0.01)
+    >>> ints = list(memoryview(events.int_buf()).cast("P"))
+    >>> len(ints)
+    7
+    >>> ints[0] == pymunk.batch.CollisionEvents.BEGIN.value
+    True
+    >>> sorted(ints[5:7])
+    [0, 2]
+    >>> events.clear()
+    """
+    data = space._get_global_handler_data()
+    if buffers is None:
+        data.events = 0
+        data.eventsIntArray = ffi.NULL
+        data.eventsFloatArray = ffi.NULL
+        space._global_handler_buffers.pop("events", None)
+        return
+
+    data.events = events.value
+    data.eventsIntArray = buffers._int_arr
+    data.eventsFloatArray = buffers._float_arr
+    # Keep the buffers alive as long as the space might write to them.
+    space._global_handler_buffers["events"] = buffers
+
+
+def set_velocity_hook(
+    space: Space,
+    fields: BodyFields,
+    hook: Optional[Callable[[Buffer, float], Any]],
+    layout: BufferLayout = BufferLayout.INTERLEAVED,
+) -> None:
+    """Set a function called once before each step of the space, to
+    calculate the acceleration of many bodies at once.
+
+    The hook is used for bodies with a :py:class:`pymunk.VelocityIntegrator`
+    with hook set to True. It is called with a Buffer with the fields of
+    those bodies (in the same format as :py:func:`get_space_bodies`, ordered
+    as specified by layout) and the time step, and should return a float
+    buffer (for example a numpy array) with the x and y acceleration of each
+    of the bodies, in the same order. The acceleration is added to the
+    gravity when the velocity of each body is updated during the step.
+
+    This replaces one :py:attr:`pymunk.Body.velocity_func` callback per
+    body and step with a single call, where the acceleration of all bodies
+    can be calculated in one vectorized operation. The Buffer passed to the
+    hook is allocated once and reused every step, so it is only valid until
+    the hook returns.
+
+    Set hook to None to remove it. The hook is not copied or pickled with
+    the space. Spaces with a hook are stepped one by one by
+    :py:class:`pymunk.SpacePool`.
+
+    >>> import array, pymunk, pymunk.batch
+    >>> s = pymunk.Space()
+    >>> b = pymunk.Body(1, 1)
+    >>> b.velocity_integrator = pymunk.VelocityIntegrator(hook=True)
+    >>> s.add(b)
+    >>> def hook(data, dt):
+    ...     # Accelerate the bodies toward x = 0
+    ...     positions = memoryview(data.float_buf()).cast("d")
+    ...     return array.array("d", [-positions[0], 0])
+    >>> b.position = 10, 0
+    >>> pymunk.batch.set_velocity_hook(s, pymunk.batch.BodyFields.POSITION, hook)
+    >>> s.step(0.1)
+    >>> b.velocity
+    Vec2d(-1.0, 0.0)
+    """
+    buffer = Buffer()
+    _data = ffi.new("pmBatchedData *")
+    _data.floatArray = buffer._float_arr
+    _data.intArray = buffer._int_arr
+    passes = _layout_passes(fields, layout) or [0]
+
+    # The bodies are saved so that the accelerations are set on exactly the
+    # bodies passed to the hook, even if the hook changes which bodies use
+    # it. The array is only reallocated when the space has more bodies.
+    bodies = [ffi.new("cpBody *[]", 0)]
+
+    def get_bodies(fields: int) -> int:
+        max_count = len(space._bodies)
+        if len(bodies[0]) < max_count:
+            bodies[0] = ffi.new("cpBody *[]", max_count)
+        _data.fields = fields
+        return lib.pmSpaceGetHookBodies(space._space, _data, bodies[0], max_count)
+
+    if hook is None:
+        # Clear the accelerations set by the last call of the old hook
+        count = get_bodies(0)
+        accelerations = ffi.new("cpFloat[]", count * 2)
+        lib.pmBodiesSetHookAccelerations(bodies[0], count, accelerations)
+        space._velocity_hook = None
+        return
+
+    def velocity_hook(space: Space, dt: float) -> None:
+        # The space is locked while the hook runs, so bodies removed by the
+        # hook stay alive until the accelerations have been set.
+        buffer.clear()
+        for field_value in passes:
+            count = get_bodies(field_value)
+        accelerations = ffi.from_buffer("cpFloat[]", hook(buffer, dt))
+        assert (
+            len(accelerations) == count * 2
+        ), f"The hook must return 2 floats for each of the {count} bodies"
+        lib.pmBodiesSetHookAccelerations(bodies[0], count, accelerations)
+
+    space._velocity_hook = velocity_hook
+
+
+def get_space_shapes(
+    space: Space,
+    fields: ShapeFields,
+    buffers: Buffer,
+    layout: BufferLayout = BufferLayout.INTERLEAVED,
+) -> None:
+    """Get data for all shapes in the space.
+
+    Filter out the fields you are interested in with the fields property.
+
+    The data is returned in the batched_data buffers, ordered as specified by
+    layout.
+    """
+    _data = ffi.new("pmBatchedData *")
+    _data.floatArray = buffers._float_arr
+    _data.intArray = buffers._int_arr
+
+    for field_value in _layout_passes(fields, layout):
+        _data.fields = field_value
+        lib.cpSpaceEachShape(
+            space._space,
+            ffi.addressof(lib, "pmSpaceShapeGetIteratorFuncBatched"),
+            _data,
+        )
+
+    buffers._check_overflow()
+
+
+def _float_inputs(inputs: Any, width: int) -> tuple[ffi.CData, int]:
+    arr = ffi.from_buffer("cpFloat[]", inputs)
+    assert len(arr) % width == 0, f"The number of values must be a multiple of {width}"
+    return arr, len(arr) // width
+
+
+def _query_inputs(
+    space: Space, inputs: Any, width: int, threaded: bool
+) -> tuple[ffi.CData, int, int]:
+    arr, count = _float_inputs(inputs, width)
+    threads = space.threads if threaded else 1
+    return arr, count, threads
+
+
+def space_point_query(
+    space: Space,
+    points: Any,
+    max_distance: float,
+    shape_filter: ShapeFilter,
+    buffers: Buffer,
+    threaded: bool = False,
+) -> None:
+    """Query the space at many points at once.
+
+    Works like :py:meth:`pymunk.Space.point_query`, but for every point in
+    points, without creating any Python objects for the hits. points should
+    be an array of floats with the x and y of each point, implementing the
+    buffer/memoryview interface like a numpy array or array.array.
+
+    For each hit the index of the point and the :py:attr:`pymunk.Shape.id`
+    of the shape are stored in int_buf, and the x and y of the point on the
+    shape, the distance and the x and y of the gradient are stored in
+    float_buf.
+
+    If threaded is True the queries are split between :py:attr:`Space.threads`
+    threads. This requires a space created with threaded=True and is not
+    available on Windows, in which case the queries run on the calling thread
+    as usual. The result is the same regardless of the number of threads. The
+    GIL is released while the queries run, but the space must not be
+    modified from other threads in the meantime.
+    """
+    arr, count, threads = _query_inputs(space, points, 2, threaded)
+
+    _data = ffi.new("pmBatchedData *")
+    _data.floatArray = buffers._float_arr
+    _data.intArray = buffers._int_arr
+
+    lib.pmSpacePointQueryBatched(
+        space._space, arr, count, max_distance, shape_filter, threads, _data
+    )
+
+    buffers._check_overflow()
+
+
+def space_segment_query(
+    space: Space,
+    segments: Any,
+    radius: float,
+    shape_filter: ShapeFilter,
+    buffers: Buffer,
+    threaded: bool = False,
+) -> None:
+    """Query the space along many line segments at once.
+
+    Works like :py:meth:`pymunk.Space.segment_query`, but for every segment
+    in segments, without creating any Python objects for the hits. segments
+    should be an array of floats with the x and y of the start followed by
+    the x and y of the end of each segment, implementing the
+    buffer/memoryview interface like a numpy array or array.array.
+
+    For each hit the index of the segment and the :py:attr:`pymunk.Shape.id`
+    of the shape are stored in int_buf, and the x and y of the point, the x
+    and y of the normal and alpha are stored in float_buf.
+
+    See :py:func:`space_point_query` for how threaded works.
+    """
+    arr, count, threads = _query_inputs(space, segments, 4, threaded)
+
+    _data = ffi.new("pmBatchedData *")
+    _data.floatArray = buffers._float_arr
+    _data.intArray = buffers._int_arr
+
+    lib.pmSpaceSegmentQueryBatched(
+        space._space, arr, count, radius, shape_filter, threads, _data
+    )
+
+    buffers._check_overflow()
+
+
+def space_segment_query_first(
+    space: Space,
+    segments: Any,
+    radius: float,
+    shape_filter: ShapeFilter,
+    buffers: Buffer,
+    threaded: bool = False,
+) -> None:
+    """Query the space for the first hit along many line segments at once.
+
+    Works like :py:meth:`pymunk.Space.segment_query_first`, but for every
+    segment in segments. segments should be an array of floats with the x
+    and y of the start followed by the x and y of the end of each segment,
+    implementing the buffer/memoryview interface like a numpy array or
+    array.array.
+
+    Unlike :py:func:`space_segment_query` every segment is stored, also the
+    ones without a hit, so the results are in the same order as the
+    segments. For each segment a hit flag (0 or 1) and the
+    :py:attr:`pymunk.Shape.id` of the shape hit (0 if no hit) are stored in
+    int_buf, and the x and y of the point, the x and y of the normal and
+    alpha are stored in float_buf. If there is no hit the point is the end
+    of the segment, the normal is (0, 0) and alpha is 1.
+
+    See :py:func:`space_point_query` for how threaded works.
+    """
+    arr, count, threads = _query_inputs(space, segments, 4, threaded)
+
+    _data = ffi.new("pmBatchedData *")
+    _data.floatArray = buffers._float_arr
+    _data.intArray = buffers._int_arr
+
+    lib.pmSpaceSegmentQueryFirstBatched(
+        space._space, arr, count, radius, shape_filter, threads, _data
+    )
+
+    buffers._check_overflow()
+
+
+def space_bb_query(
+    space: Space,
+    bbs: Any,
+    shape_filter: ShapeFilter,
+    buffers: Buffer,
+    threaded: bool = False,
+) -> None:
+    """Query the space for shapes overlapping many bounding boxes at once.
+
+    Works like :py:meth:`pymunk.Space.bb_query`, but for every bounding box
+    in bbs, without creating any Python objects for the hits. bbs should be
+    an array of floats with left, bottom, right and top of each bounding
+    box, implementing the buffer/memoryview interface like a numpy array or
+    array.array.
+
+    For each hit the index of the bounding box and the
+    :py:attr:`pymunk.Shape.id` of the shape are stored in int_buf. Nothing
+    is stored in float_buf.
+
+    See :py:func:`space_point_query` for how threaded works.
+    """
+    arr, count, threads = _query_inputs(space, bbs, 4, threaded)
+
+    _data = ffi.new("pmBatchedData *")
+    _data.floatArray = buffers._float_arr
+    _data.intArray = buffers._int_arr
+
+    lib.pmSpaceBBQueryBatched(space._space, arr, count, shape_filter, threads, _data)
+
+    buffers._check_overflow()
+
+
+def create_circles(body: Body, centers: Any, radii: Any) -> list[Circle]:
+    """Create many circles attached to body at once.
+
+    centers should be an array of floats with the x and y of the offset of
+    each circle, and radii an array of floats with the radius of each
+    circle. Both implementing the buffer/memoryview interface like a numpy
+    array or array.array. The result is the same as creating each
+    :py:class:`pymunk.Circle` one by one, but much faster when creating
+    many circles, for example when loading a level.
+
+    >>> import array, pymunk, pymunk.batch
+    >>> body = pymunk.Body(body_type=pymunk.Body.STATIC)
+    >>> circles = pymunk.batch.create_circles(
+    ...     body, array.array("d", [0, 0, 10, 5]), array.array("d", [1, 2])
+    ... )
+    >>> [(c.offset, c.radius) for c in circles]
+    [(Vec2d(0.0, 0.0), 1.0), (Vec2d(10.0, 5.0), 2.0)]
+    """
+    centers_arr, count = _float_inputs(centers, 2)
+    radii_arr = ffi.from_buffer("cpFloat[]", radii)
+    assert len(radii_arr) == count, "There must be one radius per circle"
+
+    _shapes = ffi.new("cpShape *[]", count)
+    lib.pmCircleShapesNew(body._body, centers_arr, radii_arr, count, _shapes)
+    return Circle._init_many(body, _shapes, count)
+
+
+def create_segments(body: Body, endpoints: Any, radius: float) -> list[Segment]:
+    """Create many segments attached to body at once.
+
+    endpoints should be an array of floats with ax, ay, bx and by of each
+    segment. All segments get the same radius. Otherwise works like
+    :py:func:`create_circles`.
+    """
+    endpoints_arr, count = _float_inputs(endpoints, 4)
+
+    _shapes = ffi.new("cpShape *[]", count)
+    lib.pmSegmentShapesNew(body._body, endpoints_arr, radius, count, _shapes)
+    return Segment._init_many(body, _shapes, count)
+
+
+def create_polys(
+    body: Body, vertices: Any, offsets: Sequence[int], radius: float = 0
+) -> list[Poly]:
+    """Create many polygons attached to body at once.
+
+    vertices should be an array of floats with the x and y of the vertices
+    of all the polygons after each other, and offsets the index (in
+    vertices, not floats) of the first vertex of each polygon. The last
+    polygon uses the vertices until the end of the array. A convex hull is
+    calculated for each polygon, like :py:class:`pymunk.Poly` does.
+    Otherwise works like :py:func:`create_circles`.
+
+    >>> import array, pymunk, pymunk.batch
+    >>> body = pymunk.Body(body_type=pymunk.Body.STATIC)
+    >>> triangle_and_box = array.array(
+    ...     "d", [0, 0, 1, 0, 0, 1] + [5, 5, 6, 5, 6, 6, 5, 6]
+    ... )
+    >>> polys = pymunk.batch.create_polys(body, triangle_and_box, [0, 3])
+    >>> [len(p.get_vertices()) for p in polys]
+    [3, 4]
+    """
+    vertices_arr, vertex_count = _float_inputs(vertices, 2)
+    offsets_arr = ffi.new("int[]", list(offsets))
+    count = len(offsets_arr)
+    _check_offsets(offsets_arr, vertex_count)
+
+    _shapes = ffi.new("cpShape *[]", count)
+    lib.pmPolyShapesNew(
+        body._body, vertices_arr, vertex_count, offsets_arr, count, radius, _shapes
+    )
+    return Poly._init_many(body, _shapes, count)
+
+
+def _columns(name: str, count: int) -> list[str]:
+    if count == 1:
+        return [name]
+    return [name + "_x", name + "_y"]
+
+
+# Column names of each field, in the order the fields are written to the
+# buffers. The first item is True for fields stored in int_buf.
+_FIELD_COLUMNS: dict[Flag, tuple[bool, list[str]]] = {
+    BodyFields.BODY_ID: (True, ["body_id"]),
+    BodyFields.POSITION: (False, _columns("position", 2)),
+    BodyFields.ANGLE: (False, ["angle"]),
+    BodyFields.VELOCITY: (False, _columns("velocity", 2)),
+    BodyFields.ANGULAR_VELOCITY: (False, ["angular_velocity"]),
+    BodyFields.FORCE: (False, _columns("force", 2)),
+    BodyFields.TORQUE: (False, ["torque"]),
+    ArbiterFields.BODY_A_ID: (True, ["body_a_id"]),
+    ArbiterFields.BODY_B_ID: (True, ["body_b_id"]),
+    ArbiterFields.TOTAL_IMPULSE: (False, _columns("total_impulse", 2)),
+    ArbiterFields.TOTAL_KE: (False, ["total_ke"]),
+    ArbiterFields.IS_FIRST_CONTACT: (True, ["is_first_contact"]),
+    ArbiterFields.NORMAL: (False, _columns("normal", 2)),
+    ArbiterFields.CONTACT_COUNT: (True, ["contact_count"]),
+    ArbiterFields.POINT_A_1: (False, _columns("point_a_1", 2)),
+    ArbiterFields.POINT_B_1: (False, _columns("point_b_1", 2)),
+    ArbiterFields.DISTANCE_1: (False, ["distance_1"]),
+    ArbiterFields.POINT_A_2: (False, _columns("point_a_2", 2)),
+    ArbiterFields.POINT_B_2: (False, _columns("point_b_2", 2)),
+    ArbiterFields.DISTANCE_2: (False, ["distance_2"]),
+    ArbiterFields.RESTITUTION: (False, ["restitution"]),
+    ArbiterFields.FRICTION: (False, ["friction"]),
+    ArbiterFields.SURFACE_VELOCITY: (False, _columns("surface_velocity", 2)),
+    ShapeFields.SHAPE_ID: (True, ["shape_id"]),
+    ShapeFields.BODY_ID: (True, ["body_id"]),
+    ShapeFields.SHAPE_TYPE: (True, ["shape_type"]),
+    ShapeFields.BB: (False, ["bb_left", "bb_bottom", "bb_right", "bb_top"]),
+    ShapeFields.RADIUS: (False, ["radius"]),
+    ShapeFields.CIRCLE_CENTER: (False, _columns("circle_center", 2)),
+    ShapeFields.SEGMENT_ENDPOINTS: (
+        False,
+        _columns("segment_a", 2) + _columns("segment_b", 2),
+    ),
+}
+
+_Fields = Union[BodyFields, ArbiterFields, ShapeFields]
+
+
+def _float_width(fields: _Fields) -> int:
+    return sum(
+        len(columns)
+        for field, (is_int, columns) in _FIELD_COLUMNS.items()
+        if type(field) is type(fields) and field.value & fields.value and not is_int
+    )
+
+
+def structured_dtypes(fields: _Fields) -> tuple[Any, Any]:
+    """Return the NumPy structured dtypes of the int and float data written
+    to a Buffer for the given fields.
+
+    The returned tuple is (int dtype, float dtype), with one named column
+    for each value, like position_x, position_y and angle for POSITION and
+    ANGLE.
+
+    Can also be used to create arrays to pass in to
+    :py:meth:`Buffer.set_float_buf` when setting data.
+
+    .. note::
+        Requires NumPy. NumPy is not a dependency of Pymunk and needs to be
+        installed separately.
+    """
+    import numpy as np
+
+    if isinstance(fields, ShapeFields) and ShapeFields.POLY_VERTICES in fields:
+        raise ValueError(
+            "POLY_VERTICES have a variable length and can not be part of a "
+            "structured dtype."
+        )
+
+    int_columns: list[str] = []
+    float_columns: list[str] = []
+    for field, (is_int, columns) in _FIELD_COLUMNS.items():
+        if type(field) is type(fields) and field.value & fields.value:
+            if is_int:
+                int_columns += columns
+            else:
+                float_columns += columns
+
+    int_dtype = np.dtype([(c, np.uintp) for c in int_columns])
+    float_dtype = np.dtype([(c, np.float64) for c in float_columns])
+    return int_dtype, float_dtype
+
+
+def structured_arrays(buffers: Buffer, fields: _Fields) -> tuple[Any, Any]:
+    """Return zero-copy NumPy structured arrays of the int and float data in
+    the buffers.
+
+    The fields must be the same as used when the data was written to the
+    buffers. Each row in the arrays is one body, arbiter or shape, with
+    named columns as described in :py:func:`structured_dtypes`. Since the
+    arrays are views of the buffers, they are only valid until the buffers
+    are written to the next time.
+
+    Example::
+
+        fields = BodyFields.POSITION | BodyFields.ANGLE
+        get_space_bodies(space, fields, data)
+        ints, floats = structured_arrays(data, fields)
+        xs = floats["position_x"]
+
+    .. note::
+        Requires NumPy. NumPy is not a dependency of Pymunk and needs to be
+        installed separately.
+    """
+    import numpy as np
+
+    int_dtype, float_dtype = structured_dtypes(fields)
+
+    def view(buf: ffi.buffer, dtype: Any) -> Any:
+        if dtype.itemsize == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.frombuffer(buf, dtype=dtype)
+
+    return (
+        view(buffers.int_buf(), int_dtype),
+        view(buffers.float_buf(), float_dtype),
+    )
+
+
+def column_arrays(buffers: Buffer, fields: _Fields) -> dict[Flag, Any]:
+    """Return zero-copy NumPy arrays of each field in buffers written with
+    :py:attr:`BufferLayout.COLUMNS`.
+
+    The fields must be the same as used when the data was written to the
+    buffers. The result maps each requested field to an array with one row
+    per body, arbiter or shape. Fields with a single value give 1d arrays,
+    fields with several values (like POSITION) give 2d arrays with one
+    column per value. Since the arrays are views of the buffers, they are
+    only valid until the buffers are written to the next time.
+
+    Example::
+
+        fields = BodyFields.POSITION | BodyFields.ANGLE
+        get_space_bodies(space, fields, data, BufferLayout.COLUMNS)
+        positions = column_arrays(data, fields)[BodyFields.POSITION]
+
+    .. note::
+        Requires NumPy. NumPy is not a dependency of Pymunk and needs to be
+        installed separately.
+    """
+    import numpy as np
+
+    if isinstance(fields, ShapeFields) and ShapeFields.POLY_VERTICES in fields:
+        raise ValueError(
+            "POLY_VERTICES have a variable length and can not be returned as "
+            "a column array."
+        )
+
+    ints = np.frombuffer(buffers.int_buf(), dtype=np.uintp)
+    floats = np.frombuffer(buffers.float_buf(), dtype=np.float64)
+
+    requested = [
+        (field, is_int, len(columns))
+        for field, (is_int, columns) in _FIELD_COLUMNS.items()
+        if type(field) is type(fields) and field.value & fields.value
+    ]
+    int_width = sum(width for _, is_int, width in requested if is_int)
+    float_width = sum(width for _, is_int, width in requested if not is_int)
+    if int_width > 0:
+        count = len(ints) // int_width
+    elif float_width > 0:
+        count = len(floats) // float_width
+    else:
+        count = 0
+
+    result: dict[Flag, Any] = {}
+    int_start = float_start = 0
+    for field, is_int, width in requested:
+        segment: Any
+        if is_int:
+            segment = ints[int_start : int_start + count * width]
+            int_start += count * width
+        else:
+            segment = floats[float_start : float_start + count * width]
+            float_start += count * width
+        result[field] = segment if width == 1 else segment.reshape(count, width)
+    return result
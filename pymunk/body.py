@@ -17,6 +17,7 @@ from ._typing_attr import TypingAttrMixing
 from ._util import _dead_ref
 from ._weakkeysview import WeakKeysView
 from .vec2d import Vec2d
+from .velocity_integrator import VelocityIntegrator
 
 _BodyType = int
 # Literal only available in Python 3.8 and above
@@ -27,6 +28,20 @@ _PositionFunc = Callable[["Body", float], None]
 _VelocityFunc = Callable[["Body", Vec2d, float, float], None]
 
 
+def _freebody(cp_body: ffi.CData) -> None:
+    # remove all shapes on this body from the space
+    lib.cpBodyEachShape(cp_body, lib.ext_cpBodyShapeIteratorFunc, ffi.NULL)
+
+    # remove all constraints on this body from the space
+    lib.cpBodyEachConstraint(cp_body, lib.ext_cpBodyConstraintIteratorFunc, ffi.NULL)
+
+    cp_space = lib.cpBodyGetSpace(cp_body)
+    # print(cp_space, cp_space == ffi.NULL)
+    if cp_space != ffi.NULL:
+        lib.cpSpaceRemoveBody(cp_space, cp_body)
+    lib.cpBodyFree(cp_body)
+
+
 class Body(PickleMixin, TypingAttrMixing, object):
     """A rigid body
 
@@ -42,8 +57,25 @@ class Body(PickleMixin, TypingAttrMixing, object):
     A Body can be copied and pickled. Sleeping bodies that are copied will be
     awake in the fresh copy. When a Body is copied any spaces, shapes or
     constraints attached to the body will not be copied.
+
+    The internal state of a Body is kept in __slots__. Custom attributes can
+    still be set on a body as usual, but its __dict__ is only allocated when
+    the first custom attribute is set.
     """
 
+    __slots__ = (
+        "_body",
+        "_space",
+        "_constraints",
+        "_shapes",
+        "_data_handle",
+        "_position_func",
+        "_velocity_func",
+        "_velocity_integrator",
+        "__weakref__",
+        "__dict__",
+    )
+
     DYNAMIC: ClassVar[int] = lib.CP_BODY_TYPE_DYNAMIC
     """Dynamic bodies are the default body type.
 
@@ -105,9 +137,6 @@ class Body(PickleMixin, TypingAttrMixing, object):
         # "_space",
     ]
 
-    _position_func: Optional[_PositionFunc] = None
-    _velocity_func: Optional[_VelocityFunc] = None
-
     def __init__(
         self, mass: float = 0, moment: float = 0, body_type: _BodyType = DYNAMIC
     ) -> None:
@@ -190,31 +219,21 @@ class Body(PickleMixin, TypingAttrMixing, object):
 
         """
 
-        def freebody(cp_body: ffi.CData) -> None:
-            # remove all shapes on this body from the space
-            lib.cpBodyEachShape(cp_body, lib.ext_cpBodyShapeIteratorFunc, ffi.NULL)
-
-            # remove all constraints on this body from the space
-            lib.cpBodyEachConstraint(
-                cp_body, lib.ext_cpBodyConstraintIteratorFunc, ffi.NULL
-            )
-
-            cp_space = lib.cpBodyGetSpace(cp_body)
-            # print(cp_space, cp_space == ffi.NULL)
-            if cp_space != ffi.NULL:
-                lib.cpSpaceRemoveBody(cp_space, cp_body)
-            lib.cpBodyFree(cp_body)
-
+        # pmBodyNew allocates room for the parameters of velocity_integrator
         if body_type == Body.DYNAMIC:
-            self._body = ffi.gc(lib.cpBodyNew(mass, moment), freebody)
-        elif body_type == Body.KINEMATIC:
-            self._body = ffi.gc(lib.cpBodyNewKinematic(), freebody)
-        elif body_type == Body.STATIC:
-            self._body = ffi.gc(lib.cpBodyNewStatic(), freebody)
+            self._body = ffi.gc(lib.pmBodyNew(mass, moment), _freebody)
+        elif body_type == Body.KINEMATIC or body_type == Body.STATIC:
+            self._body = ffi.gc(lib.pmBodyNew(0, 0), _freebody)
+            lib.cpBodySetType(self._body, body_type)
 
         self._space: weakref.ref["Space"] = _dead_ref
-        self._constraints: WeakKeyDictionary["Constraint", None] = WeakKeyDictionary()
+        # Created when the first constraint is attached, since most bodies
+        # never have any and a WeakKeyDictionary is large.
+        self._constraints: Optional[WeakKeyDictionary["Constraint", None]] = None
         self._shapes: dict["Shape", None] = {}
+        self._position_func: Optional[_PositionFunc] = None
+        self._velocity_func: Optional[_VelocityFunc] = None
+        self._velocity_integrator: Optional[VelocityIntegrator] = None
 
         d = ffi.new_handle(self)
         self._data_handle = d  # to prevent gc to collect the handle
@@ -443,6 +462,7 @@ class Body(PickleMixin, TypingAttrMixing, object):
 
     @velocity_func.setter
     def velocity_func(self, func: _VelocityFunc) -> None:
+        self._velocity_integrator = None
         if func == Body.update_velocity:
             lib.cpBodySetVelocityUpdateFunc(
                 self._body, ffi.addressof(lib, "cpBodyUpdateVelocity")
@@ -451,6 +471,57 @@ class Body(PickleMixin, TypingAttrMixing, object):
             self._velocity_func = func
             lib.cpBodySetVelocityUpdateFunc(self._body, lib.ext_cpBodyVelocityFunc)
 
+    @property
+    def velocity_integrator(self) -> Optional[VelocityIntegrator]:
+        """The built-in velocity integrator of the body, or None.
+
+        An alternative to :py:attr:`velocity_func` for common cases like per
+        body gravity, gravity toward a point, drag and velocity limits. The
+        velocity is updated in C with the parameters of the
+        :py:class:`VelocityIntegrator`, which is much faster than a Python
+        callback, and also allows :py:class:`SpacePool` to step the space
+        without the GIL.
+
+        Setting a velocity integrator replaces any velocity_func, and setting
+        a velocity_func removes the velocity integrator. Set to None to go
+        back to the default integration.
+
+        >>> import pymunk
+        >>> b = pymunk.Body(1, 1)
+        >>> b.velocity_integrator = pymunk.VelocityIntegrator(
+        ...     gravity=(0, -10), max_velocity=100
+        ... )
+        """
+        return self._velocity_integrator
+
+    @velocity_integrator.setter
+    def velocity_integrator(self, integrator: Optional[VelocityIntegrator]) -> None:
+        previous = self._velocity_integrator
+        self._velocity_integrator = integrator
+        if integrator is None:
+            # Only remove an integrator, a velocity_func is kept
+            if previous is not None:
+                lib.cpBodySetVelocityUpdateFunc(
+                    self._body, ffi.addressof(lib, "cpBodyUpdateVelocity")
+                )
+            return
+
+        self._velocity_func = None
+        lib.pmBodySetVelocityIntegrator(
+            self._body,
+            {
+                "customGravity": integrator.gravity is not None,
+                "gravity": integrator.gravity or (0, 0),
+                "attractor": integrator.attractor,
+                "attractorStrength": integrator.attractor_strength,
+                "linearDrag": integrator.linear_drag,
+                "angularDrag": integrator.angular_drag,
+                "maxVelocity": integrator.max_velocity,
+                "maxAngularVelocity": integrator.max_angular_velocity,
+                "hook": integrator.hook,
+            },
+        )
+
     @property
     def position_func(self) -> _PositionFunc:
         """The position callback function.
@@ -647,7 +718,12 @@ class Body(PickleMixin, TypingAttrMixing, object):
         collected it will automatically be removed from this collection as
         well.
         """
-        return WeakKeysView(self._constraints)
+        return WeakKeysView(self._get_constraints())
+
+    def _get_constraints(self) -> WeakKeyDictionary["Constraint", None]:
+        if self._constraints is None:
+            self._constraints = WeakKeyDictionary()
+        return self._constraints
 
     @property
     def shapes(self) -> KeysView["Shape"]:
@@ -718,6 +794,7 @@ class Body(PickleMixin, TypingAttrMixing, object):
         d["special"].append(("is_sleeping", self.is_sleeping))
         d["special"].append(("_velocity_func", self._velocity_func))
         d["special"].append(("_position_func", self._position_func))
+        d["special"].append(("_velocity_integrator", self._velocity_integrator))
 
         return d
 
@@ -736,3 +813,5 @@ class Body(PickleMixin, TypingAttrMixing, object):
                 self.velocity_func = v
             elif k == "_position_func" and v != None:
                 self.position_func = v
+            elif k == "_velocity_integrator" and v != None:
+                self.velocity_integrator = v
@@ -271,8 +271,8 @@ class Constraint(PickleMixin, TypingAttrMixing, object):
         ), "At least one of the two bodies attached to a constraint must be DYNAMIC."
         self._a = a
         self._b = b
-        a._constraints[self] = None
-        b._constraints[self] = None
+        a._get_constraints()[self] = None
+        b._get_constraints()[self] = None
 
     def __getstate__(self) -> dict[str, list[tuple[str, Any]]]:
         """Return the state of this object
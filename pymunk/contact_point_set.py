@@ -83,3 +83,13 @@ class ContactPointSet(object):
             _p2.distance,
         )
         return cls(normal, (p1, p2))
+
+    @classmethod
+    def _from_contact_data(cls, count: int, data: list[float]) -> "ContactPointSet":
+        # data is the floats written by pmArbiterGetContactData
+        assert count in (1, 2), "This is likely a bug in Pymunk, please report."
+        p1 = ContactPoint(Vec2d(data[2], data[3]), Vec2d(data[4], data[5]), data[6])
+        if count == 1:
+            return cls(Vec2d(data[0], data[1]), (p1,))
+        p2 = ContactPoint(Vec2d(data[7], data[8]), Vec2d(data[9], data[10]), data[11])
+        return cls(Vec2d(data[0], data[1]), (p1, p2))
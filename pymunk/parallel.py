@@ -0,0 +1,327 @@
+"""The parallel module runs spaces in worker processes and makes their batch
+data available to the main process through shared memory.
+
+.. note::
+    This module is highly experimental and will likely change in future Pymunk
+    versions including major, minor and patch versions!
+
+Each worker process owns one or more of the spaces. When stepped the
+workers write the data of each space directly into a block of shared memory
+using the functions in :py:mod:`pymunk.batch`, and the main process reads it
+back as :py:class:`pymunk.batch.Buffer` objects without any pickling or
+copying.
+
+>>> import pymunk, pymunk.batch, pymunk.parallel
+>>> spaces = []
+>>> for x in range(2):
+...     s = pymunk.Space()
+...     s.gravity = 0, -10
+...     b = pymunk.Body(1, 1)
+...     b.position = x, 0
+...     s.add(b)
+...     spaces.append(s)
+>>> with pymunk.parallel.SpaceProcessPool(
+...     spaces, pymunk.batch.BodyFields.POSITION, capacity=(0, 10)
+... ) as pool:
+...     pool.step(0.1, steps=10)
+...     data = pool.bodies(1)
+...     [round(x, 2) for x in memoryview(data.float_buf()).cast("d")]
+[1.0, -4.5]
+
+Note that the spaces are copied to the workers when the pool is created,
+so the space objects in the main process are not updated. Ids like
+:py:attr:`pymunk.Body.id` refer to the objects in the worker process.
+"""
+
+__docformat__ = "reStructuredText"
+
+__all__ = ["SpaceProcessPool"]
+
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from typing import Any, Iterable, Optional
+
+from ._chipmunk_cffi import ffi
+from .batch import (
+    ArbiterFields,
+    BodyFields,
+    Buffer,
+    get_space_arbiters,
+    get_space_bodies,
+    set_space_bodies,
+)
+from .space import Space
+
+# Number of 8 byte values in the header of each space. The header contains
+# the number of values written to each of the 4 output regions.
+_HEADER_SIZE = 4
+
+
+class _Layout(object):
+    """Offsets (in bytes) of the regions of one space in the shared memory."""
+
+    def __init__(
+        self, start: int, capacity: tuple[int, int], arbiter_capacity: tuple[int, int]
+    ) -> None:
+        sizes = [
+            _HEADER_SIZE,
+            capacity[0],
+            capacity[1],
+            arbiter_capacity[0],
+            arbiter_capacity[1],
+            capacity[1],
+        ]
+        self.offsets = []
+        offset = start
+        for size in sizes:
+            self.offsets.append((offset, offset + size * 8))
+            offset += size * 8
+        self.end = offset
+
+
+def _worker(
+    conn: Connection,
+    shm_name: str,
+    jobs: list[tuple[Space, _Layout]],
+    body_fields: BodyFields,
+    arbiter_fields: Optional[ArbiterFields],
+) -> None:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    assert shm.buf is not None
+    _run_worker(conn, shm.buf, jobs, body_fields, arbiter_fields)
+    shm.close()
+
+
+def _run_worker(
+    conn: Connection,
+    buf: memoryview,
+    jobs: list[tuple[Space, _Layout]],
+    body_fields: BodyFields,
+    arbiter_fields: Optional[ArbiterFields],
+) -> None:
+    spaces = []
+    for space, layout in jobs:
+        header, body_ints, body_floats, arb_ints, arb_floats, inputs = [
+            buf[start:end] for start, end in layout.offsets
+        ]
+        # The buffers write directly into the shared memory. Since memory set
+        # with set_int_buf / set_float_buf is never grown, the capacity is
+        # fixed.
+        bodies = Buffer()
+        bodies.set_int_buf(body_ints)
+        bodies.set_float_buf(body_floats)
+        arbiters = Buffer()
+        arbiters.set_int_buf(arb_ints)
+        arbiters.set_float_buf(arb_floats)
+        input_buffer = Buffer()
+        input_buffer.set_float_buf(inputs)
+        spaces.append((space, header.cast("q"), bodies, arbiters, input_buffer))
+
+    while True:
+        msg = conn.recv()
+        if msg[0] == "close":
+            break
+        _, dt, steps, set_fields = msg
+        # An error in one space does not stop the other spaces from being
+        # stepped. The first error is reported when all are done.
+        error = None
+        for space, header, bodies, arbiters, input_buffer in spaces:
+            try:
+                if set_fields is not None:
+                    set_space_bodies(space, set_fields, input_buffer)
+                for _ in range(steps):
+                    space.step(dt)
+                bodies.clear()
+                get_space_bodies(space, body_fields, bodies)
+                header[0], header[1] = bodies.required_size()
+                if arbiter_fields is not None:
+                    arbiters.clear()
+                    get_space_arbiters(space, arbiter_fields, arbiters)
+                    header[2], header[3] = arbiters.required_size()
+            except Exception as e:
+                if error is None:
+                    error = e
+        if error is not None:
+            conn.send(("error", error))
+        else:
+            conn.send(("ok", None))
+
+
+class SpaceProcessPool(object):
+    """Run spaces in worker processes with their data in shared memory.
+
+    The spaces are distributed over the worker processes, which each step
+    their spaces one by one. After each step the body data specified with
+    body_fields (and arbiter data if arbiter_fields is set) is written to
+    shared memory, where it can be read with :py:meth:`bodies` and
+    :py:meth:`arbiters`.
+
+    The data of each space must fit in the given capacities. Make sure to
+    call :py:meth:`close` (or use the pool as a context manager) when done,
+    to stop the workers and free the shared memory.
+    """
+
+    def __init__(
+        self,
+        spaces: Iterable[Space],
+        body_fields: BodyFields,
+        capacity: tuple[int, int],
+        arbiter_fields: Optional[ArbiterFields] = None,
+        arbiter_capacity: tuple[int, int] = (0, 0),
+        processes: Optional[int] = None,
+    ) -> None:
+        """Create the pool and start the worker processes.
+
+        :param spaces: Spaces to run. Copied to the worker processes.
+        :param body_fields: Body fields to write to shared memory each step
+        :param capacity: Max number of (int, float) values of body data per
+            space. The float capacity is also the size of the input area
+            used by the set_fields parameter of :py:meth:`step`.
+        :param arbiter_fields: Arbiter fields to write each step, if any
+        :param arbiter_capacity: Max number of (int, float) values of
+            arbiter data per space
+        :param processes: Number of worker processes. Defaults to the
+            number of CPUs, but never more than the number of spaces.
+        """
+        spaces = list(spaces)
+        assert len(spaces) > 0, "The pool needs at least one space"
+        if processes is None:
+            processes = os.cpu_count() or 1
+        processes = max(1, min(processes, len(spaces)))
+
+        self._layouts = []
+        end = 0
+        for _ in spaces:
+            layout = _Layout(end, capacity, arbiter_capacity)
+            self._layouts.append(layout)
+            end = layout.end
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(end, 1))
+        assert self._shm.buf is not None
+        self._shm.buf[:end] = bytes(end)
+        # Views returned to the user are made from this pointer instead of
+        # from shm.buf, so that the memory can be closed even if the views are
+        # still alive.
+        self._ptr = ffi.from_buffer("char[]", self._shm.buf)
+
+        self._closed = False
+        self._conns: list[Connection] = []
+        self._processes: list[Any] = []
+        for p in range(processes):
+            jobs = [
+                (spaces[i], self._layouts[i]) for i in range(p, len(spaces), processes)
+            ]
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker,
+                args=(child_conn, self._shm.name, jobs, body_fields, arbiter_fields),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+
+    def __len__(self) -> int:
+        return len(self._layouts)
+
+    def __enter__(self) -> "SpaceProcessPool":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def step(
+        self, dt: float, steps: int = 1, set_fields: Optional[BodyFields] = None
+    ) -> None:
+        """Step all spaces steps times with the time step dt and wait for
+        the workers to write the new data.
+
+        If set_fields is set, the body fields are first set on each space
+        with :py:func:`pymunk.batch.set_space_bodies` from the data written
+        to the space's :py:meth:`inputs`.
+
+        If stepping a space raises an exception, the other spaces are still
+        stepped, and the first exception is raised when all are done.
+        """
+        for conn in self._conns:
+            conn.send(("step", dt, steps, set_fields))
+        error = None
+        for conn in self._conns:
+            status, e = conn.recv()
+            if status == "error" and error is None:
+                error = e
+        if error is not None:
+            raise error
+
+    def _view(self, region: tuple[int, int], count: int) -> ffi.buffer:
+        start, _ = region
+        return ffi.buffer(self._ptr + start, count * 8)
+
+    def _header(self, index: int) -> ffi.CData:
+        start, _ = self._layouts[index].offsets[0]
+        return ffi.cast("int64_t *", self._ptr + start)
+
+    def bodies(self, index: int) -> Buffer:
+        """Return the body data of the space with the given index, as written
+        by the last step.
+
+        The returned Buffer is a view of the shared memory, and is updated
+        in place by the next step.
+        """
+        header = self._header(index)
+        offsets = self._layouts[index].offsets
+        buffer = Buffer()
+        buffer.set_int_buf(self._view(offsets[1], header[0]))
+        buffer.set_float_buf(self._view(offsets[2], header[1]))
+        return buffer
+
+    def arbiters(self, index: int) -> Buffer:
+        """Return the arbiter data of the space with the given index, as
+        written by the last step.
+
+        Only available if the pool was created with arbiter_fields.
+        """
+        header = self._header(index)
+        offsets = self._layouts[index].offsets
+        buffer = Buffer()
+        buffer.set_int_buf(self._view(offsets[3], header[2]))
+        buffer.set_float_buf(self._view(offsets[4], header[3]))
+        return buffer
+
+    def inputs(self, index: int) -> "memoryview[float]":
+        """Return a writable float view of the input area of the space with
+        the given index.
+
+        Write data for the set_fields parameter of :py:meth:`step` here,
+        in the same format as :py:func:`pymunk.batch.set_space_bodies`
+        expects.
+        """
+        start, end = self._layouts[index].offsets[5]
+        return memoryview(ffi.buffer(self._ptr + start, end - start)).cast("d")
+
+    def close(self) -> None:
+        """Stop the worker processes and free the shared memory.
+
+        Buffers and views returned from the pool point directly into the
+        shared memory, and must not be used after the pool is closed.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for conn in self._conns:
+            try:
+                conn.send(("close",))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join()
+        for conn in self._conns:
+            conn.close()
+        self._conns = []
+        self._processes = []
+        ffi.release(self._ptr)
+        self._shm.close()
+        self._shm.unlink()
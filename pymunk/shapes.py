@@ -1,7 +1,7 @@
 __docformat__ = "reStructuredText"
 
 import weakref
-from typing import TYPE_CHECKING, Optional, Sequence
+from typing import TYPE_CHECKING, Optional, Sequence, TypeVar
 
 if TYPE_CHECKING:
     from .body import Body
@@ -19,6 +19,19 @@ from .shape_filter import ShapeFilter
 from .transform import Transform
 from .vec2d import Vec2d
 
+_ShapeT = TypeVar("_ShapeT", bound="Shape")
+
+
+def _shapefree(cp_shape: ffi.CData) -> None:
+    cp_space = cp.cpShapeGetSpace(cp_shape)
+    if cp_space != ffi.NULL:
+        cp.cpSpaceRemoveShape(cp_space, cp_shape)
+
+    # cp_body = cp.cpShapeGetBody(cp_shape)
+    # if cp_body != ffi.NULL:
+    #     cp.cpShapeSetBody(cp_shape, ffi.NULL)
+    cp.cpShapeFree(cp_shape)
+
 
 class Shape(PickleMixin, TypingAttrMixing, object):
     """Base class for all the shapes.
@@ -29,8 +42,14 @@ class Shape(PickleMixin, TypingAttrMixing, object):
 
     All the shapes can be copied and pickled. If you copy/pickle a shape, the
     body (if any) will also be copied.
+
+    Like :py:class:`Body` the internal state is kept in __slots__, and the
+    __dict__ of a shape is only allocated when a custom attribute (such as
+    the color used by the debug draw utilities) is set.
     """
 
+    __slots__ = ("_shape", "_body", "_h", "_space", "__weakref__", "__dict__")
+
     _pickle_attrs_init = PickleMixin._pickle_attrs_init + ["body"]
     _pickle_attrs_general = PickleMixin._pickle_attrs_general + [
         "sensor",
@@ -43,14 +62,16 @@ class Shape(PickleMixin, TypingAttrMixing, object):
     ]
     _pickle_attrs_skip = PickleMixin._pickle_attrs_skip + ["mass", "density"]
 
-    _space: weakref.ref["Space"] = _dead_ref
+    _space: weakref.ref["Space"]
 
     def __init__(self, shape: "Shape") -> None:
         self._shape = shape
         assert shape.body != None
         self._body: weakref.ref["Body"] = weakref.ref(shape.body)
+        self._space = _dead_ref
 
     def _init(self, body: Optional["Body"], _shape: ffi.CData) -> None:
+        self._space = _dead_ref
 
         if body is not None:
             self._body = weakref.ref(body)
@@ -58,20 +79,47 @@ class Shape(PickleMixin, TypingAttrMixing, object):
         else:
             self._body = _dead_ref
 
-        def shapefree(cp_shape: ffi.CData) -> None:
-            cp_space = cp.cpShapeGetSpace(cp_shape)
-            if cp_space != ffi.NULL:
-                cp.cpSpaceRemoveShape(cp_space, cp_shape)
-
-            # cp_body = cp.cpShapeGetBody(cp_shape)
-            # if cp_body != ffi.NULL:
-            #     cp.cpShapeSetBody(cp_shape, ffi.NULL)
-            cp.cpShapeFree(cp_shape)
-
-        self._shape = ffi.gc(_shape, shapefree)
+        self._shape = ffi.gc(_shape, _shapefree)
         self._h = ffi.new_handle(self)  # to prevent GC of the handle
         cp.cpShapeSetUserData(self._shape, self._h)
 
+    @classmethod
+    def _init_many(
+        cls: type[_ShapeT], body: "Body", _shapes: ffi.CData, count: int
+    ) -> list[_ShapeT]:
+        # Wrap many shapes created by the same C call on the same body. Same
+        # as _init, but with the per shape Python work kept to a minimum. The
+        # slots are set directly to skip the __setattr__ of TypingAttrMixing.
+        body_ref = weakref.ref(body)
+        new, new_handle, gc = cls.__new__, ffi.new_handle, ffi.gc
+        set_user_data = cp.cpShapeSetUserData
+        set_body, set_shape = Shape._body.__set__, Shape._shape.__set__  # type: ignore
+        set_h, set_space = Shape._h.__set__, Shape._space.__set__  # type: ignore
+        shapes = []
+        for _shape in ffi.unpack(_shapes, count):
+            shape = new(cls)
+            h = new_handle(shape)
+            set_user_data(_shape, h)
+            set_body(shape, body_ref)
+            set_shape(shape, gc(_shape, _shapefree))
+            set_h(shape, h)
+            set_space(shape, _dead_ref)
+            shapes.append(shape)
+        body._shapes.update(dict.fromkeys(shapes))
+        return shapes
+
+    @property
+    def id(self) -> int:
+        """Unique id of the Shape.
+
+        A copy (or pickle) of the Shape will get a new id.
+
+        .. note::
+            Experimental API. Likely to change in future major, minor or point
+            releases.
+        """
+        return int(ffi.cast("uintptr_t", cp.cpShapeGetUserData(self._shape)))
+
     @property
     def mass(self) -> float:
         """The mass of this shape.
@@ -285,7 +333,7 @@ class Shape(PickleMixin, TypingAttrMixing, object):
         info = ffi.new("cpPointQueryInfo *")
         _ = cp.cpShapePointQuery(self._shape, p, info)
 
-        shape = ffi.from_handle(cp.cpShapeGetUserData(info.shape))
+        shape = Shape._from_cp_shape(info.shape)
         assert shape == self, "This is a bug in Pymunk. Please report it."
         return PointQueryInfo(
             self,
@@ -308,7 +356,7 @@ class Shape(PickleMixin, TypingAttrMixing, object):
         info = ffi.new("cpSegmentQueryInfo *")
         r = cp.cpShapeSegmentQuery(self._shape, start, end, radius, info)
         if r:
-            shape = ffi.from_handle(cp.cpShapeGetUserData(info.shape))
+            shape = Shape._from_cp_shape(info.shape)
             assert shape == self, "This is a bug in Pymunk. Please report it."
             return SegmentQueryInfo(
                 self,
@@ -347,7 +395,11 @@ class Shape(PickleMixin, TypingAttrMixing, object):
         """Get Pymunk Shape from a Chipmunk Shape pointer"""
         if not bool(cp_shape):
             return None
-        return ffi.from_handle(cp.cpShapeGetUserData(cp_shape))
+        shape = ffi.from_handle(cp.cpShapeGetUserData(cp_shape))
+        if isinstance(shape, Shape):
+            return shape
+        # Shapes of a StaticGeometry share the handle of the geometry
+        return shape._get_shape(cp_shape)
 
     def __getstate__(self) -> _State:
         """Return the state of this object.
@@ -4,7 +4,7 @@ import math
 import platform
 import weakref
 from collections.abc import KeysView
-from typing import TYPE_CHECKING, Any, Callable, Hashable, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Hashable, Optional, Union
 
 from pymunk.constraints import Constraint
 from pymunk.shape_filter import ShapeFilter
@@ -20,12 +20,13 @@ from .arbiter import Arbiter, _arbiter_from_dict, _arbiter_to_dict
 from .body import Body
 from .query_info import PointQueryInfo, SegmentQueryInfo, ShapeQueryInfo
 from .shapes import Shape
+from .static_geometry import StaticGeometry
 from .vec2d import Vec2d
 
 if TYPE_CHECKING:
     from .bb import BB
 
-_AddableObjects = Union[Body, Shape, Constraint]
+_AddableObjects = Union[Body, Shape, Constraint, StaticGeometry]
 
 
 class Space(PickleMixin, object):
@@ -62,8 +63,20 @@ class Space(PickleMixin, object):
         "collision_bias",
         "collision_persistence",
         "threads",
+        "keep_previous_transforms",
+        "reuse_arbiters",
     ]
 
+    COLLIDE: ClassVar[int] = lib.COLLISION_RULE_COLLIDE
+    """Collision rule where the shapes collide normally. This is the
+    default."""
+    IGNORE: ClassVar[int] = lib.COLLISION_RULE_IGNORE
+    """Collision rule where the shapes do not collide, and no collision
+    callbacks are called for them."""
+    SENSOR: ClassVar[int] = lib.COLLISION_RULE_SENSOR
+    """Collision rule where the shapes do not collide, but the collision
+    callbacks are called as if one of the shapes was a sensor."""
+
     def __init__(self, threaded: bool = False) -> None:
         """Create a new instance of the Space.
 
@@ -122,6 +135,14 @@ class Space(PickleMixin, object):
             {}
         )  # To prevent the gc to collect the callbacks.
 
+        self._reuse_arbiters = False
+
+        # Set by pymunk.batch.set_space_arbiters and set_collision_events,
+        # together with the Buffers it uses to keep them alive.
+        self._global_handler_data: Optional[ffi.CData] = None
+        self._global_handler_buffers: dict[str, Any] = {}
+        self._collision_rules: dict[tuple[int, int], int] = {}
+
         self._post_step_callbacks: dict[Any, Callable[["Space"], None]] = {}
         self._removed_shapes: dict[Shape, None] = {}
 
@@ -129,12 +150,19 @@ class Space(PickleMixin, object):
         self._bodies: dict[Body, None] = {}
         self._static_body: Optional[Body] = None
         self._constraints: dict[Constraint, None] = {}
+        self._static_geometries: dict[StaticGeometry, None] = {}
 
         self._locked = False
+        self._accumulator = 0.0
+        # Transforms of the bodies before the last step. Set when
+        # keep_previous_transforms is enabled.
+        self._previous: Optional[tuple[ffi.CData, ffi.CData, ffi.CData]] = None
 
         self._add_later: set[_AddableObjects] = set()
         self._remove_later: dict[_AddableObjects, None] = dict()
         self._bodies_to_check: set[Body] = set()
+        # Set by pymunk.batch.set_velocity_hook
+        self._velocity_hook: Optional[Callable[["Space", float], None]] = None
 
     @property
     def shapes(self) -> KeysView[Shape]:
@@ -179,6 +207,11 @@ class Space(PickleMixin, object):
         """The constraints added to this space as a KeysView."""
         return self._constraints.keys()
 
+    @property
+    def static_geometries(self) -> KeysView[StaticGeometry]:
+        """The static geometries added to this space as a KeysView."""
+        return self._static_geometries.keys()
+
     def _setup_static_body(self, static_body: Body) -> None:
         static_body._space = weakref.ref(self)
         lib.cpSpaceAddBody(self._space, static_body._body)
@@ -344,13 +377,32 @@ class Space(PickleMixin, object):
         return lib.cpSpaceGetCurrentTimeStep(self._space)
 
     def add(self, *objs: _AddableObjects) -> None:
-        """Add one or many shapes, bodies or constraints (joints) to the space
+        """Add one or many shapes, bodies, constraints (joints) or static
+        geometries to the space
 
         Unlike Chipmunk and earlier versions of pymunk its now allowed to add
         objects even from a callback during the simulation step. However, the
         add will not be performed until the end of the step.
         """
+        self._add(objs, False)
 
+    def add_many(self, *objs: _AddableObjects) -> None:
+        """Add many objects to the space at once, like :py:meth:`add`.
+
+        The shapes are added with a single call, and inserted into the
+        spatial index in a spread out order instead of one by one. This keeps
+        the index balanced also when the shapes are sorted, for example
+        segments along the ground of a level, which makes adding a large
+        level much faster. If most of the static shapes of the space were
+        just added, the static index is rebuilt once.
+
+        Since the spatial index gets another structure than with
+        :py:meth:`add`, the simulation can differ from adding the same
+        objects one by one.
+        """
+        self._add(objs, True)
+
+    def _add(self, objs: tuple[_AddableObjects, ...], bulk: bool) -> None:
         if self._locked:
             self._add_later.update(objs)
             return
@@ -361,18 +413,28 @@ class Space(PickleMixin, object):
             if isinstance(o, Body):
                 self._add_body(o)
 
+        shapes = []
         for o in objs:
             if isinstance(o, Body):
                 pass
             elif isinstance(o, Shape):
-                self._add_shape(o)
+                if bulk:
+                    shapes.append(o)
+                else:
+                    self._add_shape(o)
             elif isinstance(o, Constraint):
                 self._add_constraint(o)
+            elif isinstance(o, StaticGeometry):
+                self._add_static_geometry(o)
             else:
                 raise Exception(f"Unsupported type  {type(o)} of {o}.")
 
+        if shapes:
+            self._add_shapes(shapes)
+
     def remove(self, *objs: _AddableObjects) -> None:
-        """Remove one or many shapes, bodies or constraints from the space
+        """Remove one or many shapes, bodies, constraints or static geometries
+        from the space
 
         Unlike Chipmunk and early versions of Pymunk its allowed to
         remove objects from a collision callback.
@@ -415,6 +477,8 @@ class Space(PickleMixin, object):
                 self._remove_shape(o)
             elif isinstance(o, Constraint):
                 self._remove_constraint(o)
+            elif isinstance(o, StaticGeometry):
+                self._remove_static_geometry(o)
             else:
                 raise Exception(f"Unsupported type  {type(o)} of {o}.")
 
@@ -433,6 +497,27 @@ class Space(PickleMixin, object):
         self._shapes[shape] = None
         lib.cpSpaceAddShape(self._space, shape._shape)
 
+    def _add_shapes(self, shapes: list["Shape"]) -> None:
+        """Adds many shapes to the space with a single call to Chipmunk, which
+        also keeps the spatial index balanced."""
+        assert len(set(shapes)) == len(shapes), "Shape added twice."
+        for shape in shapes:
+            assert shape not in self._shapes, "Shape already added to space."
+            assert (
+                shape.space == None
+            ), "Shape already added to another space. A shape can only be in one space at a time."
+            assert shape.body != None, "The shape's body is not set."
+            assert (
+                shape.body.space == self
+            ), "The shape's body must be added to the space before (or at the same time) as the shape."
+
+        ref = weakref.ref(self)
+        for shape in shapes:
+            shape._space = ref
+            self._shapes[shape] = None
+        cp_shapes = ffi.new("cpShape *[]", [shape._shape for shape in shapes])
+        lib.pmSpaceAddShapes(self._space, cp_shapes, len(shapes))
+
     def _add_body(self, body: "Body") -> None:
         """Adds a body to the space"""
         assert body not in self._bodies, "Body already added to this space."
@@ -455,6 +540,18 @@ class Space(PickleMixin, object):
         self._constraints[constraint] = None
         lib.cpSpaceAddConstraint(self._space, constraint._constraint)
 
+    def _add_static_geometry(self, geometry: "StaticGeometry") -> None:
+        """Adds a static geometry and its body to the space"""
+        assert (
+            geometry not in self._static_geometries
+        ), "Static geometry already added to space."
+        assert geometry.space == None, "Static geometry already added to another space."
+
+        geometry._set_space(self)
+        self._static_geometries[geometry] = None
+        lib.cpSpaceAddBody(self._space, geometry._body._body)
+        lib.pmSpaceAddStaticGeometry(self._space, geometry._geometry)
+
     def _remove_shape(self, shape: "Shape") -> None:
         """Removes a shape from the space"""
         assert shape in self._shapes, "shape not in space, already removed?"
@@ -487,6 +584,18 @@ class Space(PickleMixin, object):
             lib.cpSpaceRemoveConstraint(self._space, constraint._constraint)
         del self._constraints[constraint]
 
+    def _remove_static_geometry(self, geometry: "StaticGeometry") -> None:
+        """Removes a static geometry and its body from the space"""
+        assert (
+            geometry in self._static_geometries
+        ), "static geometry not in space, already removed?"
+        geometry._set_space(None)
+        # During GC at program exit sometimes the body might already be removed. Then skip this step.
+        if lib.cpSpaceContainsBody(self._space, geometry._body._body):
+            lib.pmSpaceRemoveStaticGeometry(self._space, geometry._geometry)
+            lib.cpSpaceRemoveBody(self._space, geometry._body._body)
+        del self._static_geometries[geometry]
+
     def reindex_shape(self, shape: Shape) -> None:
         """Update the collision detection data for a specific shape in the
         space.
@@ -522,6 +631,68 @@ class Space(PickleMixin, object):
         if self.threaded:
             lib.cpHastySpaceSetThreads(self._space, n)
 
+    @property
+    def keep_previous_transforms(self) -> bool:
+        """If set the space keeps the position and angle of each body from
+        before the last step.
+
+        This makes it possible to render the bodies interpolated between the
+        two last steps with
+        :py:func:`pymunk.batch.get_space_bodies_interpolated`, which together
+        with :py:meth:`advance` gives smooth rendering when the frame rate is
+        different from the fixed physics step rate.
+
+        Default False. Storing the transforms has a small cost each step.
+        """
+        return self._previous is not None
+
+    @keep_previous_transforms.setter
+    def keep_previous_transforms(self, keep: bool) -> None:
+        if not keep:
+            self._previous = None
+        elif self._previous is None:
+            int_arr = ffi.gc(lib.pmIntArrayNew(0), lib.pmIntArrayFree)
+            float_arr = ffi.gc(lib.pmFloatArrayNew(0), lib.pmFloatArrayFree)
+            data = ffi.new("pmBatchedData *")
+            data.intArray = int_arr
+            data.floatArray = float_arr
+            self._previous = (data, int_arr, float_arr)
+
+    @property
+    def reuse_arbiters(self) -> bool:
+        """If set the collision callbacks reuse the same Arbiter object for
+        each collision, instead of creating a new one for each call.
+
+        With thousands of contacts per step, creating the Arbiter objects
+        is a noticeable part of the time spent in the callbacks. The values
+        read from the Arbiter (like :py:attr:`Arbiter.shapes` and
+        :py:attr:`Arbiter.contact_point_set`) are cached until the Arbiter is
+        reused.
+
+        Only enable it if the callbacks do not keep the Arbiter after they
+        return, since it will then refer to a different collision.
+
+        Default False.
+        """
+        return self._reuse_arbiters
+
+    @reuse_arbiters.setter
+    def reuse_arbiters(self, reuse: bool) -> None:
+        self._reuse_arbiters = bool(reuse)
+
+    def _get_global_handler_data(self) -> ffi.CData:
+        # The functions of the global collision handler are wrapped by
+        # functions that apply the collision rules, record collision events
+        # and apply arbiter overrides.
+        if self._global_handler_data is None:
+            data = ffi.new("pmGlobalHandlerData *")
+            lib.pmSpaceWrapGlobalHandler(self._space, data)
+            self._global_handler_data = data
+        return self._global_handler_data
+
+    def _previous_data(self) -> ffi.CData:
+        return ffi.NULL if self._previous is None else self._previous[0]
+
     def use_spatial_hash(self, dim: float, count: int) -> None:
         """Switch the space to use a spatial hash instead of the bounding box
         tree.
@@ -555,7 +726,7 @@ class Space(PickleMixin, object):
         """
         lib.cpSpaceUseSpatialHash(self._space, dim, count)
 
-    def step(self, dt: float) -> None:
+    def step(self, dt: float, substeps: int = 1) -> None:
         """Update the space for the given time step.
 
         Using a fixed time step is highly recommended. Doing so will increase
@@ -575,26 +746,108 @@ class Space(PickleMixin, object):
         >>> for x in range(steps): # move simulation forward 0.1 seconds:
         ...     s.step(0.1 / steps)
 
+        The same can be done more efficiently with the substeps parameter,
+        which runs the loop in C:
+
+        >>> s.step(0.1, substeps=10)
+
+        When using substeps, objects added or removed and post step callbacks
+        added during the step are processed once after the last substep,
+        instead of after each of them.
+
+        The GIL is released while the simulation runs, and only taken again
+        to run Python callbacks (if any). This makes it possible to step
+        separate spaces in parallel from several threads. See
+        :doc:`threading` for details.
+
+        :param dt: Time step length
+        :param substeps: Number of steps of length dt / substeps to split
+            the step into
+        """
+        assert substeps > 0, "substeps must be at least 1"
+        self._step(dt / substeps, substeps)
+
+    def advance(self, elapsed: float, dt: float, max_steps: int = 10) -> float:
+        """Advance the simulation by elapsed time using fixed time steps of
+        length dt.
+
+        The time is added to an accumulator in the space, and as many whole
+        steps of length dt as fit are taken. The remaining time is kept
+        until the next call. This is the usual way to run a simulation with a
+        fixed time step from a game loop with a variable frame rate.
+
+        Returns the interpolation alpha, the fraction of a step left in the
+        accumulator (between 0 and 1). It can be used to interpolate the
+        rendered state between the previous and the current step.
+
+        >>> import pymunk
+        >>> s = pymunk.Space()
+        >>> alpha = s.advance(0.025, 0.01)  # Takes 2 steps
+        >>> round(alpha, 2)
+        0.5
+
+        At most max_steps are taken in one call, and any time left over
+        above that is dropped. This prevents the simulation from falling
+        further and further behind if the steps take longer to compute than
+        the time they simulate.
+
+        As with substeps in :py:meth:`step`, objects added or removed and
+        post step callbacks are processed once after all the steps.
+
+        :param elapsed: Time passed since the last call, usually real time
         :param dt: Time step length
+        :param max_steps: Max number of steps to take in one call
         """
+        assert dt > 0, "dt must be larger than 0"
+        self._accumulator += elapsed
+        steps = int(self._accumulator / dt)
+        if steps > max_steps:
+            steps = max_steps
+            self._accumulator = 0.0
+        else:
+            self._accumulator -= steps * dt
+        if steps > 0:
+            self._step(dt, steps)
+        return self._accumulator / dt
+
+    def _step(self, dt: float, steps: int) -> None:
+        # Only the C step when nothing is pending, since the Python overhead
+        # is noticeable for small spaces stepped many times per second.
+        if self._bodies_to_check:
+            self._check_bodies()
+        previous = self._previous_data()
+        self._locked = True
+        try:
+            if self._velocity_hook is None:
+                lib.pmSpaceStepRepeated(self._space, self.threaded, dt, steps, previous)
+            else:
+                # The hook runs before each step, so each step is its own call
+                for _ in range(steps):
+                    self._velocity_hook(self, dt)
+                    lib.pmSpaceStepRepeated(self._space, self.threaded, dt, 1, previous)
+            if self._removed_shapes:
+                self._removed_shapes.clear()
+        finally:
+            self._locked = False
+        if self._add_later or self._remove_later or self._post_step_callbacks:
+            self._end_step()
 
+    def _check_bodies(self) -> None:
         for b in self._bodies_to_check:
             assert b.body_type != Body.DYNAMIC or (
                 b.mass > 0 and b.mass < math.inf and b.moment > 0
             ), f"Dynamic bodies must have a mass > 0 and < inf and moment > 0. {b} has mass {b.mass}, moment {b.moment}."
         self._bodies_to_check.clear()
 
-        try:
-            self._locked = True
-            if self.threaded:
-                lib.cpHastySpaceStep(self._space, dt)
-            else:
-                lib.cpSpaceStep(self._space, dt)
-            self._removed_shapes.clear()
-        finally:
-            self._locked = False
-        self.add(*self._add_later)
-        self._add_later.clear()
+    def _begin_step(self) -> None:
+        if self._bodies_to_check:
+            self._check_bodies()
+        self._locked = True
+
+    def _end_step(self) -> None:
+        if self._add_later:
+            self.add(*self._add_later)
+            self._add_later.clear()
 
         removed = set()
         while self._remove_later:
@@ -712,6 +965,72 @@ class Space(PickleMixin, object):
             ch.data["separate"] = data
         return
 
+    def set_collision_rule(
+        self, collision_type_a: int, collision_type_b: int, rule: int
+    ) -> None:
+        """Set how shapes with collision_type_a and collision_type_b collide.
+
+        rule is one of :py:attr:`COLLIDE` (the default), :py:attr:`IGNORE`
+        or :py:attr:`SENSOR`. The rule applies to both orders of the
+        collision types.
+
+        The rules are checked in C before any collision callback, which is
+        much faster than rejecting the collisions from a begin callback::
+
+            space.set_collision_rule(1, 2, pymunk.Space.IGNORE)
+
+        works like, but does not need to call Python like::
+
+            def begin(arbiter, space, data):
+                arbiter.process_collision = False
+
+            space.on_collision(1, 2, begin=begin)
+
+        except that the ignored collisions do not call any callbacks at all.
+
+        The rules are stored in a matrix, so the collision types must be
+        below 1024. A changed rule applies to collisions that begin after the
+        change, ongoing collisions keep the rule they began with until they
+        separate.
+
+        >>> import pymunk
+        >>> s = pymunk.Space()
+        >>> s.set_collision_rule(1, 2, pymunk.Space.SENSOR)
+        >>> s.collision_rules
+        {(1, 2): 2}
+        """
+        assert (
+            0 <= collision_type_a < 1024 and 0 <= collision_type_b < 1024
+        ), "The collision types must be between 0 and 1023"
+        assert rule in (Space.COLLIDE, Space.IGNORE, Space.SENSOR), "Unknown rule"
+
+        key = min(collision_type_a, collision_type_b), max(
+            collision_type_a, collision_type_b
+        )
+        if rule == Space.COLLIDE:
+            self._collision_rules.pop(key, None)
+        else:
+            self._collision_rules[key] = rule
+
+        size = max([max(pair) + 1 for pair in self._collision_rules], default=0)
+        rules = ffi.new("unsigned char[]", size * size)
+        for (a, b), r in self._collision_rules.items():
+            rules[a * size + b] = rules[b * size + a] = r
+        data = self._get_global_handler_data()
+        data.rules = rules
+        data.rulesSize = size
+        # Keep the matrix alive as long as the space might read from it.
+        self._global_handler_buffers["rules"] = rules
+
+    @property
+    def collision_rules(self) -> dict[tuple[int, int], int]:
+        """The collision rules set with :py:meth:`set_collision_rule`.
+
+        Returned as a dict with the rule of each pair of collision types
+        (lowest type first) that does not use the default COLLIDE rule.
+        """
+        return dict(self._collision_rules)
+
     def add_post_step_callback(
         self,
         callback_function: Callable[
@@ -1025,6 +1344,7 @@ class Space(PickleMixin, object):
 
         d["special"].append(("shapes", list(self.shapes)))
         d["special"].append(("constraints", list(self.constraints)))
+        d["special"].append(("static_geometries", list(self.static_geometries)))
 
         # to avoid circular dep
         from . import empty_callback
@@ -1043,6 +1363,7 @@ class Space(PickleMixin, object):
             handlers.append((k, h))
 
         d["special"].append(("_handlers", handlers))
+        d["special"].append(("collision_rules", self._collision_rules))
 
         d["special"].append(
             ("shapeIDCounter", lib.cpSpaceGetShapeIDCounter(self._space))
@@ -1052,7 +1373,14 @@ class Space(PickleMixin, object):
             ("currentTimeStep", lib.cpSpaceGetCurrentTimeStep(self._space))
         )
 
-        _arbs = self._get_arbiters()
+        # Arbiters involving static geometries are not saved. They are
+        # recreated by the next step, but without their contact history.
+        geometry_bodies = {g._body._body for g in self._static_geometries}
+        _arbs = [
+            _arb
+            for _arb in self._get_arbiters()
+            if _arb.body_a not in geometry_bodies and _arb.body_b not in geometry_bodies
+        ]
         d["special"].append(
             ("arbiters", [_arbiter_to_dict(_arb, self) for _arb in _arbs])
         )
@@ -1089,6 +1417,8 @@ class Space(PickleMixin, object):
                 self.add(*v)
             elif k == "constraints":
                 self.add(*v)
+            elif k == "static_geometries":
+                self.add(*v)
             elif k == "_handlers":
                 for k2, hd in v:
                     begin = pre_solve = post_solve = separate = None
@@ -1128,6 +1458,9 @@ class Space(PickleMixin, object):
                             separate=separate,
                         )
 
+            elif k == "collision_rules":
+                for (a, b), rule in v.items():
+                    self.set_collision_rule(a, b, rule)
             elif k == "stamp":
                 lib.cpSpaceSetTimestamp(self._space, v)
             elif k == "shapeIDCounter":
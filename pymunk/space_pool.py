@@ -0,0 +1,112 @@
+__docformat__ = "reStructuredText"
+
+import os
+from typing import Iterable, Optional
+
+from ._chipmunk_cffi import ffi, lib
+from .space import Space
+
+
+class SpacePool(object):
+    """A fixed group of independent spaces that are stepped together.
+
+    Stepping the pool steps every space in it, spread out over several
+    native threads with the GIL released. This is useful when running many
+    small and independent simulations, for example one space per arena in a
+    game server, and is much faster than calling :py:meth:`Space.step` on
+    each space in a Python loop on a multi core machine.
+
+    Spaces with Python callbacks (collision callbacks, custom velocity or
+    position functions, constraint pre or post solve functions or custom
+    spring force functions) are instead stepped one by one on the calling
+    thread after the others, since the callbacks need the GIL anyway.
+
+    >>> import pymunk
+    >>> spaces = [pymunk.Space() for _ in range(3)]
+    >>> for s in spaces:
+    ...     s.gravity = 0, -10
+    ...     s.add(pymunk.Body(1, 1))
+    >>> pool = pymunk.SpacePool(spaces)
+    >>> pool.step(0.1)
+    >>> [list(s.bodies)[0].velocity for s in pool.spaces]
+    [Vec2d(0.0, -1.0), Vec2d(0.0, -1.0), Vec2d(0.0, -1.0)]
+
+    .. note::
+        Multiple threads are not available on Windows, where the spaces are
+        stepped one by one.
+    """
+
+    def __init__(self, spaces: Iterable[Space], threads: Optional[int] = None) -> None:
+        """Create a pool of the spaces.
+
+        The same space can only be in the pool once, and the spaces should
+        not be stepped or modified from other threads while the pool steps.
+
+        :param spaces: Spaces to step together
+        :param threads: Number of threads to use. Defaults to the number of
+            CPUs.
+        """
+        self._spaces = list(spaces)
+        assert len(set(self._spaces)) == len(
+            self._spaces
+        ), "A space can only be added to the pool once"
+        if threads is None:
+            threads = os.cpu_count() or 1
+        assert threads > 0, "The number of threads must be at least 1"
+        self.threads = threads
+        """Number of threads to use when stepping the spaces."""
+
+        self._cp_spaces = ffi.new("cpSpace *[]", len(self._spaces))
+        self._hasty = ffi.new("int[]", [s.threaded for s in self._spaces])
+        self._previous = ffi.new("pmBatchedData *[]", len(self._spaces))
+
+    @property
+    def spaces(self) -> list[Space]:
+        """The spaces in the pool, in order."""
+        return list(self._spaces)
+
+    def __len__(self) -> int:
+        return len(self._spaces)
+
+    def step(self, dt: float) -> None:
+        """Step all spaces in the pool with the time step dt.
+
+        The result is the same as calling :py:meth:`Space.step` on each of
+        the spaces.
+
+        :param dt: Time step length
+        """
+        native: list[Space] = []
+        with_callbacks: list[Space] = []
+        for space in self._spaces:
+            if space._velocity_hook is not None or lib.pmSpaceHasPythonCallbacks(
+                space._space
+            ):
+                with_callbacks.append(space)
+            else:
+                self._cp_spaces[len(native)] = space._space
+                self._hasty[len(native)] = space.threaded
+                self._previous[len(native)] = space._previous_data()
+                native.append(space)
+
+        try:
+            for space in native:
+                space._begin_step()
+            lib.pmSpaceStepMany(
+                self._cp_spaces,
+                self._hasty,
+                self._previous,
+                len(native),
+                dt,
+                self.threads,
+            )
+            for space in native:
+                space._removed_shapes.clear()
+        finally:
+            for space in native:
+                space._locked = False
+        for space in native:
+            space._end_step()
+
+        for space in with_callbacks:
+            space.step(dt)
@@ -0,0 +1,399 @@
+__docformat__ = "reStructuredText"
+
+import array
+import weakref
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+if TYPE_CHECKING:
+    from .space import Space
+
+from ._chipmunk_cffi import ffi, lib
+from ._pickle import PickleMixin
+from ._util import _check_offsets, _dead_ref
+from .bb import BB
+from .body import Body
+from .shape_filter import ShapeFilter
+from .shapes import Circle, Poly, Segment, Shape
+
+
+def _float_array(data: Any) -> "array.array[float]":
+    arr = array.array("d")
+    arr.frombytes(ffi.buffer(ffi.from_buffer("cpFloat[]", data)))
+    return arr
+
+
+class _GeometryShape(object):
+    """Mixin of the shape objects of a StaticGeometry.
+
+    The properties of the shapes are set on the geometry, so the property
+    setters of the shape objects raise an AttributeError.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if (
+            name[0] != "_"
+            and isinstance(getattr(type(self), name, None), property)
+            and getattr(self, "_geometry", None) is not None
+        ):
+            raise AttributeError(
+                f"The {name} of a shape of a StaticGeometry can not be set, "
+                "set it on the geometry instead"
+            )
+        super().__setattr__(name, value)
+
+
+class _GeometryCircle(_GeometryShape, Circle):
+    __slots__ = ("_geometry",)
+
+
+class _GeometrySegment(_GeometryShape, Segment):
+    __slots__ = ("_geometry",)
+
+
+class _GeometryPoly(_GeometryShape, Poly):
+    __slots__ = ("_geometry",)
+
+
+class StaticGeometry(PickleMixin, object):
+    """Many static shapes of the same kind, owned by a single Python object.
+
+    A StaticGeometry is meant for large amounts of level geometry, like the
+    segments of a terrain, that never change and are rarely inspected from
+    Python. The shapes only exist in Chipmunk and are attached to a static
+    body owned by the geometry, so there is no per shape Python object,
+    handle or weakref, and the geometry is added to and removed from a space
+    as one unit.
+
+    >>> import array, pymunk
+    >>> ground = pymunk.StaticGeometry.from_segments(
+    ...     array.array("d", [0, 0, 10, 0, 10, 0, 20, 5]), radius=1
+    ... )
+    >>> ground.friction = 0.5
+    >>> len(ground)
+    2
+    >>> s = pymunk.Space()
+    >>> s.add(ground)
+    >>> ground.point_query((15, 3), 0, pymunk.ShapeFilter())
+    [1]
+
+    Collisions, queries and debug drawing work as usual. When a shape of the
+    geometry has to be passed to Python, for example in a collision callback
+    or as the result of :py:meth:`pymunk.Space.point_query`, a shape object
+    is created for it on demand. Use :py:meth:`index` to find out which
+    shape of the geometry it is.
+
+    These shape objects share the :py:attr:`pymunk.Shape.id` of the
+    geometry. The shape ids written by :py:mod:`pymunk.batch` (like
+    SHAPE_ID, and the shape ids of batched queries, arbiters and collision
+    events) therefore identify the geometry, but not which of its shapes
+    was involved. Use the query methods of the geometry to get the index of
+    the shapes.
+
+    The properties of the geometry (friction, elasticity and so on) apply to
+    all its shapes, and can not be set on the shape objects one by one.
+    """
+
+    CIRCLES = 0
+    """Geometry of circles"""
+    SEGMENTS = 1
+    """Geometry of segments"""
+    POLYS = 2
+    """Geometry of polygons"""
+
+    _pickle_attrs_init = ["kind", "_data", "_radius", "_offsets"]
+    _pickle_attrs_general = [
+        "friction",
+        "elasticity",
+        "collision_type",
+        "filter",
+        "sensor",
+    ]
+
+    def __init__(
+        self,
+        kind: int,
+        data: Any,
+        radius: Any = 0,
+        offsets: Optional[Sequence[int]] = None,
+    ) -> None:
+        """Create a geometry of the given kind.
+
+        Usually it is more convenient to use :py:meth:`from_circles`,
+        :py:meth:`from_segments` or :py:meth:`from_polys`, where the
+        arguments are described.
+
+        :param kind: One of CIRCLES, SEGMENTS or POLYS
+        :param data: Circle centers, segment endpoints or poly vertices
+        :param radius: Radius of the segments or polys, or an array of the
+            radius of each circle
+        :param offsets: Index of the first vertex of each poly
+        """
+        self._kind = kind
+        self._data = _float_array(data)
+        self._offsets: Optional[list[int]] = None
+        self._body = Body(body_type=Body.STATIC)
+        self._space: weakref.ref["Space"] = _dead_ref
+        self._shapes: dict[int, Shape] = {}
+
+        body = self._body._body
+        data_arr = ffi.from_buffer("cpFloat[]", self._data)
+        if kind == StaticGeometry.CIRCLES:
+            self._radius: Any = _float_array(radius)
+            count = len(self._data) // 2
+            assert len(self._data) == count * 2, "Centers must be x, y pairs"
+            assert len(self._radius) == count, "There must be one radius per circle"
+            cp_geometry = lib.pmStaticGeometryNewCircles(
+                body, data_arr, ffi.from_buffer("cpFloat[]", self._radius), count
+            )
+        elif kind == StaticGeometry.SEGMENTS:
+            self._radius = radius
+            count = len(self._data) // 4
+            assert (
+                len(self._data) == count * 4
+            ), "Endpoints must be ax, ay, bx, by of each segment"
+            cp_geometry = lib.pmStaticGeometryNewSegments(body, data_arr, radius, count)
+        elif kind == StaticGeometry.POLYS:
+            assert offsets is not None, "Polys require offsets"
+            self._radius = radius
+            self._offsets = list(offsets)
+            vertex_count = len(self._data) // 2
+            assert len(self._data) == vertex_count * 2, "Vertices must be x, y pairs"
+            cp_offsets = ffi.new("int[]", self._offsets)
+            _check_offsets(cp_offsets, vertex_count)
+            count = len(cp_offsets)
+            cp_geometry = lib.pmStaticGeometryNewPolys(
+                body, data_arr, vertex_count, cp_offsets, count, radius
+            )
+        else:
+            assert False, f"Unknown kind {kind}"
+
+        self._count = count
+
+        # The finalizer keeps the body alive, so that the shapes are always
+        # freed before their body.
+        def geometryfree(cp_geometry: ffi.CData, body: Body = self._body) -> None:
+            lib.pmStaticGeometryFree(cp_geometry)
+
+        self._geometry = ffi.gc(cp_geometry, geometryfree)
+        self._h = ffi.new_handle(self)
+
+        self._friction = 0.0
+        self._elasticity = 0.0
+        self._collision_type = 0
+        self._filter = ShapeFilter()
+        self._sensor = False
+        self._set_properties()
+
+    @staticmethod
+    def from_circles(centers: Any, radii: Any) -> "StaticGeometry":
+        """Create a geometry of circles.
+
+        centers should be an array of floats with the x and y of the center
+        of each circle, and radii an array of floats with the radius of each
+        circle, both implementing the buffer/memoryview interface like a numpy
+        array or array.array.
+        """
+        return StaticGeometry(StaticGeometry.CIRCLES, centers, radii)
+
+    @staticmethod
+    def from_segments(endpoints: Any, radius: float = 0) -> "StaticGeometry":
+        """Create a geometry of segments.
+
+        endpoints should be an array of floats with ax, ay, bx and by of each
+        segment. All segments get the same radius.
+        """
+        return StaticGeometry(StaticGeometry.SEGMENTS, endpoints, radius)
+
+    @staticmethod
+    def from_polys(
+        vertices: Any, offsets: Sequence[int], radius: float = 0
+    ) -> "StaticGeometry":
+        """Create a geometry of polygons.
+
+        vertices should be an array of floats with the x and y of the vertices
+        of all the polygons after each other, and offsets the index (in
+        vertices, not floats) of the first vertex of each polygon. The last
+        polygon uses the vertices until the end of the array. A convex hull is
+        calculated for each polygon, like :py:class:`pymunk.Poly` does.
+        """
+        return StaticGeometry(StaticGeometry.POLYS, vertices, radius, offsets)
+
+    @property
+    def kind(self) -> int:
+        """The kind of shapes in the geometry, CIRCLES, SEGMENTS or POLYS."""
+        return self._kind
+
+    @property
+    def body(self) -> Body:
+        """The static body the shapes are attached to."""
+        return self._body
+
+    @property
+    def space(self) -> Optional["Space"]:
+        """Get the :py:class:`Space` that the geometry has been added to (or
+        None).
+        """
+        return self._space()
+
+    @property
+    def id(self) -> int:
+        """Unique id of the geometry, shared by all its shapes.
+
+        .. note::
+            Experimental API. Likely to change in future major, minor or point
+            releases.
+        """
+        return int(ffi.cast("uintptr_t", self._h))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _set_properties(self) -> None:
+        lib.pmStaticGeometrySetProperties(
+            self._geometry,
+            self._h,
+            self._friction,
+            self._elasticity,
+            self._collision_type,
+            self._filter,
+            self._sensor,
+        )
+
+    @property
+    def friction(self) -> float:
+        """Friction coefficient of the shapes. See :py:attr:`Shape.friction`"""
+        return self._friction
+
+    @friction.setter
+    def friction(self, u: float) -> None:
+        self._friction = u
+        self._set_properties()
+
+    @property
+    def elasticity(self) -> float:
+        """Elasticity of the shapes. See :py:attr:`Shape.elasticity`"""
+        return self._elasticity
+
+    @elasticity.setter
+    def elasticity(self, e: float) -> None:
+        self._elasticity = e
+        self._set_properties()
+
+    @property
+    def collision_type(self) -> int:
+        """Collision type of the shapes. See :py:attr:`Shape.collision_type`"""
+        return self._collision_type
+
+    @collision_type.setter
+    def collision_type(self, t: int) -> None:
+        self._collision_type = t
+        self._set_properties()
+
+    @property
+    def filter(self) -> ShapeFilter:
+        """Collision filter of the shapes. See :py:attr:`Shape.filter`"""
+        return self._filter
+
+    @filter.setter
+    def filter(self, f: ShapeFilter) -> None:
+        self._filter = f
+        self._set_properties()
+
+    @property
+    def sensor(self) -> bool:
+        """If the shapes are sensors. See :py:attr:`Shape.sensor`"""
+        return self._sensor
+
+    @sensor.setter
+    def sensor(self, is_sensor: bool) -> None:
+        self._sensor = bool(is_sensor)
+        self._set_properties()
+
+    def __getitem__(self, index: int) -> Shape:
+        """Get a shape object for the shape at index.
+
+        The object is created the first time, and then reused.
+        """
+        assert 0 <= index < self._count, "Index out of range"
+        shape = self._shapes.get(index)
+        if shape is None:
+            cls: Any = (_GeometryCircle, _GeometrySegment, _GeometryPoly)[self._kind]
+            shape = cls.__new__(cls)
+            shape._shape = lib.pmStaticGeometryGetShape(self._geometry, index)
+            shape._body = weakref.ref(self._body)
+            shape._h = self._h
+            shape._space = self._space
+            # Keeps the geometry, which owns the memory of the shape, alive
+            shape._geometry = self
+            self._shapes[index] = shape
+        return shape
+
+    def _get_shape(self, cp_shape: ffi.CData) -> Shape:
+        return self[lib.pmStaticGeometryGetIndex(self._geometry, cp_shape)]
+
+    def index(self, shape: Shape) -> int:
+        """Return the index of the shape in the geometry.
+
+        Raises ValueError if the shape is not part of the geometry.
+        """
+        index = lib.pmStaticGeometryGetIndex(self._geometry, shape._shape)
+        if index < 0:
+            raise ValueError(f"{shape} is not part of the geometry")
+        return index
+
+    def _set_space(self, space: Optional["Space"]) -> None:
+        self._space = _dead_ref if space is None else weakref.ref(space)
+        self._body._space = self._space
+        for shape in self._shapes.values():
+            shape._space = self._space
+
+    def _query(self, func: Any, *args: Any) -> list[int]:
+        space = self.space
+        assert space is not None, "The geometry must be added to a space"
+        indices = ffi.gc(lib.pmIntArrayNew(0), lib.pmIntArrayFree)
+        func(space._space, self._geometry, *args, indices)
+        return ffi.unpack(indices.arr, indices.num)
+
+    def point_query(
+        self, point: tuple[float, float], max_distance: float, shape_filter: ShapeFilter
+    ) -> list[int]:
+        """Return the index of each shape of the geometry within
+        max_distance of point.
+
+        Works like :py:meth:`pymunk.Space.point_query` limited to the
+        geometry, which must be added to a space.
+        """
+        assert len(point) == 2
+        return self._query(
+            lib.pmStaticGeometryPointQuery, point, max_distance, shape_filter
+        )
+
+    def segment_query(
+        self,
+        start: tuple[float, float],
+        end: tuple[float, float],
+        radius: float,
+        shape_filter: ShapeFilter,
+    ) -> list[int]:
+        """Return the index of each shape of the geometry along the line
+        segment from start to end.
+
+        Works like :py:meth:`pymunk.Space.segment_query` limited to the
+        geometry, which must be added to a space.
+        """
+        assert len(start) == 2
+        assert len(end) == 2
+        return self._query(
+            lib.pmStaticGeometrySegmentQuery, start, end, radius, shape_filter
+        )
+
+    def bb_query(self, bb: BB, shape_filter: ShapeFilter) -> list[int]:
+        """Return the index of each shape of the geometry with a bounding box
+        that overlaps bb.
+
+        Works like :py:meth:`pymunk.Space.bb_query` limited to the geometry,
+        which must be added to a space.
+        """
+        return self._query(lib.pmStaticGeometryBBQuery, bb, shape_filter)
@@ -333,6 +333,48 @@ class UnitTestArbiter(unittest.TestCase):
         s.step(0.1)
         self.assertTrue(self.called)
 
+    def testReuseArbiters(self) -> None:
+        s = p.Space()
+        s.reuse_arbiters = True
+        s.gravity = 0, -100
+
+        static_shapes = []
+        for x in [0, 30]:
+            b = p.Body(1, 30)
+            c = p.Circle(b, 10)
+            b.position = x + 5, 3
+            c.collision_type = 1
+            static = p.Circle(s.static_body, 10, (x, 0))
+            static.collision_type = 2
+            static_shapes.append(static)
+            s.add(b, c, static)
+
+        arbiters: list[p.Arbiter] = []
+        shapes: list[tuple[p.Shape, p.Shape]] = []
+
+        def pre_solve(arb: p.Arbiter, space: p.Space, data: Any) -> None:
+            arbiters.append(arb)
+            shapes.append(arb.shapes)
+            self.assertIs(arb.shapes, arb.shapes)
+            self.assertIs(arb.contact_point_set, arb.contact_point_set)
+            self.assertEqual(arb.contact_point_set.normal, arb.normal)
+
+        s.on_collision(1, 2, pre_solve=pre_solve)
+        s.step(0.1)
+
+        self.assertEqual(len(arbiters), 2)
+        self.assertIs(arbiters[0], arbiters[1])
+        self.assertEqual({b for _, b in shapes}, set(static_shapes))
+
+        s.reuse_arbiters = False
+        arbiters.clear()
+        s.step(0.1)
+        self.assertIsNot(arbiters[0], arbiters[1])
+
+        s.reuse_arbiters = True
+        s2 = s.copy()
+        self.assertTrue(s2.reuse_arbiters)
+
     def testProcessCollision(self) -> None:
 
         def setup() -> p.Space:
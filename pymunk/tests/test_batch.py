@@ -1,8 +1,15 @@
 import array
+import math
 import unittest
 
 import pymunk
 import pymunk.batch
+from pymunk._chipmunk_cffi import lib
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
 
 
 class UnitTestBatch(unittest.TestCase):
@@ -21,6 +28,41 @@ class UnitTestBatch(unittest.TestCase):
         b.set_float_buf(array.array("d", [5.6, 7.8]))
         self.assertEqual([5.6, 7.8], list(memoryview(b.float_buf()).cast("d")))
 
+    def test_buffer_capacity(self) -> None:
+        s = pymunk.Space()
+        for x in range(3):
+            b = pymunk.Body(1, 1)
+            b.position = x, 0
+            s.add(b)
+        fields = pymunk.batch.BodyFields.BODY_ID | pymunk.batch.BodyFields.POSITION
+
+        data = pymunk.batch.Buffer(capacity=(3, 6))
+        float_arr = data._float_arr.arr
+        pymunk.batch.get_space_bodies(s, fields, data)
+        self.assertEqual(data.required_size(), (3, 6))
+        self.assertEqual(
+            list(memoryview(data.float_buf()).cast("d")), [0, 0, 1, 0, 2, 0]
+        )
+        # The capacity is reserved once and never reallocated
+        self.assertEqual(data._float_arr.arr, float_arr)
+
+        data.clear()
+        s.add(pymunk.Body(1, 1))
+        with self.assertRaises(BufferError):
+            pymunk.batch.get_space_bodies(s, fields, data)
+        self.assertEqual(data.required_size(), (4, 8))
+        self.assertEqual(len(memoryview(data.int_buf()).cast("P")), 3)
+        self.assertEqual(len(memoryview(data.float_buf()).cast("d")), 6)
+        self.assertEqual(data._float_arr.arr, float_arr)
+
+        # A user supplied buffer is not grown either
+        data = pymunk.batch.Buffer()
+        data.set_float_buf(array.array("d", [0] * 4))
+        data.clear()
+        with self.assertRaises(BufferError):
+            pymunk.batch.get_space_bodies(s, fields, data)
+        self.assertEqual(data.required_size(), (4, 8))
+
     def test_empty(self) -> None:
         s = pymunk.Space()
 
@@ -287,3 +329,773 @@ class UnitTestBatch(unittest.TestCase):
             list(memoryview(data.float_buf()).cast("d")),
             [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
         )
+
+    def test_get_shapes(self) -> None:
+        s = pymunk.Space()
+
+        b1 = pymunk.Body(1, 1)
+        b1.position = 1, 2
+        c = pymunk.Circle(b1, 3, (1, 0))
+        s.add(b1, c)
+
+        b2 = pymunk.Body(1, 1)
+        b2.position = 10, 20
+        b2.angle = math.pi / 2
+        seg = pymunk.Segment(b2, (0, 0), (2, 0), 4)
+        p = pymunk.Poly(b2, [(0, 0), (1, 0), (0, 1)], radius=5)
+        s.add(b2, seg, p)
+
+        data = pymunk.batch.Buffer()
+        pymunk.batch.get_space_shapes(
+            s,
+            pymunk.batch.ShapeFields.SHAPE_ID
+            | pymunk.batch.ShapeFields.BODY_ID
+            | pymunk.batch.ShapeFields.SHAPE_TYPE,
+            data,
+        )
+        self.assertEqual(list(memoryview(data.float_buf()).cast("d")), [])
+        ints = list(memoryview(data.int_buf()).cast("P"))
+        self.assertCountEqual(
+            [tuple(ints[i : i + 3]) for i in range(0, len(ints), 3)],
+            [(c.id, b1.id, 0), (seg.id, b2.id, 1), (p.id, b2.id, 2)],
+        )
+
+        def get_all(shape: pymunk.Shape) -> tuple[list[int], list[float]]:
+            data.clear()
+            space = pymunk.Space()
+            body = shape.body
+            assert body is not None
+            space.add(body, shape)
+            pymunk.batch.get_space_shapes(space, pymunk.batch.ShapeFields.ALL, data)
+            ints = list(memoryview(data.int_buf()).cast("P"))
+            floats = [round(x, 5) for x in memoryview(data.float_buf()).cast("d")]
+            space.remove(body, shape)
+            return ints, floats
+
+        def bb(shape: pymunk.Shape) -> list[float]:
+            bb = shape.cache_bb()
+            return [round(x, 5) for x in (bb.left, bb.bottom, bb.right, bb.top)]
+
+        s.remove(b1, c, b2, seg, p)
+
+        ints, floats = get_all(c)
+        self.assertEqual(ints, [c.id, b1.id, 0, 0])
+        self.assertEqual(floats, bb(c) + [3, 2, 2, 0, 0, 0, 0])
+
+        ints, floats = get_all(seg)
+        self.assertEqual(ints, [seg.id, b2.id, 1, 0])
+        self.assertEqual(floats, bb(seg) + [4, 0, 0, 10, 20, 10, 22])
+
+        ints, floats = get_all(p)
+        self.assertEqual(ints, [p.id, b2.id, 2, 3])
+        self.assertEqual(floats, bb(p) + [5, 0, 0, 0, 0, 0, 0, 10, 20, 10, 21, 9, 20])
+
+    def test_set_arbiters(self) -> None:
+        def setup() -> tuple[pymunk.Space, pymunk.Body]:
+            s = pymunk.Space()
+            s.gravity = 0, -10
+            ground = pymunk.Segment(s.static_body, (-100, 0), (100, 0), 1)
+            ground.friction = 1
+            b = pymunk.Body(1, 10)
+            b.position = 0, 6
+            b.velocity = 10, 0
+            box = pymunk.Poly.create_box(b, (10, 10))
+            box.friction = 1
+            s.add(ground, b, box)
+            s.step(0.01)
+            return s, b
+
+        s1, b1 = setup()
+        s2, b2 = setup()
+
+        fields = (
+            pymunk.batch.ArbiterFields.RESTITUTION
+            | pymunk.batch.ArbiterFields.FRICTION
+            | pymunk.batch.ArbiterFields.SURFACE_VELOCITY
+        )
+        # Not part of ALL, to keep the layout of ALL unchanged
+        self.assertFalse(fields & pymunk.batch.ArbiterFields.ALL)
+        data = pymunk.batch.Buffer()
+        pymunk.batch.get_space_arbiters(s2, fields, data)
+        self.assertEqual(list(memoryview(data.float_buf()).cast("d")), [0, 1, 0, 0])
+
+        pre_solve_calls = []
+        s2.on_collision(
+            pre_solve=lambda arb, space, data: pre_solve_calls.append(arb.friction)
+        )
+
+        data.set_float_buf(array.array("d", [0.5, 0, 1, 2]))
+        pymunk.batch.set_space_arbiters(s2, fields, data)
+        # The Python pre_solve is found behind the function that applies the
+        # values
+        self.assertTrue(lib.pmSpaceHasPythonCallbacks(s2._space))
+        start_velocity = b2.velocity.x
+
+        for _ in range(10):
+            s1.step(0.01)
+            s2.step(0.01)
+
+        # Without friction the box keeps sliding
+        self.assertLess(b1.velocity.x, start_velocity - 0.5)
+        self.assertAlmostEqual(b2.velocity.x, start_velocity)
+        self.assertEqual(pre_solve_calls, [0] * 10)
+
+        # The values were copied, so reusing the buffer does not change them
+        data.clear()
+        pymunk.batch.get_space_arbiters(s2, pymunk.batch.ArbiterFields.TOTAL_KE, data)
+        s2.step(0.01)
+        data = pymunk.batch.Buffer()
+        pymunk.batch.get_space_arbiters(s2, fields, data)
+        self.assertEqual(list(memoryview(data.float_buf()).cast("d")), [0.5, 0, 1, 2])
+
+    def test_collision_events(self) -> None:
+        s = pymunk.Space()
+        s.gravity = 0, -100
+        ground = pymunk.Segment(s.static_body, (-100, 0), (100, 0), 1)
+        ground.collision_type = 1
+        b = pymunk.Body(1, 10)
+        b.position = 0, 3
+        c = pymunk.Circle(b, 1)
+        c.collision_type = 2
+        s.add(ground, b, c)
+
+        begins = []
+        s.on_collision(begin=lambda arb, space, data: begins.append(arb.shapes))
+
+        events = pymunk.batch.Buffer()
+        pymunk.batch.set_collision_events(s, pymunk.batch.CollisionEvents.ALL, events)
+        self.assertTrue(lib.pmSpaceHasPythonCallbacks(s._space))
+
+        for _ in range(20):
+            s.step(0.01)
+        s.remove(c)
+
+        ints = list(memoryview(events.int_buf()).cast("P"))
+        floats = list(memoryview(events.float_buf()).cast("d"))
+        self.assertEqual(len(ints) // 7, len(floats) // 6)
+        kinds = ints[::7]
+        begin = pymunk.batch.CollisionEvents.BEGIN.value
+        post_solve = pymunk.batch.CollisionEvents.POST_SOLVE.value
+        separate = pymunk.batch.CollisionEvents.SEPARATE.value
+        self.assertEqual(kinds[0], begin)
+        self.assertEqual(kinds[-1], separate)
+        self.assertEqual(set(kinds[1:-1]), {post_solve})
+        # The wrapped Python callback of the global handler is still called
+        self.assertEqual(len(begins), 1)
+
+        a, b_ = begins[0]
+        assert a.body is not None and b_.body is not None
+        self.assertEqual(
+            ints[1:7],
+            [a.id, b_.id, a.body.id, b_.body.id, a.collision_type, b_.collision_type],
+        )
+        impulse_y = floats[len(floats) - 12 + 1]
+        self.assertGreater(abs(impulse_y), 0)
+        self.assertEqual(floats[:2], [0, 0])
+        self.assertAlmostEqual(abs(floats[3]), 1)
+        # Both the ground and the circle surface are at y = 1
+        self.assertAlmostEqual(floats[5], 1, delta=0.2)
+
+        events.clear()
+        pymunk.batch.set_collision_events(s, pymunk.batch.CollisionEvents.ALL, None)
+        s.add(c)
+        s.step(0.01)
+        self.assertEqual(events.required_size(), (0, 0))
+
+    def test_collision_events_without_callbacks(self) -> None:
+        s = pymunk.Space()
+        b = pymunk.Body(1, 10)
+        s.add(b, pymunk.Circle(b, 1), pymunk.Circle(s.static_body, 1))
+
+        events = pymunk.batch.Buffer(capacity=7)
+        pymunk.batch.set_collision_events(
+            s, pymunk.batch.CollisionEvents.POST_SOLVE, events
+        )
+        self.assertFalse(lib.pmSpaceHasPythonCallbacks(s._space))
+        s.step(0.01)
+        s.step(0.01)
+        self.assertEqual(len(memoryview(events.int_buf()).cast("P")), 7)
+        self.assertEqual(events.required_size(), (14, 12))
+
+        # Events that do not fit are dropped whole
+        events = pymunk.batch.Buffer(capacity=10)
+        pymunk.batch.set_collision_events(
+            s, pymunk.batch.CollisionEvents.POST_SOLVE, events
+        )
+        for _ in range(3):
+            s.step(0.01)
+        self.assertEqual(len(memoryview(events.int_buf()).cast("P")), 7)
+        self.assertEqual(len(memoryview(events.float_buf()).cast("d")), 6)
+        self.assertEqual(events.required_size(), (21, 18))
+
+        s.on_collision(separate=lambda arb, space, data: None)
+        self.assertTrue(lib.pmSpaceHasPythonCallbacks(s._space))
+
+    def test_body_group(self) -> None:
+        s = pymunk.Space()
+        bodies = []
+        for x in range(5):
+            b = pymunk.Body(1, 1)
+            b.position = x, 0
+            s.add(b)
+            bodies.append(b)
+
+        group = pymunk.batch.BodyGroup([bodies[3], bodies[1]])
+        self.assertEqual(len(group), 2)
+        self.assertEqual(group.bodies, [bodies[3], bodies[1]])
+
+        data = pymunk.batch.Buffer()
+        pymunk.batch.get_body_group(
+            group,
+            pymunk.batch.BodyFields.BODY_ID | pymunk.batch.BodyFields.POSITION,
+            data,
+        )
+        self.assertEqual(
+            list(memoryview(data.int_buf()).cast("P")), [bodies[3].id, bodies[1].id]
+        )
+        self.assertEqual(list(memoryview(data.float_buf()).cast("d")), [3, 0, 1, 0])
+
+        data.set_float_buf(array.array("d", [10, 11, 0.5, 12, 13, 1.5]))
+        pymunk.batch.set_body_group(
+            group,
+            pymunk.batch.BodyFields.POSITION | pymunk.batch.BodyFields.ANGLE,
+            data,
+        )
+        self.assertEqual(bodies[3].position, (10, 11))
+        self.assertEqual(bodies[3].angle, 0.5)
+        self.assertEqual(bodies[1].position, (12, 13))
+        self.assertEqual(bodies[1].angle, 1.5)
+        self.assertEqual(bodies[0].position, (0, 0))
+        self.assertEqual(bodies[2].position, (2, 0))
+        self.assertEqual(bodies[4].position, (4, 0))
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_structured_arrays(self) -> None:
+        s = pymunk.Space()
+        b1 = pymunk.Body(1, 1)
+        b1.position = 1, 2
+        b1.angle = 3
+        b2 = pymunk.Body(1, 1)
+        b2.position = 4, 5
+        b2.angle = 6
+        s.add(b1, b2)
+
+        fields = (
+            pymunk.batch.BodyFields.BODY_ID
+            | pymunk.batch.BodyFields.POSITION
+            | pymunk.batch.BodyFields.ANGLE
+        )
+        data = pymunk.batch.Buffer()
+        pymunk.batch.get_space_bodies(s, fields, data)
+
+        ints, floats = pymunk.batch.structured_arrays(data, fields)
+        self.assertEqual(ints.dtype.names, ("body_id",))
+        self.assertEqual(floats.dtype.names, ("position_x", "position_y", "angle"))
+        self.assertEqual(list(ints["body_id"]), [b1.id, b2.id])
+        self.assertEqual(list(floats["position_x"]), [1, 4])
+        self.assertEqual(list(floats["position_y"]), [2, 5])
+        self.assertEqual(list(floats["angle"]), [3, 6])
+
+        # The arrays are views of the buffer
+        floats["angle"] = 7
+        pymunk.batch.set_space_bodies(s, fields, data)
+        self.assertEqual(b1.angle, 7)
+        self.assertEqual(b2.angle, 7)
+
+        int_dtype, float_dtype = pymunk.batch.structured_dtypes(
+            pymunk.batch.ShapeFields.SHAPE_ID | pymunk.batch.ShapeFields.BB
+        )
+        self.assertEqual(int_dtype.names, ("shape_id",))
+        self.assertEqual(
+            float_dtype.names, ("bb_left", "bb_bottom", "bb_right", "bb_top")
+        )
+        with self.assertRaises(ValueError):
+            pymunk.batch.structured_dtypes(pymunk.batch.ShapeFields.ALL)
+
+        ints, floats = pymunk.batch.structured_arrays(
+            pymunk.batch.Buffer(), pymunk.batch.BodyFields.BODY_ID
+        )
+        self.assertEqual(len(ints), 0)
+        self.assertEqual(len(floats), 0)
+
+    def test_columns_layout(self) -> None:
+        s = pymunk.Space()
+        b1 = pymunk.Body(1, 1)
+        b1.position = 1, 2
+        b1.angle = 3
+        b2 = pymunk.Body(1, 1)
+        b2.position = 4, 5
+        b2.angle = 6
+        s.add(b1, b2)
+
+        fields = (
+            pymunk.batch.BodyFields.BODY_ID
+            | pymunk.batch.BodyFields.POSITION
+            | pymunk.batch.BodyFields.ANGLE
+        )
+        columns = pymunk.batch.BufferLayout.COLUMNS
+        data = pymunk.batch.Buffer()
+        pymunk.batch.get_space_bodies(s, fields, data, columns)
+        self.assertEqual(list(memoryview(data.int_buf()).cast("P")), [b1.id, b2.id])
+        self.assertEqual(
+            list(memoryview(data.float_buf()).cast("d")), [1, 2, 4, 5, 3, 6]
+        )
+
+        data.set_float_buf(array.array("d", [10, 11, 12, 13, 0.5, 1.5]))
+        pymunk.batch.set_space_bodies(
+            s,
+            pymunk.batch.BodyFields.POSITION | pymunk.batch.BodyFields.ANGLE,
+            data,
+            columns,
+        )
+        self.assertEqual(b1.position, (10, 11))
+        self.assertEqual(b2.position, (12, 13))
+        self.assertEqual(b1.angle, 0.5)
+        self.assertEqual(b2.angle, 1.5)
+
+        group = pymunk.batch.BodyGroup([b2, b1])
+        data = pymunk.batch.Buffer()
+        pymunk.batch.get_body_group(group, fields, data, columns)
+        self.assertEqual(
+            list(memoryview(data.float_buf()).cast("d")), [12, 13, 10, 11, 1.5, 0.5]
+        )
+
+        s.add(pymunk.Circle(b1, 5), pymunk.Circle(b2, 5))
+        s.step(0.1)
+        data = pymunk.batch.Buffer()
+        pymunk.batch.get_space_arbiters(
+            s,
+            pymunk.batch.ArbiterFields.BODY_A_ID
+            | pymunk.batch.ArbiterFields.BODY_B_ID
+            | pymunk.batch.ArbiterFields.CONTACT_COUNT,
+            data,
+            columns,
+        )
+        ints = list(memoryview(data.int_buf()).cast("P"))
+        self.assertEqual(len(ints), 3)
+        self.assertEqual(set(ints[:2]), {b1.id, b2.id})
+        self.assertEqual(ints[2], 1)
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_column_arrays(self) -> None:
+        s = pymunk.Space()
+        b1 = pymunk.Body(1, 1)
+        b1.position = 1, 2
+        b1.angle = 3
+        b2 = pymunk.Body(1, 1)
+        b2.position = 4, 5
+        b2.angle = 6
+        s.add(b1, b2)
+
+        fields = (
+            pymunk.batch.BodyFields.BODY_ID
+            | pymunk.batch.BodyFields.POSITION
+            | pymunk.batch.BodyFields.ANGLE
+        )
+        data = pymunk.batch.Buffer()
+        pymunk.batch.get_space_bodies(
+            s, fields, data, pymunk.batch.BufferLayout.COLUMNS
+        )
+
+        arrays = pymunk.batch.column_arrays(data, fields)
+        self.assertEqual(list(arrays[pymunk.batch.BodyFields.BODY_ID]), [b1.id, b2.id])
+        self.assertEqual(
+            arrays[pymunk.batch.BodyFields.POSITION].tolist(), [[1, 2], [4, 5]]
+        )
+        self.assertEqual(list(arrays[pymunk.batch.BodyFields.ANGLE]), [3, 6])
+
+        # The arrays are views of the buffer
+        arrays[pymunk.batch.BodyFields.ANGLE][:] = 7
+        pymunk.batch.set_space_bodies(
+            s, fields, data, pymunk.batch.BufferLayout.COLUMNS
+        )
+        self.assertEqual(b1.angle, 7)
+        self.assertEqual(b2.angle, 7)
+
+    def test_queries(self) -> None:
+        s = pymunk.Space()
+        c1 = pymunk.Circle(s.static_body, 5, (0, 0))
+        c2 = pymunk.Circle(s.static_body, 5, (20, 0))
+        s.add(c1, c2)
+        f = pymunk.ShapeFilter()
+
+        data = pymunk.batch.Buffer()
+        points = [0, 1, 100, 100, 22, 0]
+        pymunk.batch.space_point_query(s, array.array("d", points), 1, f, data)
+        ints = list(memoryview(data.int_buf()).cast("P"))
+        floats = list(memoryview(data.float_buf()).cast("d"))
+        self.assertEqual(ints, [0, c1.id, 2, c2.id])
+        hit = s.point_query((22, 0), 1, f)[0]
+        self.assertEqual(
+            floats[5:], [hit.point.x, hit.point.y, hit.distance, *hit.gradient]
+        )
+
+        data.clear()
+        segments = [-10, 0, 30, 0, 0, 10, 0, 20]
+        pymunk.batch.space_segment_query(s, array.array("d", segments), 0, f, data)
+        ints = list(memoryview(data.int_buf()).cast("P"))
+        floats = list(memoryview(data.float_buf()).cast("d"))
+        self.assertEqual(sorted(ints[1::2]), sorted([c1.id, c2.id]))
+        self.assertEqual(ints[0::2], [0, 0])
+        expected = {
+            h.shape.id: [*h.point, *h.normal, h.alpha]
+            for h in s.segment_query((-10, 0), (30, 0), 0, f)
+        }
+        self.assertEqual(floats[0:5], expected[ints[1]])
+        self.assertEqual(floats[5:10], expected[ints[3]])
+
+        data.clear()
+        bbs = [-1, -1, 1, 1, 10, -1, 11, 1, -10, -10, 30, 10]
+        pymunk.batch.space_bb_query(s, array.array("d", bbs), f, data)
+        ints = list(memoryview(data.int_buf()).cast("P"))
+        self.assertEqual(ints[:2], [0, c1.id])
+        self.assertEqual(ints[2::2], [2, 2])
+        self.assertEqual(sorted(ints[3::2]), sorted([c1.id, c2.id]))
+        self.assertEqual(len(data.float_buf()), 0)
+
+    def test_segment_query_first(self) -> None:
+        s = pymunk.Space()
+        c1 = pymunk.Circle(s.static_body, 5, (0, 0))
+        c2 = pymunk.Circle(s.static_body, 5, (20, 0))
+        s.add(c1, c2)
+        f = pymunk.ShapeFilter()
+
+        data = pymunk.batch.Buffer()
+        segments = [-10, 0, 30, 0, 0, 10, 0, 20, 30, 0, -10, 0]
+        pymunk.batch.space_segment_query_first(
+            s, array.array("d", segments), 0, f, data
+        )
+        ints = list(memoryview(data.int_buf()).cast("P"))
+        floats = list(memoryview(data.float_buf()).cast("d"))
+        self.assertEqual(ints, [1, c1.id, 0, 0, 1, c2.id])
+
+        hit = s.segment_query_first((-10, 0), (30, 0), 0, f)
+        assert hit is not None
+        self.assertEqual(floats[0:5], [*hit.point, *hit.normal, hit.alpha])
+        self.assertEqual(floats[5:10], [0, 20, 0, 0, 1])
+        self.assertEqual(floats[10:12], [25, 0])
+
+    def test_threaded_queries(self) -> None:
+        s = pymunk.Space(threaded=True)
+        s.threads = 2
+        for x in range(10):
+            for y in range(10):
+                s.add(pymunk.Circle(s.static_body, 2, (x * 5, y * 5)))
+        f = pymunk.ShapeFilter()
+        points = array.array("d", [(i * 7) % 53 - 1 for i in range(2000)])
+        segments = array.array("d", [(i * 11) % 57 - 2 for i in range(4000)])
+        bbs = array.array("d", [i % 4 + (i * 13) % 47 for i in range(4000)])
+
+        for space_hash in [False, True]:
+            if space_hash:
+                s.use_spatial_hash(5, 200)
+            for query, inputs, param in [
+                (pymunk.batch.space_point_query, points, (1,)),
+                (pymunk.batch.space_segment_query, segments, (1,)),
+                (pymunk.batch.space_segment_query_first, segments, (1,)),
+                (pymunk.batch.space_bb_query, bbs, ()),
+            ]:
+                single = pymunk.batch.Buffer()
+                query(s, inputs, *param, f, single)  # type: ignore
+                threaded = pymunk.batch.Buffer()
+                query(s, inputs, *param, f, threaded, True)  # type: ignore
+                self.assertGreater(len(single.int_buf()), 0)
+                self.assertEqual(single.int_buf()[:], threaded.int_buf()[:])
+                self.assertEqual(single.float_buf()[:], threaded.float_buf()[:])
+
+        # The space is unlocked after the queries
+        s.add(pymunk.Circle(s.static_body, 2))
+        self.assertEqual(len(s.shapes), 101)
+
+    def test_interpolated(self) -> None:
+        s = pymunk.Space()
+        b1 = pymunk.Body(1, 1)
+        b1.velocity = 4, 0
+        b1.angular_velocity = 2
+        b2 = pymunk.Body(1, 1)
+        b2.position = 10, 10
+        b2.velocity = 0, -8
+        s.add(b1, b2)
+        fields = (
+            pymunk.batch.BodyFields.BODY_ID
+            | pymunk.batch.BodyFields.POSITION
+            | pymunk.batch.BodyFields.ANGLE
+        )
+        data = pymunk.batch.Buffer()
+
+        with self.assertRaises(AssertionError):
+            pymunk.batch.get_space_bodies_interpolated(s, 0.5, fields, data)
+
+        s.keep_previous_transforms = True
+        with self.assertRaises(AssertionError):
+            pymunk.batch.get_space_bodies_interpolated(
+                s, 0.5, pymunk.batch.BodyFields.VELOCITY, data
+            )
+
+        # Before the first step there is nothing to interpolate from
+        pymunk.batch.get_space_bodies_interpolated(s, 0.5, fields, data)
+        self.assertEqual(
+            list(memoryview(data.float_buf()).cast("d")), [0, 0, 0, 10, 10, 0]
+        )
+
+        s.step(0.5)
+        s.step(0.5)
+        data.clear()
+        pymunk.batch.get_space_bodies_interpolated(s, 0.25, fields, data)
+        self.assertEqual(list(memoryview(data.int_buf()).cast("P")), [b1.id, b2.id])
+        self.assertEqual(
+            list(memoryview(data.float_buf()).cast("d")), [2.5, 0, 1.25, 10, 5, 0]
+        )
+
+        data.clear()
+        pymunk.batch.get_space_bodies_interpolated(
+            s,
+            0,
+            pymunk.batch.BodyFields.POSITION | pymunk.batch.BodyFields.ANGLE,
+            data,
+            layout=pymunk.batch.BufferLayout.COLUMNS,
+        )
+        self.assertEqual(
+            list(memoryview(data.float_buf()).cast("d")), [2, 0, 10, 6, 1, 0]
+        )
+
+        # Changed order and new bodies
+        b3 = pymunk.Body(1, 1)
+        b3.position = 7, 7
+        s.remove(b1)
+        s.add(b3, b1)
+        data.clear()
+        pymunk.batch.get_space_bodies_interpolated(s, 0.5, fields, data)
+        self.assertEqual(
+            list(memoryview(data.int_buf()).cast("P")), [b2.id, b3.id, b1.id]
+        )
+        self.assertEqual(
+            list(memoryview(data.float_buf()).cast("d")),
+            [10, 4, 0, 7, 7, 0, 3, 0, 1.5],
+        )
+
+        # The space pool stores the transforms as well
+        pool = pymunk.SpacePool([s], threads=1)
+        pool.step(0.5)
+        data.clear()
+        pymunk.batch.get_space_bodies_interpolated(
+            s, 0, pymunk.batch.BodyFields.POSITION, data
+        )
+        self.assertEqual(
+            list(memoryview(data.float_buf()).cast("d")), [10, 2, 7, 7, 4, 0]
+        )
+
+        self.assertTrue(s.copy().keep_previous_transforms)
+        s.keep_previous_transforms = False
+        self.assertFalse(s.keep_previous_transforms)
+
+    def test_create_shapes(self) -> None:
+        s = pymunk.Space()
+        b = pymunk.Body(body_type=pymunk.Body.STATIC)
+        circles = pymunk.batch.create_circles(
+            b, array.array("d", [0, 0, 10, 0]), array.array("d", [1, 2])
+        )
+        segments = pymunk.batch.create_segments(
+            b, array.array("d", [0, 10, 5, 10, 20, 0, 30, 0]), 0.5
+        )
+        polys = pymunk.batch.create_polys(
+            b,
+            array.array("d", [0, 20, 2, 20, 0, 22] + [10, 20, 12, 20, 12, 22, 10, 22]),
+            [0, 3],
+            radius=1,
+        )
+        s.add(b, *circles, *segments, *polys)
+
+        self.assertEqual([c.radius for c in circles], [1, 2])
+        self.assertEqual(circles[1].offset, (10, 0))
+        self.assertEqual([(x.a, x.b) for x in segments][1], ((20, 0), (30, 0)))
+        self.assertEqual(segments[0].radius, 0.5)
+        expected = pymunk.Poly(None, [(0, 20), (2, 20), (0, 22)])
+        self.assertEqual(polys[0].get_vertices(), expected.get_vertices())
+        self.assertEqual(len(polys[1].get_vertices()), 4)
+        self.assertEqual(polys[1].radius, 1)
+
+        shapes = circles + segments + polys
+        self.assertEqual(b.shapes, set(shapes))
+        self.assertTrue(all(x.body is b for x in shapes))
+        self.assertEqual(len(set(x.id for x in shapes)), len(shapes))
+        hit = s.point_query_nearest((25, 0), 0, pymunk.ShapeFilter())
+        assert hit is not None
+        self.assertIs(hit.shape, segments[1])
+
+        c = circles[1].copy()
+        self.assertEqual(c.radius, 2)
+
+        with self.assertRaises(AssertionError):
+            pymunk.batch.create_circles(
+                b, array.array("d", [0, 0, 10, 0]), array.array("d", [1])
+            )
+        with self.assertRaises(AssertionError):
+            pymunk.batch.create_polys(b, array.array("d", [0, 0, 1, 0]), [0, 2])
+
+    def test_velocity_hook(self) -> None:
+        s = pymunk.Space()
+        s.gravity = 0, -10
+        bodies = []
+        for x in range(3):
+            b = pymunk.Body(1, 1)
+            b.position = x + 1, 0
+            b.velocity_integrator = pymunk.VelocityIntegrator(hook=x != 1)
+            bodies.append(b)
+        s.add(*bodies)
+
+        calls = []
+
+        def hook(data: pymunk.batch.Buffer, dt: float) -> "array.array[float]":
+            ids = list(memoryview(data.int_buf()).cast("P"))
+            positions = memoryview(data.float_buf()).cast("d")
+            calls.append((ids, dt))
+            # Acceleration of x times the position
+            return array.array("d", [v for x in positions[::2] for v in (x, 0)])
+
+        fields = pymunk.batch.BodyFields.BODY_ID | pymunk.batch.BodyFields.POSITION
+        pymunk.batch.set_velocity_hook(s, fields, hook)
+        s.step(1, substeps=2)
+        self.assertEqual(calls, [([bodies[0].id, bodies[2].id], 0.5)] * 2)
+        # The positions are integrated before the velocities, so both calls
+        # get the start positions
+        self.assertEqual(bodies[0].velocity, (1, -10))
+        self.assertEqual(bodies[1].velocity, (0, -10))
+        self.assertEqual(bodies[2].velocity, (3, -10))
+
+        # A space with a hook is stepped with its hook by a SpacePool
+        pymunk.SpacePool([s]).step(1)
+        self.assertEqual(len(calls), 3)
+
+        pymunk.batch.set_velocity_hook(s, fields, None)
+        velocity = bodies[0].velocity
+        s.step(1)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(bodies[0].velocity, velocity + (0, -10))
+
+        def bad_hook(data: pymunk.batch.Buffer, dt: float) -> "array.array[float]":
+            return array.array("d", [1])
+
+        pymunk.batch.set_velocity_hook(s, fields, bad_hook)
+        with self.assertRaises(AssertionError):
+            s.step(1)
+
+    def test_velocity_hook_changes_bodies(self) -> None:
+        s = pymunk.Space()
+        bodies = []
+        for x in range(3):
+            b = pymunk.Body(1, 1)
+            b.velocity_integrator = pymunk.VelocityIntegrator(hook=x != 1)
+            bodies.append(b)
+        s.add(*bodies)
+
+        def hook(data: pymunk.batch.Buffer, dt: float) -> "array.array[float]":
+            ids = list(memoryview(data.int_buf()).cast("P"))
+            # Enabling the hook on another body only takes effect next call
+            bodies[1].velocity_integrator = pymunk.VelocityIntegrator(hook=True)
+            return array.array("d", [v for i in range(len(ids)) for v in (i + 1, 0)])
+
+        fields = pymunk.batch.BodyFields.BODY_ID
+        pymunk.batch.set_velocity_hook(s, fields, hook)
+        s.step(1)
+        self.assertEqual(bodies[0].velocity, (1, 0))
+        self.assertEqual(bodies[1].velocity, (0, 0))
+        self.assertEqual(bodies[2].velocity, (2, 0))
+
+        s.step(1)
+        self.assertEqual(bodies[0].velocity, (2, 0))
+        self.assertEqual(bodies[1].velocity, (2, 0))
+        self.assertEqual(bodies[2].velocity, (5, 0))
+
+    def test_velocity_hook_layout(self) -> None:
+        s = pymunk.Space()
+        bodies = []
+        for x in range(2):
+            b = pymunk.Body(1, 1)
+            b.position = x + 1, 0
+            b.angle = x + 3
+            b.velocity_integrator = pymunk.VelocityIntegrator(hook=True)
+            bodies.append(b)
+        s.add(*bodies)
+
+        calls = []
+
+        def hook(data: pymunk.batch.Buffer, dt: float) -> "array.array[float]":
+            calls.append(list(memoryview(data.float_buf()).cast("d")))
+            # Removing a body is deferred until after the step
+            s.remove(bodies[1])
+            return array.array("d", [1, 0, 2, 0])
+
+        fields = pymunk.batch.BodyFields.POSITION | pymunk.batch.BodyFields.ANGLE
+        pymunk.batch.set_velocity_hook(
+            s, fields, hook, pymunk.batch.BufferLayout.COLUMNS
+        )
+        s.step(1)
+        self.assertEqual(calls, [[1, 0, 2, 0, 3, 4]])
+        self.assertEqual(bodies[0].velocity, (1, 0))
+        self.assertEqual(bodies[1].velocity, (2, 0))
+        self.assertEqual(list(s.bodies), [bodies[0]])
+
+    def test_vector_space(self) -> None:
+        template = pymunk.Space()
+        template.gravity = 0, -10
+        b1 = pymunk.Body(1, 1)
+        b1.position = 1, 2
+        b2 = pymunk.Body(1, 1)
+        b2.position = 3, 4
+        template.add(b1, b2)
+
+        vs = pymunk.batch.VectorSpace(
+            template,
+            2,
+            pymunk.batch.BodyFields.ANGULAR_VELOCITY,
+            pymunk.batch.BodyFields.POSITION | pymunk.batch.BodyFields.ANGLE,
+            bodies=[b2],
+        )
+        self.assertEqual(len(vs), 2)
+        self.assertEqual(
+            list(memoryview(vs.observation_buffer.float_buf()).cast("d")),
+            [3, 4, 0, 3, 4, 0],
+        )
+
+        vs.step(0.5, array.array("d", [1, 2]))
+        self.assertEqual(
+            list(memoryview(vs.observation_buffer.float_buf()).cast("d")),
+            [3, 4, 0.5, 3, 4, 1],
+        )
+        vs.step(0.5)
+        self.assertEqual(
+            list(memoryview(vs.observation_buffer.float_buf()).cast("d")),
+            [3, 1.5, 1, 3, 1.5, 2],
+        )
+        # The template is not changed
+        self.assertEqual(b2.position, (3, 4))
+
+        vs.reset([1])
+        self.assertEqual(
+            list(memoryview(vs.observation_buffer.float_buf()).cast("d")),
+            [3, 1.5, 1, 3, 4, 0],
+        )
+
+        with self.assertRaises(AssertionError):
+            vs.step(0.5, array.array("d", [1, 2, 3]))
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_vector_space_numpy(self) -> None:
+        template = pymunk.Space()
+        template.add(pymunk.Body(1, 1), pymunk.Body(1, 1))
+        vs = pymunk.batch.VectorSpace(
+            template,
+            3,
+            pymunk.batch.BodyFields.VELOCITY,
+            pymunk.batch.BodyFields.POSITION,
+        )
+        observations = vs.observations
+        self.assertEqual(observations.shape, (3, 2, 2))
+
+        actions = numpy.zeros((3, 2, 2))
+        actions[2, 1] = 5, 6
+        vs.step(1, actions)
+        self.assertIs(vs.observations, observations)
+        self.assertEqual(observations[2, 1].tolist(), [5, 6])
+        self.assertEqual(observations[0].tolist(), [[0, 0], [0, 0]])
@@ -293,6 +293,67 @@ class UnitTestBody(unittest.TestCase):
         s.step(1)
         self.assertEqual(b.velocity.x, 16)
 
+    def test_velocity_integrator(self) -> None:
+        s = p.Space()
+        s.gravity = 0, -10
+        b1 = p.Body(1, 1)
+        b1.velocity_integrator = p.VelocityIntegrator(gravity=(0, 10))
+        b2 = p.Body(1, 1)
+        b2.velocity_integrator = p.VelocityIntegrator(max_velocity=2)
+        b3 = p.Body(1, 1)
+        b3.velocity = 10, 0
+        b3.angular_velocity = 10
+        b3.velocity_integrator = p.VelocityIntegrator(
+            gravity=(0, 0), linear_drag=1, angular_drag=0.1, max_angular_velocity=5
+        )
+        s.add(b1, b2, b3)
+        s.step(1)
+        self.assertEqual(b1.velocity, (0, 10))
+        self.assertEqual(b2.velocity, (0, -2))
+        self.assertAlmostEqual(b3.velocity.x, 10 * math.exp(-1))
+        self.assertEqual(b3.angular_velocity, 5)
+
+        b1.velocity_func = p.Body.update_velocity
+        self.assertIsNone(b1.velocity_integrator)
+        s.step(1)
+        self.assertEqual(b1.velocity, (0, 0))
+
+        b2.velocity_integrator = None
+        s.step(1)
+        self.assertEqual(b2.velocity, (0, -12))
+
+        # Setting None without an integrator keeps the velocity_func
+        calls = []
+        b3.velocity_func = lambda body, gravity, damping, dt: calls.append(dt)
+        b3.velocity_integrator = None
+        s.step(1)
+        self.assertEqual(calls, [1])
+
+    def test_velocity_integrator_attractor(self) -> None:
+        # Same as the planet gravity of examples/planet.py
+        def planet_gravity(
+            body: p.Body, gravity: Vec2d, damping: float, dt: float
+        ) -> None:
+            d = body.position - (1, 2)
+            g = d * -500 / d.length**3
+            p.Body.update_velocity(body, g, damping, dt)
+
+        s = p.Space()
+        b1 = p.Body(1, 1)
+        b1.velocity_func = planet_gravity
+        b2 = p.Body(1, 1)
+        b2.velocity_integrator = p.VelocityIntegrator(
+            attractor=(1, 2), attractor_strength=500
+        )
+        for b in [b1, b2]:
+            b.position = 20, 2
+            b.velocity = 0, 5
+            s.add(b)
+        for _ in range(100):
+            s.step(0.01)
+        self.assertAlmostEqual(b1.position.x, b2.position.x)
+        self.assertAlmostEqual(b1.position.y, b2.position.y)
+
     def test_each_arbiters(self) -> None:
         s = p.Space()
         b1 = p.Body(1, 1)
@@ -412,6 +473,31 @@ class UnitTestBody(unittest.TestCase):
         self.assertTrue(b2.vf)
         _ = b2.copy()
 
+    def test_pickle_velocity_integrator(self) -> None:
+        b = p.Body(1, 2)
+        b.velocity_integrator = p.VelocityIntegrator(gravity=(1, 2), linear_drag=3)
+        b2 = pickle.loads(pickle.dumps(b))
+        self.assertEqual(b2.velocity_integrator, b.velocity_integrator)
+
+        s = p.Space()
+        s.add(b2)
+        s.step(1)
+        self.assertAlmostEqual(b2.velocity.x, math.exp(-3))
+
+    def test_custom_attributes(self) -> None:
+        b = p.Body(1, 2)
+        # The internal state is in slots, not in the instance dict
+        self.assertEqual(vars(b), {})
+        b.custom = "test"
+        self.assertEqual(vars(b), {"custom": "test"})
+
+        class MyBody(p.Body):
+            pass
+
+        b2 = MyBody(1, 2)
+        b2.custom = "test"
+        self.assertEqual(b2.copy().custom, "test")
+
     def test_pickle_circular_ref(self) -> None:
         class X:
             def __init__(self) -> None:
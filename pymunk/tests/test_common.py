@@ -64,11 +64,11 @@ class UnitTestBugs(unittest.TestCase):
             for i in order:
                 o = objs[i]
                 if o is p.Space:
-                    del o._space
+                    del o._space  # type: ignore[misc]
                 if o is p.Circle:
-                    del o._shape
+                    del o._shape  # type: ignore[misc]
                 if o is p.Body:
-                    del o._body
+                    del o._body  # type: ignore[misc]
             gc.collect()
 
     def testManyBoxCrash(self) -> None:
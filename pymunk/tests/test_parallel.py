@@ -0,0 +1,87 @@
+import unittest
+
+import pymunk
+import pymunk.batch
+import pymunk.parallel
+
+
+def make_space(x: float) -> pymunk.Space:
+    s = pymunk.Space()
+    s.gravity = 0, -100
+    s.add(pymunk.Segment(s.static_body, (-100, 0), (100, 0), 1))
+    b = pymunk.Body(1, 10)
+    b.position = x, 5
+    s.add(b, pymunk.Circle(b, 2))
+    return s
+
+
+class UnitTestParallel(unittest.TestCase):
+    def testStep(self) -> None:
+        fields = pymunk.batch.BodyFields.POSITION | pymunk.batch.BodyFields.ANGLE
+        spaces = [make_space(x) for x in range(3)]
+        with pymunk.parallel.SpaceProcessPool(
+            spaces,
+            fields,
+            capacity=(0, 6),
+            arbiter_fields=pymunk.batch.ArbiterFields.CONTACT_COUNT,
+            arbiter_capacity=(1, 0),
+            processes=2,
+        ) as pool:
+            self.assertEqual(len(pool), 3)
+            pool.step(0.01, steps=50)
+
+            for i, s in enumerate(spaces):
+                for _ in range(50):
+                    s.step(0.01)
+                expected = pymunk.batch.Buffer()
+                pymunk.batch.get_space_bodies(s, fields, expected)
+                self.assertEqual(pool.bodies(i).float_buf()[:], expected.float_buf()[:])
+                arbiters = pool.arbiters(i)
+                self.assertEqual(list(memoryview(arbiters.int_buf()).cast("P")), [1])
+                self.assertEqual(len(arbiters.float_buf()), 0)
+
+    def testSetFields(self) -> None:
+        with pymunk.parallel.SpaceProcessPool(
+            [make_space(0), make_space(1)],
+            pymunk.batch.BodyFields.VELOCITY,
+            capacity=(0, 4),
+        ) as pool:
+            # The dynamic body followed by the static body of the space
+            pool.inputs(1)[:] = memoryview(bytes(32)).cast("d")
+            pool.inputs(1)[0] = 10
+            pool.step(0.01, set_fields=pymunk.batch.BodyFields.VELOCITY)
+            velocity = list(memoryview(pool.bodies(1).float_buf()).cast("d"))
+            self.assertEqual(velocity, [10, -1, 0, 0])
+
+    def testOverflow(self) -> None:
+        with pymunk.parallel.SpaceProcessPool(
+            [make_space(0)], pymunk.batch.BodyFields.POSITION, capacity=(0, 1)
+        ) as pool:
+            with self.assertRaises(BufferError):
+                pool.step(0.01)
+
+    def testErrorInOneSpace(self) -> None:
+        # The first space has one body too many to fit in the capacity
+        s = make_space(0)
+        s.add(pymunk.Body(1, 10))
+        expected = make_space(1)
+        with pymunk.parallel.SpaceProcessPool(
+            [s, make_space(1)],
+            pymunk.batch.BodyFields.POSITION,
+            capacity=(0, 4),
+            processes=1,
+        ) as pool:
+            with self.assertRaises(BufferError):
+                pool.step(0.01)
+            # The other space is still stepped
+            expected.step(0.01)
+            data = pymunk.batch.Buffer()
+            pymunk.batch.get_space_bodies(
+                expected, pymunk.batch.BodyFields.POSITION, data
+            )
+            self.assertEqual(pool.bodies(1).float_buf()[:], data.float_buf()[:])
+
+
+if __name__ == "__main__":
+    print("testing pymunk version " + pymunk.version)
+    unittest.main()
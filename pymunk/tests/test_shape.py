@@ -204,6 +204,13 @@ class UnitTestShape(unittest.TestCase):
 
         c2 = c.copy()
 
+    def testCustomAttributes(self) -> None:
+        c = p.Circle(None, 1)
+        self.assertEqual(vars(c), {})
+        c.color = (255, 0, 0, 255)
+        self.assertEqual(vars(c), {"color": (255, 0, 0, 255)})
+        self.assertEqual(c.copy().color, (255, 0, 0, 255))
+
 
 class UnitTestCircle(unittest.TestCase):
     def testCircleBB(self) -> None:
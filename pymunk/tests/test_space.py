@@ -4,6 +4,7 @@ import copy
 import functools
 import io
 import pickle
+import platform
 import sys
 import unittest
 import warnings
@@ -93,6 +94,198 @@ class UnitTestSpace(unittest.TestCase):
             self.assertEqual(s.threads, 2)
         s.step(1)
 
+    def testStepInThreads(self) -> None:
+        import threading
+
+        def make_space(with_callback: bool) -> p.Space:
+            s = p.Space()
+            s.gravity = 0, -100
+            s.add(p.Segment(s.static_body, (-100, 0), (100, 0), 1))
+            for i in range(20):
+                b = p.Body(1, 10)
+                b.position = i * 3, 10 + i * 5
+                s.add(b, p.Circle(b, 2))
+            if with_callback:
+                s.on_collision(None, None, pre_solve=lambda arb, s, d: None)
+            return s
+
+        def run(s: p.Space) -> None:
+            for _ in range(200):
+                s.step(0.01)
+
+        serial = [make_space(False), make_space(True)]
+        for s in serial:
+            run(s)
+        spaces = [make_space(False), make_space(True)]
+        threads = [threading.Thread(target=run, args=(s,)) for s in spaces]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        for s1, s2 in zip(serial, spaces):
+            self.assertEqual(
+                [b.position for b in s1.bodies], [b.position for b in s2.bodies]
+            )
+
+    def testStepReleasesGil(self) -> None:
+        import threading
+        import time
+
+        s = p.Space()
+        s.gravity = 0, -100
+        s.add(p.Segment(s.static_body, (-1000, 0), (1000, 0), 1))
+        for i in range(300):
+            b = p.Body(1, 10)
+            b.position = i % 30 * 4.1, 5 + i // 30 * 4.1
+            s.add(b, p.Circle(b, 2))
+
+        counter = [0]
+        running = [True]
+
+        def count() -> None:
+            while running[0]:
+                counter[0] += 1
+
+        t = threading.Thread(target=count)
+        t.start()
+        try:
+            # The rate of the counter when the main thread does not hold the
+            # GIL at all
+            start_count, start = counter[0], time.perf_counter()
+            time.sleep(0.1)
+            rate = (counter[0] - start_count) / (time.perf_counter() - start)
+
+            start_count, start = counter[0], time.perf_counter()
+            s.step(1, substeps=500)
+            duration = time.perf_counter() - start
+            progress = counter[0] - start_count
+        finally:
+            running[0] = False
+            t.join()
+
+        # If the GIL was held during the step the counter would not move
+        # (except for a few ms before and after the C call)
+        self.assertGreater(progress, 0.25 * rate * duration)
+
+    @unittest.skipIf(
+        platform.python_implementation() != "CPython", "Uses the CPython C API"
+    )
+    def testStepCallbacksHoldGil(self) -> None:
+        import ctypes
+        import threading
+
+        def make_space() -> tuple[p.Space, list[int]]:
+            s = p.Space()
+            s.gravity = 0, -100
+            s.add(p.Segment(s.static_body, (-100, 0), (100, 0), 1))
+            gil_checks = []
+
+            def velocity_func(
+                body: p.Body, gravity: tuple[float, float], damping: float, dt: float
+            ) -> None:
+                gil_checks.append(ctypes.pythonapi.PyGILState_Check())
+                p.Body.update_velocity(body, gravity, damping, dt)
+
+            for i in range(10):
+                b = p.Body(1, 10)
+                b.position = i * 5, 3
+                b.velocity_func = velocity_func
+                s.add(b, p.Circle(b, 2))
+            s.on_collision(
+                pre_solve=lambda arb, space, data: gil_checks.append(
+                    ctypes.pythonapi.PyGILState_Check()
+                )
+            )
+            return s, gil_checks
+
+        # Step while another thread runs Python code, the callbacks take the
+        # GIL and the result is the same as without the other thread
+        s1, checks1 = make_space()
+        for _ in range(50):
+            s1.step(0.01)
+
+        running = [True]
+
+        def busy() -> None:
+            x = 0
+            while running[0]:
+                x += 1
+
+        s2, checks2 = make_space()
+        t = threading.Thread(target=busy)
+        t.start()
+        try:
+            for _ in range(50):
+                s2.step(0.01)
+        finally:
+            running[0] = False
+            t.join()
+
+        self.assertGreater(len(checks2), 500)
+        self.assertEqual(set(checks2), {1})
+        self.assertEqual(
+            [b.position for b in s1.bodies], [b.position for b in s2.bodies]
+        )
+
+    def testStepSubsteps(self) -> None:
+        def make_space(threaded: bool) -> p.Space:
+            s = p.Space(threaded=threaded)
+            s.gravity = 0, -100
+            s.add(p.Segment(s.static_body, (-100, 0), (100, 0), 1))
+            for i in range(10):
+                b = p.Body(1, 10)
+                b.position = i * 3, 10 + i * 5
+                s.add(b, p.Circle(b, 2))
+            return s
+
+        for threaded in [False, True]:
+            s1 = make_space(threaded)
+            s2 = make_space(threaded)
+            for _ in range(50):
+                for _ in range(4):
+                    s1.step(0.01 / 4)
+                s2.step(0.01, substeps=4)
+            self.assertEqual(
+                [b.position for b in s1.bodies], [b.position for b in s2.bodies]
+            )
+
+        calls = []
+        s = make_space(False)
+        s.add_post_step_callback(lambda s, k: calls.append(k), 1)
+        s.step(0.01, substeps=3)
+        self.assertEqual(calls, [1])
+
+    def testAdvance(self) -> None:
+        s1 = p.Space()
+        s1.gravity = 0, -10
+        b1 = p.Body(1, 1)
+        s1.add(b1)
+        s2 = s1.copy()
+        b2 = list(s2.bodies)[0]
+
+        alpha = s1.advance(0.025, 0.01)
+        self.assertAlmostEqual(alpha, 0.5)
+        s2.step(0.01)
+        s2.step(0.01)
+        self.assertEqual(b1.velocity, b2.velocity)
+
+        alpha = s1.advance(0.006, 0.01)
+        self.assertAlmostEqual(alpha, 0.1)
+        s2.step(0.01)
+        self.assertEqual(b1.velocity, b2.velocity)
+
+        alpha = s1.advance(0.002, 0.01)
+        self.assertAlmostEqual(alpha, 0.3)
+        self.assertEqual(b1.velocity, b2.velocity)
+
+        # Time above max_steps is dropped
+        alpha = s1.advance(1, 0.01, max_steps=5)
+        self.assertEqual(alpha, 0)
+        for _ in range(5):
+            s2.step(0.01)
+        self.assertEqual(b1.velocity, b2.velocity)
+
     def testSpatialHash(self) -> None:
         s = p.Space()
         s.use_spatial_hash(10, 100)
@@ -134,6 +327,73 @@ class UnitTestSpace(unittest.TestCase):
         self.assertEqual(list(s.bodies), [b])
         self.assertEqual(list(s.shapes), [c2])
 
+    def testAddMany(self) -> None:
+        s = p.Space()
+        s.gravity = 0, -100
+        ground = [
+            p.Segment(s.static_body, (x * 10, 0), (x * 10 + 10, 0), 1)
+            for x in range(100)
+        ]
+        bodies = [p.Body(1, 10) for _ in range(10)]
+        circles = []
+        for i, b in enumerate(bodies):
+            b.position = i * 50 + 5, 10
+            circles.append(p.Circle(b, 5))
+
+        s.add_many(*ground)
+        s.add_many(*circles, *bodies)
+        self.assertEqual(list(s.shapes), ground + circles)
+        self.assertTrue(all(c.space == s for c in ground + circles))
+        for x in range(100):
+            hits = s.point_query((x * 10 + 5, 0), 0, p.ShapeFilter())
+            self.assertEqual([h.shape for h in hits], [ground[x]])
+
+        for _ in range(100):
+            s.step(0.01)
+        self.assertTrue(all(b.position.y < 10 for b in bodies))
+        self.assertTrue(all(b.position.y > 5 for b in bodies))
+
+        s2 = p.Space()
+        c = p.Circle(s2.static_body, 1)
+        self.assertRaises(AssertionError, s2.add_many, c, c)
+        self.assertRaises(AssertionError, s2.add_many, c, ground[0])
+        self.assertEqual(len(s2.shapes), 0)
+
+        s.remove(*ground, *circles)
+        self.assertEqual(len(s.shapes), 0)
+        self.assertEqual(s.point_query((5, 0), 0, p.ShapeFilter()), [])
+
+    def testAddInOrder(self) -> None:
+        def make_objects() -> list[Any]:
+            body = p.Body(body_type=p.Body.STATIC)
+            objs: list[Any] = [body]
+            for x in range(20):
+                objs.append(p.Segment(body, (x * 10, 0), (x * 10 + 10, 0), 1))
+            for i in range(20):
+                b = p.Body(1, 10)
+                b.position = i * 7 % 200, 10 + i
+                objs += [b, p.Circle(b, 5)]
+            return objs
+
+        # Adding many objects at once simulates the same as adding them one
+        # by one, and so does a copy of the space
+        s1 = p.Space()
+        s1.gravity = 0, -100
+        objs1 = make_objects()
+        s1.add(*objs1)
+        s2 = p.Space()
+        s2.gravity = 0, -100
+        objs2 = make_objects()
+        for o in objs2:
+            s2.add(o)
+        s3 = s1.copy()
+        for _ in range(100):
+            for s in [s1, s2, s3]:
+                s.step(0.01)
+        positions = [b.position for b in s1.bodies]
+        self.assertEqual([b.position for b in s2.bodies], positions)
+        self.assertEqual([b.position for b in s3.bodies], positions)
+
     def testAddShapeAsserts(self) -> None:
         s1 = p.Space()
         s2 = p.Space()
@@ -983,6 +1243,119 @@ class UnitTestSpace(unittest.TestCase):
         self.assertEqual(c2, d["shapes"][0])
         self.assertEqual(s, d["space"])
 
+    def testCollisionRules(self) -> None:
+        def setup(rule: int) -> tuple[p.Space, p.Body, list[str]]:
+            s = p.Space()
+            s.gravity = 0, -100
+            ground = p.Segment(s.static_body, (-10, 0), (10, 0), 1)
+            ground.collision_type = 1
+            b = p.Body(1, 1)
+            b.position = 0, 3
+            c = p.Circle(b, 1)
+            c.collision_type = 2
+            s.add(ground, b, c)
+            s.set_collision_rule(2, 1, rule)
+
+            calls: list[str] = []
+            s.on_collision(
+                1,
+                2,
+                begin=lambda arb, space, data: calls.append("begin"),
+                post_solve=lambda arb, space, data: calls.append("post_solve"),
+            )
+            s.on_collision(1, begin=lambda arb, space, data: calls.append("wildcard"))
+            for _ in range(50):
+                s.step(0.01)
+            return s, b, calls
+
+        _, b, calls = setup(p.Space.COLLIDE)
+        self.assertGreater(b.position.y, 1.5)
+        self.assertEqual(calls[:3], ["begin", "wildcard", "post_solve"])
+
+        _, b, calls = setup(p.Space.IGNORE)
+        self.assertLess(b.position.y, 0)
+        self.assertEqual(calls, [])
+
+        s, b, calls = setup(p.Space.SENSOR)
+        self.assertLess(b.position.y, 0)
+        self.assertEqual(calls, ["begin", "wildcard"])
+
+        self.assertEqual(s.collision_rules, {(1, 2): p.Space.SENSOR})
+        s2 = s.copy()
+        self.assertEqual(s2.collision_rules, {(1, 2): p.Space.SENSOR})
+        s.set_collision_rule(1, 2, p.Space.COLLIDE)
+        self.assertEqual(s.collision_rules, {})
+
+        with self.assertRaises(AssertionError):
+            s.set_collision_rule(1, 1024, p.Space.IGNORE)
+
+    def testCollisionRuleChangedDuringCollision(self) -> None:
+        def setup(rule: int) -> tuple[p.Space, p.Circle, list[str]]:
+            s = p.Space()
+            static = p.Circle(s.static_body, 1)
+            static.collision_type = 1
+            b = p.Body(body_type=p.Body.KINEMATIC)
+            c = p.Circle(b, 1)
+            c.collision_type = 2
+            s.add(static, b, c)
+            s.set_collision_rule(1, 2, rule)
+
+            calls: list[str] = []
+            s.on_collision(
+                1,
+                2,
+                begin=lambda arb, space, data: calls.append("begin"),
+                pre_solve=lambda arb, space, data: calls.append("pre_solve"),
+                separate=lambda arb, space, data: calls.append("separate"),
+            )
+            s.step(0.01)
+            return s, c, calls
+
+        # The rule that applied when the collision began is used until it
+        # separates
+        s, c, calls = setup(p.Space.COLLIDE)
+        s.set_collision_rule(1, 2, p.Space.IGNORE)
+        s.step(0.01)
+        s.remove(c)
+        self.assertEqual(calls, ["begin", "pre_solve", "pre_solve", "separate"])
+
+        s, c, calls = setup(p.Space.IGNORE)
+        s.set_collision_rule(1, 2, p.Space.COLLIDE)
+        s.step(0.01)
+        s.remove(c)
+        self.assertEqual(calls, [])
+
+        # The next collision uses the new rule
+        s.add(c)
+        s.step(0.01)
+        self.assertEqual(calls, ["begin", "pre_solve"])
+
+        # A rule set for the first time applies to the next collision of
+        # shapes that collided before, also when the arbiter is reused
+        s = p.Space()
+        static = p.Circle(s.static_body, 1)
+        static.collision_type = 1
+        b = p.Body(body_type=p.Body.KINEMATIC)
+        c = p.Circle(b, 1)
+        c.collision_type = 2
+        s.add(static, b, c)
+        calls = []
+        s.on_collision(
+            1,
+            2,
+            begin=lambda arb, space, data: calls.append("begin"),
+            pre_solve=lambda arb, space, data: calls.append("pre_solve"),
+        )
+        s.step(0.01)
+        b.position = 10, 0
+        s.step(0.01)
+        self.assertEqual(calls, ["begin", "pre_solve"])
+        s.set_collision_rule(1, 2, p.Space.IGNORE)
+        b.position = 0, 0
+        s.step(0.01)
+        s.step(0.01)
+        self.assertEqual(calls, ["begin", "pre_solve"])
+
     def testPostStepCallback(self) -> None:
         s = p.Space()
         b1, b2 = p.Body(1, 3), p.Body(10, 100)
@@ -0,0 +1,98 @@
+import unittest
+from typing import Any
+
+import pymunk
+from pymunk._chipmunk_cffi import lib
+
+
+def make_space(threaded: bool = False) -> pymunk.Space:
+    s = pymunk.Space(threaded=threaded)
+    s.gravity = 0, -100
+    s.add(pymunk.Segment(s.static_body, (-100, 0), (100, 0), 1))
+    for i in range(10):
+        b = pymunk.Body(1, 10)
+        b.position = i * 3, 10 + i * 5
+        s.add(b, pymunk.Circle(b, 2))
+    return s
+
+
+def positions(s: pymunk.Space) -> list[pymunk.Vec2d]:
+    return [b.position for b in s.bodies]
+
+
+class UnitTestSpacePool(unittest.TestCase):
+    def testStep(self) -> None:
+        serial = [make_space(), make_space(True), make_space()]
+        for _ in range(100):
+            for s in serial:
+                s.step(0.01)
+
+        spaces = [make_space(), make_space(True), make_space()]
+        pool = pymunk.SpacePool(spaces, threads=2)
+        self.assertEqual(len(pool), 3)
+        self.assertEqual(pool.spaces, spaces)
+        for _ in range(100):
+            pool.step(0.01)
+
+        for s1, s2 in zip(serial, spaces):
+            self.assertEqual(positions(s1), positions(s2))
+
+    def testDuplicateSpace(self) -> None:
+        s = pymunk.Space()
+        with self.assertRaises(AssertionError):
+            pymunk.SpacePool([s, s])
+
+    def testPythonCallbacks(self) -> None:
+        s = make_space()
+        self.assertFalse(lib.pmSpaceHasPythonCallbacks(s._space))
+
+        s.on_collision(1, 2, begin=lambda a, s, d: None)
+        self.assertTrue(lib.pmSpaceHasPythonCallbacks(s._space))
+
+        s = make_space()
+        list(s.bodies)[0].position_func = lambda b, dt: None
+        self.assertTrue(lib.pmSpaceHasPythonCallbacks(s._space))
+
+        s = make_space()
+        b1, b2 = list(s.bodies)[:2]
+        c = pymunk.constraints.PinJoint(b1, b2)
+        s.add(c)
+        self.assertFalse(lib.pmSpaceHasPythonCallbacks(s._space))
+        c.pre_solve = lambda c, s: None
+        self.assertTrue(lib.pmSpaceHasPythonCallbacks(s._space))
+
+    def testMixedCallbacks(self) -> None:
+        calls = []
+
+        def begin(arb: pymunk.Arbiter, space: pymunk.Space, data: Any) -> None:
+            calls.append(space)
+
+        s1 = make_space()
+        s2 = make_space()
+        s2.on_collision(begin=begin)
+        pool = pymunk.SpacePool([s1, s2])
+        for _ in range(100):
+            pool.step(0.01)
+
+        self.assertTrue(calls)
+        self.assertTrue(all(s is s2 for s in calls))
+        self.assertEqual(positions(s1), positions(s2))
+
+    def testAddRemoveInStep(self) -> None:
+        s = make_space()
+        b = pymunk.Body(1, 1)
+        c = pymunk.Circle(b, 1)
+        s.add_post_step_callback(lambda s, k: s.add(b, c), "add")
+        pool = pymunk.SpacePool([s])
+        pool.step(0.01)
+        self.assertIn(b, s.bodies)
+
+        # The space is unlocked after the step
+        b2 = pymunk.Body(1, 1)
+        s.add(b2)
+        self.assertIn(b2, s.bodies)
+
+
+if __name__ == "__main__":
+    print("testing pymunk version " + pymunk.version)
+    unittest.main()
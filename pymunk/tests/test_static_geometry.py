@@ -0,0 +1,172 @@
+import array
+import copy
+import gc
+import pickle
+import unittest
+from typing import Any
+
+import pymunk as p
+
+
+def ground() -> p.StaticGeometry:
+    # Three segments after each other along the x axis
+    return p.StaticGeometry.from_segments(
+        array.array("d", [0, 0, 10, 0, 10, 0, 20, 0, 20, 0, 30, 0]), radius=1
+    )
+
+
+class UnitTestStaticGeometry(unittest.TestCase):
+    def testKinds(self) -> None:
+        g = p.StaticGeometry.from_circles(
+            array.array("d", [0, 0, 10, 0]), array.array("d", [1, 2])
+        )
+        self.assertEqual(len(g), 2)
+        self.assertEqual(g.kind, p.StaticGeometry.CIRCLES)
+        c = g[1]
+        assert isinstance(c, p.Circle)
+        self.assertEqual(c.radius, 2)
+        self.assertEqual(c.offset, (10, 0))
+
+        g = ground()
+        self.assertEqual(len(g), 3)
+        s = g[2]
+        assert isinstance(s, p.Segment)
+        self.assertEqual((s.a, s.b, s.radius), ((20, 0), (30, 0), 1))
+
+        vertices = array.array("d", [0, 0, 1, 0, 0, 1] + [5, 5, 6, 5, 6, 6, 5, 6])
+        g = p.StaticGeometry.from_polys(vertices, [0, 3])
+        self.assertEqual([len(g[i].get_vertices()) for i in range(2)], [3, 4])
+
+    def testShapes(self) -> None:
+        g = ground()
+        g.friction = 0.5
+        g.elasticity = 0.2
+        g.collision_type = 3
+        g.filter = p.ShapeFilter(group=1)
+        self.assertIs(g[0], g[0])
+        for i in range(len(g)):
+            shape = g[i]
+            self.assertEqual(g.index(shape), i)
+            self.assertIs(shape.body, g.body)
+            self.assertEqual(shape.id, g.id)
+            self.assertEqual(shape.friction, 0.5)
+            self.assertEqual(shape.elasticity, 0.2)
+            self.assertEqual(shape.collision_type, 3)
+            self.assertEqual(shape.filter, p.ShapeFilter(group=1))
+            self.assertIsNone(shape.space)
+        with self.assertRaises(ValueError):
+            g.index(p.Circle(None, 1))
+
+        # The properties can only be set on the geometry
+        with self.assertRaises(AttributeError):
+            g[0].friction = 5
+        with self.assertRaises(AttributeError):
+            g[0].collision_type = 1
+        self.assertEqual(g[0].friction, 0.5)
+        g[0].color = (255, 0, 0, 255)
+
+        # A copy of a shape is not part of the geometry
+        c = copy.copy(g[1])
+        c.friction = 5
+        self.assertEqual((c.friction, g[1].friction), (5, 0.5))
+
+    def testAddRemove(self) -> None:
+        s = p.Space()
+        g = ground()
+        s.add(g)
+        self.assertEqual(list(s.static_geometries), [g])
+        self.assertIs(g.space, s)
+        self.assertIs(g.body.space, s)
+        self.assertIs(g[0].space, s)
+        self.assertEqual(len(s.shapes), 0)
+
+        s.remove(g)
+        self.assertEqual(len(s.static_geometries), 0)
+        self.assertIsNone(g.space)
+        self.assertIsNone(g[0].space)
+
+        s2 = p.Space()
+        s2.add(g)
+        self.assertEqual(len(s2.point_query((15, 0), 0, p.ShapeFilter())), 1)
+        self.assertEqual(len(s.point_query((15, 0), 0, p.ShapeFilter())), 0)
+
+    def testCollision(self) -> None:
+        s = p.Space()
+        s.gravity = 0, -100
+        g = ground()
+        g.collision_type = 1
+        s.add(g)
+        b = p.Body(1, 1)
+        b.position = 15, 5
+        c = p.Circle(b, 1)
+        s.add(b, c)
+
+        hits = []
+
+        def begin(arbiter: p.Arbiter, space: p.Space, data: dict[Any, Any]) -> None:
+            hits.append(arbiter.shapes[0])
+
+        s.on_collision(1, 0, begin=begin)
+        for _ in range(100):
+            s.step(0.01)
+        self.assertAlmostEqual(b.position.y, 2, delta=0.2)
+        self.assertEqual(hits, [g[1]])
+        self.assertEqual(g.index(hits[0]), 1)
+
+    def testQueries(self) -> None:
+        s = p.Space()
+        g = ground()
+        s.add(g, p.Segment(s.static_body, (0, 0), (20, 0), 1))
+        f = p.ShapeFilter()
+        self.assertEqual(g.point_query((15, 0), 0, f), [1])
+        self.assertEqual(g.segment_query((25, 5), (25, -5), 0, f), [2])
+        self.assertEqual(sorted(g.bb_query(p.BB(9, -1, 12, 1), f)), [0, 1])
+
+        infos = s.point_query((15, 0), 0, f)
+        self.assertEqual(len(infos), 2)
+        self.assertIn(g[1], [info.shape for info in infos])
+        info = s.point_query_nearest((25, 2.5), 2, f)
+        assert info is not None
+        self.assertIs(info.shape, g[2])
+
+    def testPickle(self) -> None:
+        s = p.Space()
+        s.gravity = 0, -100
+        g = ground()
+        g.friction = 0.7
+        s.add(g)
+        b = p.Body(1, 1)
+        b.position = 15, 5
+        s.add(b, p.Circle(b, 1))
+        for _ in range(50):
+            s.step(0.01)
+
+        for s2 in [copy.deepcopy(s), pickle.loads(pickle.dumps(s))]:
+            (g2,) = s2.static_geometries
+            self.assertEqual(len(g2), 3)
+            self.assertEqual(g2.friction, 0.7)
+            self.assertEqual(g2[2].b, (30, 0))
+            for _ in range(50):
+                s2.step(0.01)
+            (b2,) = s2.bodies
+            self.assertAlmostEqual(b2.position.y, 2, delta=0.2)
+
+    def testGc(self) -> None:
+        s = p.Space()
+        g = ground()
+        s.add(g)
+        del s
+        gc.collect()
+        self.assertIsNone(g.space)
+        s = p.Space()
+        s.add(g)
+        self.assertEqual(len(s.point_query((15, 0), 0, p.ShapeFilter())), 1)
+
+        del g
+        gc.collect()
+        s.step(0.01)
+
+
+if __name__ == "__main__":
+    print("testing pymunk version " + p.version)
+    unittest.main()
@@ -0,0 +1,59 @@
+import math
+from typing import NamedTuple, Optional
+
+
+class VelocityIntegrator(NamedTuple):
+    """Parameters of the built-in velocity integrator of a body.
+
+    Set with :py:attr:`Body.velocity_integrator` to change how the velocity
+    of a body is updated each step, without the cost of a Python callback
+    like :py:attr:`Body.velocity_func`. The integration itself is done in C
+    in the same way as :py:meth:`Body.update_velocity`, with these additions:
+
+    * gravity, if set, is used instead of the gravity of the space.
+    * attractor_strength, if not 0, adds an acceleration toward the
+      attractor point proportional to the inverse square of the distance,
+      like gravity from a planet. A negative strength pushes away instead.
+    * linear_drag and angular_drag reduce the velocity and angular velocity
+      by a factor of exp(-drag * dt) each step.
+    * max_velocity and max_angular_velocity clamp the velocity and angular
+      velocity after the update.
+    * hook, if True, adds the acceleration calculated by the velocity hook of
+      the space, see :py:func:`pymunk.batch.set_velocity_hook`.
+
+    >>> import pymunk
+    >>> s = pymunk.Space()
+    >>> b = pymunk.Body(1, 1)
+    >>> b.position = 10, 0
+    >>> b.velocity_integrator = pymunk.VelocityIntegrator(
+    ...     attractor=(0, 0), attractor_strength=100
+    ... )
+    >>> s.add(b, pymunk.Circle(b, 1))
+    >>> s.step(0.1)
+    >>> b.velocity
+    Vec2d(-0.1, 0.0)
+    """
+
+    gravity: Optional[tuple[float, float]] = None
+    """Gravity of the body, or None to use the gravity of the space."""
+
+    attractor: tuple[float, float] = (0, 0)
+    """Point (in world coordinates) the body is attracted to."""
+
+    attractor_strength: float = 0
+    """Strength of the attraction. The acceleration is strength / distance^2."""
+
+    linear_drag: float = 0
+    """Drag applied to the velocity."""
+
+    angular_drag: float = 0
+    """Drag applied to the angular velocity."""
+
+    max_velocity: float = math.inf
+    """Max length of the velocity."""
+
+    max_angular_velocity: float = math.inf
+    """Max absolute angular velocity."""
+
+    hook: bool = False
+    """If the body is included in the velocity hook of the space."""
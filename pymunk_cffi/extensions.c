@@ -3,6 +3,10 @@
 
 #include "chipmunk/chipmunk_private.h"
 
+#ifndef _WIN32
+#include <pthread.h>
+#endif
+
 //
 // Functions to support efficient batch API
 //
@@ -36,8 +40,38 @@ typedef enum pmBatchableArbiterFields
     POINT_A_2 = 1 << 10,
     POINT_B_2 = 1 << 11,
     DISTANCE_2 = 1 << 12,
+
+    RESTITUTION = 1 << 13,
+    FRICTION = 1 << 14,
+    SURFACE_VELOCITY = 1 << 15,
 } pmBatchableArbiterFields;
 
+typedef enum pmBatchableShapeFields
+{
+    SHAPE_ID = 1 << 0,
+    SHAPE_BODY_ID = 1 << 1,
+    SHAPE_TYPE = 1 << 2,
+    SHAPE_BB = 1 << 3,
+    SHAPE_RADIUS = 1 << 4,
+    CIRCLE_CENTER = 1 << 5,
+    SEGMENT_ENDPOINTS = 1 << 6,
+    POLY_VERTICES = 1 << 7,
+} pmBatchableShapeFields;
+
+typedef enum pmCollisionEvents
+{
+    COLLISION_BEGIN = 1 << 0,
+    COLLISION_POST_SOLVE = 1 << 1,
+    COLLISION_SEPARATE = 1 << 2,
+} pmCollisionEvents;
+
+typedef enum pmCollisionRule
+{
+    COLLISION_RULE_COLLIDE = 0,
+    COLLISION_RULE_IGNORE = 1,
+    COLLISION_RULE_SENSOR = 2,
+} pmCollisionRule;
+
 // typedef struct pmVectArray pmVectArray;
 typedef struct pmFloatArray pmFloatArray;
 typedef struct pmIntArray pmIntArray;
@@ -53,12 +87,18 @@ struct pmFloatArray
 {
     int num, max;
     cpFloat *arr;
+    // If set the array is never grown. Items that do not fit are dropped
+    // and counted in overflow instead.
+    int fixed, overflow;
 };
 
 struct pmIntArray
 {
     int num, max;
     uintptr_t *arr;
+    // If set the array is never grown. Items that do not fit are dropped
+    // and counted in overflow instead.
+    int fixed, overflow;
 };
 
 struct pmBatchedData
@@ -68,6 +108,38 @@ struct pmBatchedData
     pmBatchableBodyFields fields;
 };
 
+typedef struct pmGlobalHandlerData pmGlobalHandlerData;
+
+// Data of the functions set on the global collision handler by pymunk.batch,
+// stored as the user data of the space. The functions that were set on the
+// handler before are kept and called after them.
+struct pmGlobalHandlerData
+{
+    // Arbiter values set by set_space_arbiters
+    pmFloatArray *overridesArray;
+    pmBatchableArbiterFields overridesFields;
+    // Collision events recorded by set_collision_events
+    pmIntArray *eventsIntArray;
+    pmFloatArray *eventsFloatArray;
+    pmCollisionEvents events;
+    cpCollisionBeginFunc beginFunc;
+    cpCollisionPreSolveFunc preSolveFunc;
+    cpCollisionPostSolveFunc postSolveFunc;
+    cpCollisionSeparateFunc separateFunc;
+    // Collision rules set by Space.set_collision_rule, a matrix with the
+    // rule of each pair of collision types below rulesSize
+    unsigned char *rules;
+    int rulesSize;
+};
+
+// The user data of an arbiter holds the collision rule decided when the
+// collision began in its lowest bits, so that a rule changed during the
+// collision does not affect it. The index of the arbiter values set by
+// set_space_arbiters is stored above them.
+#define PM_ARBITER_RULE_MASK 3
+#define PM_ARBITER_RULE_DECIDED 4
+#define PM_ARBITER_INDEX_SHIFT 3
+
 pmFloatArray *
 pmFloatArrayNew(int size)
 {
@@ -93,7 +165,15 @@ void pmFloatArrayFree(pmFloatArray *arr)
 
 void pmFloatArrayPush(pmFloatArray *arr, cpFloat v)
 {
-    if (arr->num == (arr->max - 1) || arr->num == arr->max)
+    if (arr->fixed)
+    {
+        if (arr->num >= arr->max)
+        {
+            arr->overflow++;
+            return;
+        }
+    }
+    else if (arr->num == (arr->max - 1) || arr->num == arr->max)
     {
         arr->max = 3 * (arr->max + 1) / 2;
         arr->arr = (cpFloat *)cprealloc(arr->arr, arr->max * sizeof(cpFloat));
@@ -112,7 +192,16 @@ pmFloatArrayPop(pmFloatArray *arr)
 
 void pmFloatArrayPushVect(pmFloatArray *arr, cpVect v)
 {
-    if (arr->num == (arr->max - 2) || arr->num == (arr->max - 1) || arr->num == arr->max)
+    if (arr->fixed)
+    {
+        // Drop both x and y, so that a half vector is never written.
+        if (arr->num + 2 > arr->max)
+        {
+            arr->overflow += 2;
+            return;
+        }
+    }
+    else if (arr->num == (arr->max - 2) || arr->num == (arr->max - 1) || arr->num == arr->max)
     {
         arr->max = 3 * (arr->max + 1) / 2;
         arr->arr = (cpFloat *)cprealloc(arr->arr, arr->max * sizeof(cpFloat));
@@ -155,7 +244,15 @@ void pmIntArrayFree(pmIntArray *arr)
 
 void pmIntArrayPush(pmIntArray *arr, uintptr_t v)
 {
-    if (arr->num == (arr->max - 1) || arr->num == arr->max)
+    if (arr->fixed)
+    {
+        if (arr->num >= arr->max)
+        {
+            arr->overflow++;
+            return;
+        }
+    }
+    else if (arr->num == (arr->max - 1) || arr->num == arr->max)
     {
         arr->max = 3 * (arr->max + 1) / 2;
         arr->arr = (uintptr_t *)cprealloc(arr->arr, arr->max * sizeof(uintptr_t));
@@ -240,6 +337,22 @@ void pmSpaceBodySetIteratorFuncBatched(cpBody *body, void *data)
     }
 }
 
+void pmBodyArrayGetBatched(cpBody **bodies, int count, void *data)
+{
+    for (int i = 0; i < count; i++)
+    {
+        pmSpaceBodyGetIteratorFuncBatched(bodies[i], data);
+    }
+}
+
+void pmBodyArraySetBatched(cpBody **bodies, int count, void *data)
+{
+    for (int i = 0; i < count; i++)
+    {
+        pmSpaceBodySetIteratorFuncBatched(bodies[i], data);
+    }
+}
+
 void pmSpaceArbiterIteratorFuncBatched(cpArbiter *arbiter, void *data)
 {
     pmBatchedData *d = (pmBatchedData *)data;
@@ -346,6 +459,1257 @@ void pmSpaceArbiterIteratorFuncBatched(cpArbiter *arbiter, void *data)
             pmFloatArrayPush(d->floatArray, 0);
         }
     }
+    if (d->fields & RESTITUTION)
+    {
+        pmFloatArrayPush(d->floatArray, cpArbiterGetRestitution(arbiter));
+    }
+    if (d->fields & FRICTION)
+    {
+        pmFloatArrayPush(d->floatArray, cpArbiterGetFriction(arbiter));
+    }
+    if (d->fields & SURFACE_VELOCITY)
+    {
+        pmFloatArrayPushVect(d->floatArray, cpArbiterGetSurfaceVelocity(arbiter));
+    }
+}
+
+static int pmArbiterSetStride(pmBatchableArbiterFields fields)
+{
+    return ((fields & RESTITUTION) ? 1 : 0) + ((fields & FRICTION) ? 1 : 0) + ((fields & SURFACE_VELOCITY) ? 2 : 0);
+}
+
+static void pmArbiterApplyOverrides(cpArbiter *arbiter, pmFloatArray *floatArray, pmBatchableArbiterFields fields)
+{
+    if (fields & RESTITUTION)
+    {
+        cpArbiterSetRestitution(arbiter, pmFloatArrayPop(floatArray));
+    }
+    if (fields & FRICTION)
+    {
+        cpArbiterSetFriction(arbiter, pmFloatArrayPop(floatArray));
+    }
+    if (fields & SURFACE_VELOCITY)
+    {
+        cpArbiterSetSurfaceVelocity(arbiter, pmFloatArrayPopVect(floatArray));
+    }
+}
+
+void pmSpaceArbiterSetIteratorFuncBatched(cpArbiter *arbiter, void *data)
+{
+    pmBatchedData *d = (pmBatchedData *)data;
+    int stride = pmArbiterSetStride(d->fields);
+
+    if (stride == 0)
+    {
+        return;
+    }
+    // Remember the position of the arbiter in the buffer, so that the values
+    // can be applied again after the arbiter is updated in the next step.
+    uintptr_t rule = (uintptr_t)cpArbiterGetUserData(arbiter) & (PM_ARBITER_RULE_MASK | PM_ARBITER_RULE_DECIDED);
+    uintptr_t index = (uintptr_t)(d->floatArray->num / stride + 1);
+    cpArbiterSetUserData(arbiter, (cpDataPointer)(index << PM_ARBITER_INDEX_SHIFT | rule));
+    pmArbiterApplyOverrides(arbiter, d->floatArray, d->fields);
+}
+
+// Writes the normal and then pointA, pointB and distance of each contact
+// point to out, which must have room for 12 floats. Returns the number of
+// contact points.
+int pmArbiterGetContactData(const cpArbiter *arb, cpFloat *out)
+{
+    cpContactPointSet set = cpArbiterGetContactPointSet(arb);
+    out[0] = set.normal.x;
+    out[1] = set.normal.y;
+    for (int i = 0; i < set.count; i++)
+    {
+        cpFloat *p = out + 2 + i * 5;
+        p[0] = set.points[i].pointA.x;
+        p[1] = set.points[i].pointA.y;
+        p[2] = set.points[i].pointB.x;
+        p[3] = set.points[i].pointB.y;
+        p[4] = set.points[i].distance;
+    }
+    return set.count;
+}
+
+static pmCollisionRule pmArbiterGetCollisionRule(const cpArbiter *arb, cpSpace *space)
+{
+    pmGlobalHandlerData *d = (pmGlobalHandlerData *)cpSpaceGetUserData(space);
+    if (d == NULL || d->rules == NULL)
+    {
+        return COLLISION_RULE_COLLIDE;
+    }
+    cpCollisionType a = arb->a->type, b = arb->b->type;
+    cpCollisionType size = (cpCollisionType)d->rulesSize;
+    if (a >= size || b >= size)
+    {
+        return COLLISION_RULE_COLLIDE;
+    }
+    return (pmCollisionRule)d->rules[a * size + b];
+}
+
+// Decide the collision rule of the arbiter, the first time it is called
+// from a begin function of a new collision. The decided flag is cleared by
+// pmGlobalHandlerPreSolveFunc, which is called after all the begin functions.
+static pmCollisionRule pmArbiterBeginCollisionRule(cpArbiter *arb, cpSpace *space)
+{
+    if (cpSpaceGetUserData(space) == NULL)
+    {
+        // No rules can be set before the global handler is wrapped
+        return COLLISION_RULE_COLLIDE;
+    }
+    uintptr_t data = (uintptr_t)cpArbiterGetUserData(arb);
+    if (!(data & PM_ARBITER_RULE_DECIDED))
+    {
+        data = (data & ~(uintptr_t)PM_ARBITER_RULE_MASK) | PM_ARBITER_RULE_DECIDED | pmArbiterGetCollisionRule(arb, space);
+        cpArbiterSetUserData(arb, (cpDataPointer)data);
+    }
+    return (pmCollisionRule)(data & PM_ARBITER_RULE_MASK);
+}
+
+// The collision rule decided when the collision of the arbiter began.
+static pmCollisionRule pmArbiterGetBeganCollisionRule(const cpArbiter *arb)
+{
+    return (pmCollisionRule)((uintptr_t)cpArbiterGetUserData(arb) & PM_ARBITER_RULE_MASK);
+}
+
+static void pmGlobalHandlerPushEvent(cpArbiter *arb, pmGlobalHandlerData *d, pmCollisionEvents event, pmCollisionRule rule)
+{
+    if (!(d->events & event) || rule == COLLISION_RULE_IGNORE)
+    {
+        return;
+    }
+    // Drop the whole event if it does not fit, so that a partial event is
+    // never written.
+    pmIntArray *ints = d->eventsIntArray;
+    pmFloatArray *floats = d->eventsFloatArray;
+    if ((ints->fixed && ints->num + 7 > ints->max) || (floats->fixed && floats->num + 6 > floats->max))
+    {
+        ints->overflow += 7;
+        floats->overflow += 6;
+        return;
+    }
+    CP_ARBITER_GET_SHAPES(arb, a, b);
+    pmIntArrayPush(d->eventsIntArray, event);
+    pmIntArrayPush(d->eventsIntArray, (uintptr_t)cpShapeGetUserData(a));
+    pmIntArrayPush(d->eventsIntArray, (uintptr_t)cpShapeGetUserData(b));
+    pmIntArrayPush(d->eventsIntArray, (uintptr_t)cpBodyGetUserData(cpShapeGetBody(a)));
+    pmIntArrayPush(d->eventsIntArray, (uintptr_t)cpBodyGetUserData(cpShapeGetBody(b)));
+    pmIntArrayPush(d->eventsIntArray, cpShapeGetCollisionType(a));
+    pmIntArrayPush(d->eventsIntArray, cpShapeGetCollisionType(b));
+
+    // The impulse is only calculated when the collision has been solved
+    pmFloatArrayPushVect(d->eventsFloatArray, event == COLLISION_POST_SOLVE ? cpArbiterTotalImpulse(arb) : cpvzero);
+    pmFloatArrayPushVect(d->eventsFloatArray, cpArbiterGetNormal(arb));
+    pmFloatArrayPushVect(d->eventsFloatArray, cpArbiterGetCount(arb) > 0 ? cpArbiterGetPointA(arb, 0) : cpvzero);
+}
+
+static void pmGlobalHandlerBeginFunc(cpArbiter *arb, cpSpace *space, cpDataPointer data)
+{
+    pmGlobalHandlerData *d = (pmGlobalHandlerData *)cpSpaceGetUserData(space);
+    pmCollisionRule rule = pmArbiterBeginCollisionRule(arb, space);
+    if (rule != COLLISION_RULE_COLLIDE)
+    {
+        cpArbiterSetProcessCollision(arb, cpFalse);
+    }
+    pmGlobalHandlerPushEvent(arb, d, COLLISION_BEGIN, rule);
+    d->beginFunc(arb, space, data);
+}
+
+static void pmGlobalHandlerPreSolveFunc(cpArbiter *arb, cpSpace *space, cpDataPointer data)
+{
+    pmGlobalHandlerData *d = (pmGlobalHandlerData *)cpSpaceGetUserData(space);
+    uintptr_t userData = (uintptr_t)cpArbiterGetUserData(arb);
+    // The begin functions of all the handlers have been called, so the rule
+    // is decided again when the next collision of the arbiter begins.
+    cpArbiterSetUserData(arb, (cpDataPointer)(userData & ~(uintptr_t)PM_ARBITER_RULE_DECIDED));
+    uintptr_t index = userData >> PM_ARBITER_INDEX_SHIFT;
+    int stride = pmArbiterSetStride(d->overridesFields);
+
+    if (index > 0 && stride > 0 && (int)index * stride <= d->overridesArray->num)
+    {
+        pmFloatArray arr = *d->overridesArray;
+        arr.num = ((int)index - 1) * stride;
+        pmArbiterApplyOverrides(arb, &arr, d->overridesFields);
+    }
+    d->preSolveFunc(arb, space, data);
+}
+
+static void pmGlobalHandlerPostSolveFunc(cpArbiter *arb, cpSpace *space, cpDataPointer data)
+{
+    pmGlobalHandlerData *d = (pmGlobalHandlerData *)cpSpaceGetUserData(space);
+    pmGlobalHandlerPushEvent(arb, d, COLLISION_POST_SOLVE, pmArbiterGetBeganCollisionRule(arb));
+    d->postSolveFunc(arb, space, data);
+}
+
+static void pmGlobalHandlerSeparateFunc(cpArbiter *arb, cpSpace *space, cpDataPointer data)
+{
+    pmGlobalHandlerData *d = (pmGlobalHandlerData *)cpSpaceGetUserData(space);
+    pmGlobalHandlerPushEvent(arb, d, COLLISION_SEPARATE, pmArbiterGetBeganCollisionRule(arb));
+    d->separateFunc(arb, space, data);
+}
+
+// Wraps the functions of the global collision handler of the space with the
+// functions above, which call the wrapped functions when done.
+void pmSpaceWrapGlobalHandler(cpSpace *space, pmGlobalHandlerData *d)
+{
+    cpCollisionHandler *handler = cpSpaceAddGlobalCollisionHandler(space);
+    d->beginFunc = handler->beginFunc;
+    d->preSolveFunc = handler->preSolveFunc;
+    d->postSolveFunc = handler->postSolveFunc;
+    d->separateFunc = handler->separateFunc;
+    handler->beginFunc = pmGlobalHandlerBeginFunc;
+    handler->preSolveFunc = pmGlobalHandlerPreSolveFunc;
+    handler->postSolveFunc = pmGlobalHandlerPostSolveFunc;
+    handler->separateFunc = pmGlobalHandlerSeparateFunc;
+    cpSpaceSetUserData(space, d);
+}
+
+void pmSpaceShapeGetIteratorFuncBatched(cpShape *shape, void *data)
+{
+    pmBatchedData *d = (pmBatchedData *)data;
+    cpShapeType type = shape->klass->type;
+    cpBody *body = cpShapeGetBody(shape);
+
+    if (d->fields & SHAPE_ID)
+    {
+        pmIntArrayPush(d->intArray, (uintptr_t)cpShapeGetUserData(shape));
+    }
+    if (d->fields & SHAPE_BODY_ID)
+    {
+        pmIntArrayPush(d->intArray, body ? (uintptr_t)cpBodyGetUserData(body) : 0);
+    }
+    if (d->fields & SHAPE_TYPE)
+    {
+        pmIntArrayPush(d->intArray, (uintptr_t)type);
+    }
+    if (d->fields & SHAPE_BB)
+    {
+        cpBB bb = cpShapeGetBB(shape);
+        pmFloatArrayPush(d->floatArray, bb.l);
+        pmFloatArrayPush(d->floatArray, bb.b);
+        pmFloatArrayPush(d->floatArray, bb.r);
+        pmFloatArrayPush(d->floatArray, bb.t);
+    }
+    if (d->fields & SHAPE_RADIUS)
+    {
+        switch (type)
+        {
+        case CP_CIRCLE_SHAPE:
+            pmFloatArrayPush(d->floatArray, cpCircleShapeGetRadius(shape));
+            break;
+        case CP_SEGMENT_SHAPE:
+            pmFloatArrayPush(d->floatArray, cpSegmentShapeGetRadius(shape));
+            break;
+        default:
+            pmFloatArrayPush(d->floatArray, cpPolyShapeGetRadius(shape));
+        }
+    }
+    if (d->fields & CIRCLE_CENTER)
+    {
+        if (type == CP_CIRCLE_SHAPE)
+        {
+            pmFloatArrayPushVect(d->floatArray, cpBodyLocalToWorld(body, cpCircleShapeGetOffset(shape)));
+        }
+        else
+        {
+            pmFloatArrayPushVect(d->floatArray, cpv(0, 0));
+        }
+    }
+    if (d->fields & SEGMENT_ENDPOINTS)
+    {
+        if (type == CP_SEGMENT_SHAPE)
+        {
+            pmFloatArrayPushVect(d->floatArray, cpBodyLocalToWorld(body, cpSegmentShapeGetA(shape)));
+            pmFloatArrayPushVect(d->floatArray, cpBodyLocalToWorld(body, cpSegmentShapeGetB(shape)));
+        }
+        else
+        {
+            pmFloatArrayPushVect(d->floatArray, cpv(0, 0));
+            pmFloatArrayPushVect(d->floatArray, cpv(0, 0));
+        }
+    }
+    if (d->fields & POLY_VERTICES)
+    {
+        if (type == CP_POLY_SHAPE)
+        {
+            int count = cpPolyShapeGetCount(shape);
+            pmIntArrayPush(d->intArray, count);
+            for (int i = 0; i < count; i++)
+            {
+                pmFloatArrayPushVect(d->floatArray, cpBodyLocalToWorld(body, cpPolyShapeGetVert(shape, i)));
+            }
+        }
+        else
+        {
+            pmIntArrayPush(d->intArray, 0);
+        }
+    }
+}
+
+//
+// Batched space queries. Each hit is written as the index of the query and
+// the shape id to the int array, followed by any query specific values to the
+// float array.
+//
+// The queries can be split between several threads. The space is locked once
+// around all the queries, and the spatial indexes are then queried directly
+// (instead of with cpSpacePointQuery and friends) since locking the space is
+// not thread safe. Each thread writes to its own arrays, which are appended
+// in order afterwards so the result is the same as when run on one thread.
+//
+
+typedef struct pmBatchedQuery pmBatchedQuery;
+typedef void (*pmBatchedQueryFunc)(pmBatchedQuery *q, int start, int end, pmBatchedData *data);
+
+struct pmBatchedQuery
+{
+    cpSpace *space;
+    const cpFloat *inputs;
+    cpFloat param;
+    cpShapeFilter filter;
+    pmBatchedQueryFunc func;
+};
+
+typedef struct pmBatchedQueryContext
+{
+    pmBatchedQuery *q;
+    pmBatchedData *data;
+    uintptr_t index;
+    cpVect start, end;
+    cpBB bb;
+} pmBatchedQueryContext;
+
+static void pmBatchedQueryPushHit(pmBatchedQueryContext *c, cpShape *shape)
+{
+    pmIntArrayPush(c->data->intArray, c->index);
+    pmIntArrayPush(c->data->intArray, (uintptr_t)cpShapeGetUserData(shape));
+}
+
+static cpCollisionID pmBatchedPointQueryFunc(pmBatchedQueryContext *c, cpShape *shape, cpCollisionID id, void *unused)
+{
+    if (!cpShapeFilterReject(shape->filter, c->q->filter))
+    {
+        cpPointQueryInfo info;
+        cpShapePointQuery(shape, c->start, &info);
+
+        if (info.shape && info.distance < c->q->param)
+        {
+            pmBatchedQueryPushHit(c, shape);
+            pmFloatArrayPushVect(c->data->floatArray, info.point);
+            pmFloatArrayPush(c->data->floatArray, info.distance);
+            pmFloatArrayPushVect(c->data->floatArray, info.gradient);
+        }
+    }
+    return id;
+}
+
+static void pmPointQueryRange(pmBatchedQuery *q, int start, int end, pmBatchedData *data)
+{
+    pmBatchedQueryContext c = {q, data, 0};
+    for (int i = start; i < end; i++)
+    {
+        c.index = i;
+        c.start = cpv(q->inputs[2 * i], q->inputs[2 * i + 1]);
+        cpBB bb = cpBBNewForCircle(c.start, cpfmax(q->param, 0.0f));
+        cpSpatialIndexQuery(q->space->dynamicShapes, &c, bb, (cpSpatialIndexQueryFunc)pmBatchedPointQueryFunc, NULL);
+        cpSpatialIndexQuery(q->space->staticShapes, &c, bb, (cpSpatialIndexQueryFunc)pmBatchedPointQueryFunc, NULL);
+    }
+}
+
+static cpFloat pmBatchedSegmentQueryFunc(pmBatchedQueryContext *c, cpShape *shape, void *unused)
+{
+    cpSegmentQueryInfo info;
+    if (!cpShapeFilterReject(shape->filter, c->q->filter) &&
+        cpShapeSegmentQuery(shape, c->start, c->end, c->q->param, &info))
+    {
+        pmBatchedQueryPushHit(c, shape);
+        pmFloatArrayPushVect(c->data->floatArray, info.point);
+        pmFloatArrayPushVect(c->data->floatArray, info.normal);
+        pmFloatArrayPush(c->data->floatArray, info.alpha);
+    }
+    return 1.0f;
+}
+
+static void pmSegmentQueryRange(pmBatchedQuery *q, int start, int end, pmBatchedData *data)
+{
+    pmBatchedQueryContext c = {q, data, 0};
+    for (int i = start; i < end; i++)
+    {
+        const cpFloat *s = q->inputs + 4 * i;
+        c.index = i;
+        c.start = cpv(s[0], s[1]);
+        c.end = cpv(s[2], s[3]);
+        cpSpatialIndexSegmentQuery(q->space->staticShapes, &c, c.start, c.end, 1.0f, (cpSpatialIndexSegmentQueryFunc)pmBatchedSegmentQueryFunc, NULL);
+        cpSpatialIndexSegmentQuery(q->space->dynamicShapes, &c, c.start, c.end, 1.0f, (cpSpatialIndexSegmentQueryFunc)pmBatchedSegmentQueryFunc, NULL);
+    }
+}
+
+static void pmSegmentQueryFirstRange(pmBatchedQuery *q, int start, int end, pmBatchedData *data)
+{
+    for (int i = start; i < end; i++)
+    {
+        const cpFloat *s = q->inputs + 4 * i;
+        cpSegmentQueryInfo info;
+        cpShape *shape = cpSpaceSegmentQueryFirst(q->space, cpv(s[0], s[1]), cpv(s[2], s[3]), q->param, q->filter, &info);
+
+        pmIntArrayPush(data->intArray, shape != NULL);
+        pmIntArrayPush(data->intArray, shape ? (uintptr_t)cpShapeGetUserData(shape) : 0);
+        pmFloatArrayPushVect(data->floatArray, info.point);
+        pmFloatArrayPushVect(data->floatArray, info.normal);
+        pmFloatArrayPush(data->floatArray, info.alpha);
+    }
+}
+
+static cpCollisionID pmBatchedBBQueryFunc(pmBatchedQueryContext *c, cpShape *shape, cpCollisionID id, void *unused)
+{
+    if (!cpShapeFilterReject(shape->filter, c->q->filter) && cpBBIntersects(c->bb, shape->bb))
+    {
+        pmBatchedQueryPushHit(c, shape);
+    }
+    return id;
+}
+
+static void pmBBQueryRange(pmBatchedQuery *q, int start, int end, pmBatchedData *data)
+{
+    pmBatchedQueryContext c = {q, data, 0};
+    for (int i = start; i < end; i++)
+    {
+        const cpFloat *b = q->inputs + 4 * i;
+        c.index = i;
+        c.bb = cpBBNew(b[0], b[1], b[2], b[3]);
+        cpSpatialIndexQuery(q->space->dynamicShapes, &c, c.bb, (cpSpatialIndexQueryFunc)pmBatchedBBQueryFunc, NULL);
+        cpSpatialIndexQuery(q->space->staticShapes, &c, c.bb, (cpSpatialIndexQueryFunc)pmBatchedBBQueryFunc, NULL);
+    }
+}
+
+// The spatial hash marks the shapes it visits during a query, and so can only
+// be queried by one thread at a time. The bounding box trees are read only.
+static cpBool pmSpaceHasBBTrees(cpSpace *space)
+{
+    static cpSpatialIndexClass *bbTreeKlass = NULL;
+    if (bbTreeKlass == NULL)
+    {
+        cpSpatialIndex *tree = cpBBTreeNew(NULL, NULL);
+        bbTreeKlass = tree->klass;
+        cpSpatialIndexFree(tree);
+    }
+    return space->staticShapes->klass == bbTreeKlass && space->dynamicShapes->klass == bbTreeKlass;
+}
+
+#ifndef _WIN32
+
+typedef struct pmBatchedQueryWorker
+{
+    pthread_t thread;
+    pmBatchedQuery *q;
+    int start, end;
+    pmBatchedData data;
+} pmBatchedQueryWorker;
+
+static void *pmBatchedQueryWorkerRun(void *arg)
+{
+    pmBatchedQueryWorker *w = (pmBatchedQueryWorker *)arg;
+    w->q->func(w->q, w->start, w->end, &w->data);
+    return NULL;
+}
+
+static void pmBatchedQueryAppend(pmBatchedData *dst, pmBatchedData *src)
+{
+    for (int i = 0; i < src->intArray->num; i++)
+    {
+        pmIntArrayPush(dst->intArray, src->intArray->arr[i]);
+    }
+    for (int i = 0; i < src->floatArray->num; i++)
+    {
+        pmFloatArrayPush(dst->floatArray, src->floatArray->arr[i]);
+    }
+}
+
+#endif
+
+static void pmBatchedQueryRun(pmBatchedQuery *q, int count, int threads, pmBatchedData *data)
+{
+    cpSpaceLock(q->space);
+#ifndef _WIN32
+    if (threads > count)
+    {
+        threads = count;
+    }
+    if (threads > 1 && pmSpaceHasBBTrees(q->space))
+    {
+        int chunk = (count + threads - 1) / threads;
+        pmBatchedQueryWorker *workers = (pmBatchedQueryWorker *)cpcalloc(threads, sizeof(pmBatchedQueryWorker));
+
+        // The calling thread runs the first chunk directly into data.
+        for (int i = 1; i < threads; i++)
+        {
+            pmBatchedQueryWorker *w = workers + i;
+            w->q = q;
+            w->start = i * chunk;
+            w->end = (i + 1) * chunk < count ? (i + 1) * chunk : count;
+            w->data.intArray = pmIntArrayNew(0);
+            w->data.floatArray = pmFloatArrayNew(0);
+            if (pthread_create(&w->thread, NULL, pmBatchedQueryWorkerRun, w) != 0)
+            {
+                // Fall back to run the chunk after the others on this thread.
+                w->q = NULL;
+            }
+        }
+        q->func(q, 0, chunk, data);
+        for (int i = 1; i < threads; i++)
+        {
+            pmBatchedQueryWorker *w = workers + i;
+            if (w->q)
+            {
+                pthread_join(w->thread, NULL);
+            }
+            else
+            {
+                q->func(q, w->start, w->end, &w->data);
+            }
+            pmBatchedQueryAppend(data, &w->data);
+            pmIntArrayFree(w->data.intArray);
+            pmFloatArrayFree(w->data.floatArray);
+        }
+        cpfree(workers);
+    }
+    else
+#endif
+    {
+        q->func(q, 0, count, data);
+    }
+    cpSpaceUnlock(q->space, cpTrue);
+}
+
+void pmSpacePointQueryBatched(cpSpace *space, const cpFloat *points, int count, cpFloat maxDistance, cpShapeFilter filter, int threads, pmBatchedData *data)
+{
+    pmBatchedQuery q = {space, points, maxDistance, filter, pmPointQueryRange};
+    pmBatchedQueryRun(&q, count, threads, data);
+}
+
+void pmSpaceSegmentQueryBatched(cpSpace *space, const cpFloat *segments, int count, cpFloat radius, cpShapeFilter filter, int threads, pmBatchedData *data)
+{
+    pmBatchedQuery q = {space, segments, radius, filter, pmSegmentQueryRange};
+    pmBatchedQueryRun(&q, count, threads, data);
+}
+
+void pmSpaceSegmentQueryFirstBatched(cpSpace *space, const cpFloat *segments, int count, cpFloat radius, cpShapeFilter filter, int threads, pmBatchedData *data)
+{
+    pmBatchedQuery q = {space, segments, radius, filter, pmSegmentQueryFirstRange};
+    pmBatchedQueryRun(&q, count, threads, data);
+}
+
+void pmSpaceBBQueryBatched(cpSpace *space, const cpFloat *bbs, int count, cpShapeFilter filter, int threads, pmBatchedData *data)
+{
+    pmBatchedQuery q = {space, bbs, 0.0f, filter, pmBBQueryRange};
+    pmBatchedQueryRun(&q, count, threads, data);
+}
+
+//
+// Functions to step many spaces in parallel
+//
+
+// Defined by CFFI from the extern "Python" declarations in callbacks_cdef.h
+static void ext_cpConstraintPreSolveFunc(cpConstraint *constraint, cpSpace *space);
+static void ext_cpConstraintPostSolveFunc(cpConstraint *constraint, cpSpace *space);
+static cpFloat ext_cpDampedSpringForceFunc(cpConstraint *constraint, cpFloat dist);
+static cpFloat ext_cpDampedRotarySpringTorqueFunc(cpConstraint *constraint, cpFloat relative_angle);
+static void ext_cpBodyVelocityFunc(cpBody *body, cpVect gravity, cpFloat damping, cpFloat dt);
+static void ext_cpBodyPositionFunc(cpBody *body, cpFloat dt);
+static void ext_cpCollisionBeginFunc(cpArbiter *arb, cpSpace *space, cpDataPointer userData);
+static void ext_cpCollisionPreSolveFunc(cpArbiter *arb, cpSpace *space, cpDataPointer userData);
+static void ext_cpCollisionPostSolveFunc(cpArbiter *arb, cpSpace *space, cpDataPointer userData);
+static void ext_cpCollisionSeparateFunc(cpArbiter *arb, cpSpace *space, cpDataPointer userData);
+
+// The functions of collision handlers with Python callbacks. The callbacks
+// are skipped for collisions ignored by the collision rules of the space.
+static void pmCollisionBeginFunc(cpArbiter *arb, cpSpace *space, cpDataPointer userData)
+{
+    pmCollisionRule rule = pmArbiterBeginCollisionRule(arb, space);
+    if (rule == COLLISION_RULE_IGNORE)
+    {
+        return;
+    }
+    if (rule == COLLISION_RULE_SENSOR)
+    {
+        cpArbiterSetProcessCollision(arb, cpFalse);
+    }
+    ext_cpCollisionBeginFunc(arb, space, userData);
+}
+
+static void pmCollisionPreSolveFunc(cpArbiter *arb, cpSpace *space, cpDataPointer userData)
+{
+    if (pmArbiterGetBeganCollisionRule(arb) != COLLISION_RULE_IGNORE)
+    {
+        ext_cpCollisionPreSolveFunc(arb, space, userData);
+    }
+}
+
+static void pmCollisionPostSolveFunc(cpArbiter *arb, cpSpace *space, cpDataPointer userData)
+{
+    if (pmArbiterGetBeganCollisionRule(arb) != COLLISION_RULE_IGNORE)
+    {
+        ext_cpCollisionPostSolveFunc(arb, space, userData);
+    }
+}
+
+static void pmCollisionSeparateFunc(cpArbiter *arb, cpSpace *space, cpDataPointer userData)
+{
+    if (pmArbiterGetBeganCollisionRule(arb) != COLLISION_RULE_IGNORE)
+    {
+        ext_cpCollisionSeparateFunc(arb, space, userData);
+    }
+}
+
+// Set from Python on collision handlers with Python callbacks
+cpCollisionHandler pmPythonCollisionHandler = {
+    0, 0, pmCollisionBeginFunc, pmCollisionPreSolveFunc, pmCollisionPostSolveFunc, pmCollisionSeparateFunc, NULL};
+
+static cpBool pmCollisionHandlerHasPythonCallbacks(cpSpace *space, cpCollisionHandler *handler)
+{
+    cpCollisionBeginFunc beginFunc = handler->beginFunc;
+    cpCollisionPreSolveFunc preSolveFunc = handler->preSolveFunc;
+    cpCollisionPostSolveFunc postSolveFunc = handler->postSolveFunc;
+    cpCollisionSeparateFunc separateFunc = handler->separateFunc;
+    if (beginFunc == pmGlobalHandlerBeginFunc)
+    {
+        // The functions of the handler are wrapped by pymunk.batch
+        pmGlobalHandlerData *d = (pmGlobalHandlerData *)cpSpaceGetUserData(space);
+        beginFunc = d->beginFunc;
+        preSolveFunc = d->preSolveFunc;
+        postSolveFunc = d->postSolveFunc;
+        separateFunc = d->separateFunc;
+    }
+    return beginFunc == pmCollisionBeginFunc ||
+           preSolveFunc == pmCollisionPreSolveFunc ||
+           postSolveFunc == pmCollisionPostSolveFunc ||
+           separateFunc == pmCollisionSeparateFunc;
+}
+
+static void pmCollisionHandlerCheckIterator(void *elt, void *data)
+{
+    cpSpace **space = (cpSpace **)data;
+    if (*space && pmCollisionHandlerHasPythonCallbacks(*space, (cpCollisionHandler *)elt))
+    {
+        // Mark that a Python callback was found
+        *space = NULL;
+    }
+}
+
+static void pmBodyCheckIterator(cpBody *body, void *data)
+{
+    if (body->velocity_func == ext_cpBodyVelocityFunc || body->position_func == ext_cpBodyPositionFunc)
+    {
+        *(cpBool *)data = cpTrue;
+    }
+}
+
+int pmSpaceHasPythonCallbacks(cpSpace *space)
+{
+    if (pmCollisionHandlerHasPythonCallbacks(space, &space->globalHandler))
+    {
+        return 1;
+    }
+
+    cpSpace *handlerSpace = space;
+    cpHashSetEach(space->collisionHandlers, pmCollisionHandlerCheckIterator, &handlerSpace);
+    if (handlerSpace == NULL)
+    {
+        return 1;
+    }
+
+    for (int i = 0; i < space->constraints->num; i++)
+    {
+        cpConstraint *c = (cpConstraint *)space->constraints->arr[i];
+        if (c->preSolve == ext_cpConstraintPreSolveFunc || c->postSolve == ext_cpConstraintPostSolveFunc)
+        {
+            return 1;
+        }
+        if (cpConstraintIsDampedSpring(c) && cpDampedSpringGetSpringForceFunc(c) == ext_cpDampedSpringForceFunc)
+        {
+            return 1;
+        }
+        if (cpConstraintIsDampedRotarySpring(c) && cpDampedRotarySpringGetSpringTorqueFunc(c) == ext_cpDampedRotarySpringTorqueFunc)
+        {
+            return 1;
+        }
+    }
+
+    cpBool found = cpFalse;
+    cpSpaceEachBody(space, pmBodyCheckIterator, &found);
+    return found;
+}
+
+void pmSpaceStoreTransforms(cpSpace *space, pmBatchedData *previous)
+{
+    previous->intArray->num = 0;
+    previous->floatArray->num = 0;
+    previous->fields = BODY_ID | POSITION | ANGLE;
+    cpSpaceEachBody(space, pmSpaceBodyGetIteratorFuncBatched, previous);
+}
+
+typedef struct pmInterpolateContext
+{
+    pmBatchedData *previous;
+    pmBatchedData *data;
+    cpFloat alpha;
+    int index;
+} pmInterpolateContext;
+
+static void pmSpaceBodyInterpolateIteratorFunc(cpBody *body, void *data)
+{
+    pmInterpolateContext *c = (pmInterpolateContext *)data;
+    pmIntArray *ids = c->previous->intArray;
+    uintptr_t id = (uintptr_t)cpBodyGetUserData(body);
+
+    // The bodies are usually in the same order as when the transforms were
+    // stored, so first check the same index before searching all of them.
+    int found = -1;
+    if (c->index < ids->num && ids->arr[c->index] == id)
+    {
+        found = c->index;
+    }
+    else
+    {
+        for (int i = 0; i < ids->num; i++)
+        {
+            if (ids->arr[i] == id)
+            {
+                found = i;
+                break;
+            }
+        }
+    }
+    c->index++;
+
+    cpVect p = cpBodyGetPosition(body);
+    cpFloat a = cpBodyGetAngle(body);
+    if (found >= 0)
+    {
+        cpFloat *prev = c->previous->floatArray->arr + 3 * found;
+        p = cpvlerp(cpv(prev[0], prev[1]), p, c->alpha);
+        a = cpflerp(prev[2], a, c->alpha);
+    }
+
+    pmBatchedData *d = c->data;
+    if (d->fields & BODY_ID)
+    {
+        pmIntArrayPush(d->intArray, id);
+    }
+    if (d->fields & POSITION)
+    {
+        pmFloatArrayPushVect(d->floatArray, p);
+    }
+    if (d->fields & ANGLE)
+    {
+        pmFloatArrayPush(d->floatArray, a);
+    }
+}
+
+void pmSpaceInterpolateBodies(cpSpace *space, pmBatchedData *previous, cpFloat alpha, pmBatchedData *data)
+{
+    pmInterpolateContext c = {previous, data, alpha, 0};
+    cpSpaceEachBody(space, pmSpaceBodyInterpolateIteratorFunc, &c);
+}
+
+static void pmSpaceStepOnce(cpSpace *space, int hasty, cpFloat dt)
+{
+#ifndef _WIN32
+    if (hasty)
+    {
+        cpHastySpaceStep(space, dt);
+        return;
+    }
+#endif
+    cpSpaceStep(space, dt);
+}
+
+void pmSpaceStepRepeated(cpSpace *space, int hasty, cpFloat dt, int steps, pmBatchedData *previous)
+{
+    for (int i = 0; i < steps; i++)
+    {
+        if (previous != NULL && i == steps - 1)
+        {
+            pmSpaceStoreTransforms(space, previous);
+        }
+        pmSpaceStepOnce(space, hasty, dt);
+    }
+}
+
+#ifndef _WIN32
+
+typedef struct pmSpaceStepManyContext
+{
+    cpSpace **spaces;
+    int *hasty;
+    pmBatchedData **previous;
+    int count;
+    cpFloat dt;
+    int next;
+    pthread_mutex_t mutex;
+} pmSpaceStepManyContext;
+
+static void *pmSpaceStepManyWorker(void *arg)
+{
+    pmSpaceStepManyContext *c = (pmSpaceStepManyContext *)arg;
+    for (;;)
+    {
+        // Take one space at a time, so that spaces of different sizes are
+        // spread evenly over the threads.
+        pthread_mutex_lock(&c->mutex);
+        int i = c->next++;
+        pthread_mutex_unlock(&c->mutex);
+
+        if (i >= c->count)
+        {
+            return NULL;
+        }
+        pmSpaceStepRepeated(c->spaces[i], c->hasty[i], c->dt, 1, c->previous[i]);
+    }
+}
+
+#endif
+
+void pmSpaceStepMany(cpSpace **spaces, int *hasty, pmBatchedData **previous, int count, cpFloat dt, int threads)
+{
+#ifndef _WIN32
+    if (threads > count)
+    {
+        threads = count;
+    }
+    if (threads > 1)
+    {
+        pmSpaceStepManyContext c = {spaces, hasty, previous, count, dt, 0};
+        pthread_mutex_init(&c.mutex, NULL);
+        pthread_t *workers = (pthread_t *)cpcalloc(threads - 1, sizeof(pthread_t));
+        int started = 0;
+        for (; started < threads - 1; started++)
+        {
+            if (pthread_create(&workers[started], NULL, pmSpaceStepManyWorker, &c) != 0)
+            {
+                break;
+            }
+        }
+        // The calling thread helps out until all spaces are taken.
+        pmSpaceStepManyWorker(&c);
+        for (int i = 0; i < started; i++)
+        {
+            pthread_join(workers[i], NULL);
+        }
+        cpfree(workers);
+        pthread_mutex_destroy(&c.mutex);
+        return;
+    }
+#endif
+    for (int i = 0; i < count; i++)
+    {
+        pmSpaceStepRepeated(spaces[i], hasty[i], dt, 1, previous[i]);
+    }
+}
+
+//
+// Functions to support bulk creation of shapes
+//
+
+void pmCircleShapesNew(cpBody *body, const cpFloat *centers, const cpFloat *radii, int count, cpShape **shapes)
+{
+    for (int i = 0; i < count; i++)
+    {
+        shapes[i] = cpCircleShapeNew(body, radii[i], cpv(centers[2 * i], centers[2 * i + 1]));
+    }
+}
+
+void pmSegmentShapesNew(cpBody *body, const cpFloat *endpoints, cpFloat radius, int count, cpShape **shapes)
+{
+    for (int i = 0; i < count; i++)
+    {
+        const cpFloat *e = endpoints + 4 * i;
+        shapes[i] = cpSegmentShapeNew(body, cpv(e[0], e[1]), cpv(e[2], e[3]), radius);
+    }
+}
+
+void pmPolyShapesNew(cpBody *body, const cpFloat *vertices, int vertexCount, const int *offsets, int count, cpFloat radius, cpShape **shapes)
+{
+    for (int i = 0; i < count; i++)
+    {
+        int end = (i + 1 < count ? offsets[i + 1] : vertexCount);
+        const cpVect *verts = (const cpVect *)(vertices + 2 * offsets[i]);
+        shapes[i] = cpPolyShapeNew(body, end - offsets[i], verts, cpTransformIdentity, radius);
+    }
+}
+
+//
+// Functions to support bulk add of shapes
+//
+
+static int pmGcd(int a, int b)
+{
+    while (b != 0)
+    {
+        int t = a % b;
+        a = b;
+        b = t;
+    }
+    return a;
+}
+
+void pmSpaceAddShapes(cpSpace *space, cpShape **shapes, int count)
+{
+    cpAssertSpaceUnlocked(space);
+
+    int staticCount = 0;
+    for (int i = 0; i < count; i++)
+    {
+        // Same as cpSpaceAddShape, except for the insert into the index
+        cpShape *shape = shapes[i];
+        cpAssertHard(shape->space != space, "You have already added this shape to this space. You must not add it a second time.");
+        cpAssertHard(!shape->space, "You have already added this shape to another space. You cannot add it to a second.");
+        cpAssertHard(shape->body, "The shape's body is not defined.");
+        cpAssertHard(shape->body->space == space, "The shape's body must be added to the space before the shape.");
+
+        cpBody *body = shape->body;
+        cpBool isStatic = (cpBodyGetType(body) == CP_BODY_TYPE_STATIC);
+        if (isStatic)
+        {
+            staticCount++;
+        }
+        else
+        {
+            cpBodyActivate(body);
+        }
+        cpBodyAddShape(body, shape);
+
+        shape->hashid = space->shapeIDCounter++;
+        cpShapeUpdate(shape, body->transform);
+        shape->space = space;
+    }
+
+    // Shapes are often created in a sorted order, for example along the
+    // ground of a level, which makes the bounding box tree very unbalanced
+    // when they are inserted one by one. Insert them in a spread out order
+    // instead, visiting every shape once by stepping with a stride coprime
+    // to count.
+    int stride = count * 0.618 + 1;
+    while (pmGcd(stride, count) != 1)
+    {
+        stride++;
+    }
+    for (int i = 0, j = 0; i < count; i++, j = (j + stride) % count)
+    {
+        cpShape *shape = shapes[j];
+        cpBool isStatic = (cpBodyGetType(shape->body) == CP_BODY_TYPE_STATIC);
+        cpSpatialIndexInsert(isStatic ? space->staticShapes : space->dynamicShapes, shape, shape->hashid);
+    }
+
+    // Static shapes are not reinserted each step, so rebuild the static tree
+    // once if a large part of it was just added.
+    if (staticCount > 1 && 2 * staticCount >= cpSpatialIndexCount(space->staticShapes) && pmSpaceHasBBTrees(space))
+    {
+        cpBBTreeOptimize(space->staticShapes);
+    }
+}
+
+//
+// Functions to support static geometry
+//
+
+typedef struct pmStaticGeometry pmStaticGeometry;
+
+struct pmStaticGeometry
+{
+    // The shapes are stored one after the other in a single block.
+    char *shapes;
+    size_t stride;
+    int count;
+    cpBody *body;
+};
+
+static pmStaticGeometry *pmStaticGeometryAlloc(cpBody *body, size_t stride, int count)
+{
+    pmStaticGeometry *g = (pmStaticGeometry *)cpcalloc(1, sizeof(pmStaticGeometry));
+    g->shapes = (char *)cpcalloc(count > 0 ? count : 1, stride);
+    g->stride = stride;
+    g->count = count;
+    g->body = body;
+    return g;
+}
+
+cpShape *pmStaticGeometryGetShape(pmStaticGeometry *g, int index)
+{
+    return (cpShape *)(g->shapes + index * g->stride);
+}
+
+int pmStaticGeometryGetIndex(pmStaticGeometry *g, cpShape *shape)
+{
+    char *p = (char *)shape;
+    if (p < g->shapes || p >= g->shapes + g->count * g->stride)
+    {
+        return -1;
+    }
+    return (int)((p - g->shapes) / g->stride);
+}
+
+pmStaticGeometry *pmStaticGeometryNewCircles(cpBody *body, const cpFloat *centers, const cpFloat *radii, int count)
+{
+    pmStaticGeometry *g = pmStaticGeometryAlloc(body, sizeof(cpCircleShape), count);
+    for (int i = 0; i < count; i++)
+    {
+        cpCircleShapeInit((cpCircleShape *)pmStaticGeometryGetShape(g, i), body, radii[i], cpv(centers[2 * i], centers[2 * i + 1]));
+    }
+    return g;
+}
+
+pmStaticGeometry *pmStaticGeometryNewSegments(cpBody *body, const cpFloat *endpoints, cpFloat radius, int count)
+{
+    pmStaticGeometry *g = pmStaticGeometryAlloc(body, sizeof(cpSegmentShape), count);
+    for (int i = 0; i < count; i++)
+    {
+        const cpFloat *e = endpoints + 4 * i;
+        cpSegmentShapeInit((cpSegmentShape *)pmStaticGeometryGetShape(g, i), body, cpv(e[0], e[1]), cpv(e[2], e[3]), radius);
+    }
+    return g;
+}
+
+pmStaticGeometry *pmStaticGeometryNewPolys(cpBody *body, const cpFloat *vertices, int vertexCount, const int *offsets, int count, cpFloat radius)
+{
+    pmStaticGeometry *g = pmStaticGeometryAlloc(body, sizeof(cpPolyShape), count);
+    for (int i = 0; i < count; i++)
+    {
+        int end = (i + 1 < count ? offsets[i + 1] : vertexCount);
+        const cpVect *verts = (const cpVect *)(vertices + 2 * offsets[i]);
+        cpPolyShapeInit((cpPolyShape *)pmStaticGeometryGetShape(g, i), body, end - offsets[i], verts, cpTransformIdentity, radius);
+    }
+    return g;
+}
+
+void pmStaticGeometryFree(pmStaticGeometry *g)
+{
+    for (int i = 0; i < g->count; i++)
+    {
+        cpShape *shape = pmStaticGeometryGetShape(g, i);
+        if (shape->space != NULL)
+        {
+            cpSpaceRemoveShape(shape->space, shape);
+        }
+        cpShapeDestroy(shape);
+    }
+    cpfree(g->shapes);
+    cpfree(g);
+}
+
+void pmStaticGeometrySetProperties(pmStaticGeometry *g, cpDataPointer userData, cpFloat friction, cpFloat elasticity, cpCollisionType collisionType, cpShapeFilter filter, cpBool sensor)
+{
+    for (int i = 0; i < g->count; i++)
+    {
+        cpShape *shape = pmStaticGeometryGetShape(g, i);
+        shape->userData = userData;
+        shape->u = friction;
+        shape->e = elasticity;
+        shape->type = collisionType;
+        shape->filter = filter;
+        shape->sensor = sensor;
+    }
+}
+
+void pmSpaceAddStaticGeometry(cpSpace *space, pmStaticGeometry *g)
+{
+    cpShape **shapes = (cpShape **)cpcalloc(g->count > 0 ? g->count : 1, sizeof(cpShape *));
+    for (int i = 0; i < g->count; i++)
+    {
+        shapes[i] = pmStaticGeometryGetShape(g, i);
+        // The body is cleared if a space is freed while the shapes are in it.
+        shapes[i]->body = g->body;
+    }
+    pmSpaceAddShapes(space, shapes, g->count);
+    cpfree(shapes);
+}
+
+void pmSpaceRemoveStaticGeometry(cpSpace *space, pmStaticGeometry *g)
+{
+    for (int i = 0; i < g->count; i++)
+    {
+        cpSpaceRemoveShape(space, pmStaticGeometryGetShape(g, i));
+    }
+}
+
+typedef struct pmStaticGeometryQuery
+{
+    pmStaticGeometry *g;
+    pmIntArray *indices;
+} pmStaticGeometryQuery;
+
+static void pmStaticGeometryQueryPush(pmStaticGeometryQuery *q, cpShape *shape)
+{
+    int index = pmStaticGeometryGetIndex(q->g, shape);
+    if (index >= 0)
+    {
+        pmIntArrayPush(q->indices, index);
+    }
+}
+
+static void pmStaticGeometryPointQueryFunc(cpShape *shape, cpVect point, cpFloat distance, cpVect gradient, void *data)
+{
+    pmStaticGeometryQueryPush((pmStaticGeometryQuery *)data, shape);
+}
+
+static void pmStaticGeometrySegmentQueryFunc(cpShape *shape, cpVect point, cpVect normal, cpFloat alpha, void *data)
+{
+    pmStaticGeometryQueryPush((pmStaticGeometryQuery *)data, shape);
+}
+
+static void pmStaticGeometryBBQueryFunc(cpShape *shape, void *data)
+{
+    pmStaticGeometryQueryPush((pmStaticGeometryQuery *)data, shape);
+}
+
+void pmStaticGeometryPointQuery(cpSpace *space, pmStaticGeometry *g, cpVect point, cpFloat maxDistance, cpShapeFilter filter, pmIntArray *indices)
+{
+    pmStaticGeometryQuery q = {g, indices};
+    cpSpacePointQuery(space, point, maxDistance, filter, pmStaticGeometryPointQueryFunc, &q);
+}
+
+void pmStaticGeometrySegmentQuery(cpSpace *space, pmStaticGeometry *g, cpVect start, cpVect end, cpFloat radius, cpShapeFilter filter, pmIntArray *indices)
+{
+    pmStaticGeometryQuery q = {g, indices};
+    cpSpaceSegmentQuery(space, start, end, radius, filter, pmStaticGeometrySegmentQueryFunc, &q);
+}
+
+void pmStaticGeometryBBQuery(cpSpace *space, pmStaticGeometry *g, cpBB bb, cpShapeFilter filter, pmIntArray *indices)
+{
+    pmStaticGeometryQuery q = {g, indices};
+    cpSpaceBBQuery(space, bb, filter, pmStaticGeometryBBQueryFunc, &q);
+}
+
+//
+// Functions to support built-in velocity integrators
+//
+
+typedef struct pmVelocityIntegrator
+{
+    cpBool customGravity;
+    cpVect gravity;
+    cpVect attractor;
+    cpFloat attractorStrength;
+    cpFloat linearDrag;
+    cpFloat angularDrag;
+    cpFloat maxVelocity;
+    cpFloat maxAngularVelocity;
+    cpBool hook;
+    cpVect acceleration;
+} pmVelocityIntegrator;
+
+// All bodies created by Pymunk are allocated with room for the integrator
+// parameters after the body itself, since cpBody has no spare field (the user
+// data holds the Python handle). cpBodyFree works as usual since the body is
+// the first member.
+typedef struct pmBody
+{
+    cpBody body;
+    pmVelocityIntegrator integrator;
+} pmBody;
+
+cpBody *pmBodyNew(cpFloat mass, cpFloat moment)
+{
+    pmBody *b = (pmBody *)cpcalloc(1, sizeof(pmBody));
+    return cpBodyInit(&b->body, mass, moment);
+}
+
+void pmBodyUpdateVelocity(cpBody *body, cpVect gravity, cpFloat damping, cpFloat dt)
+{
+    // Same as cpBodyUpdateVelocity, kinematic bodies are not integrated
+    if (cpBodyGetType(body) == CP_BODY_TYPE_KINEMATIC)
+    {
+        return;
+    }
+
+    pmVelocityIntegrator *vi = &((pmBody *)body)->integrator;
+    cpVect g = cpvadd(vi->customGravity ? vi->gravity : gravity, vi->acceleration);
+    if (vi->attractorStrength != 0.0f)
+    {
+        // Inverse square attraction toward the attractor point
+        cpVect d = cpvsub(vi->attractor, body->p);
+        cpFloat sqDist = cpvlengthsq(d);
+        if (sqDist > 0.0f)
+        {
+            g = cpvadd(g, cpvmult(d, vi->attractorStrength / (sqDist * cpfsqrt(sqDist))));
+        }
+    }
+
+    cpBodyUpdateVelocity(body, g, damping, dt);
+
+    if (vi->linearDrag != 0.0f)
+    {
+        body->v = cpvmult(body->v, cpfexp(-vi->linearDrag * dt));
+    }
+    if (vi->angularDrag != 0.0f)
+    {
+        body->w *= cpfexp(-vi->angularDrag * dt);
+    }
+    cpFloat sqVel = cpvlengthsq(body->v);
+    if (sqVel > vi->maxVelocity * vi->maxVelocity)
+    {
+        body->v = cpvmult(body->v, vi->maxVelocity / cpfsqrt(sqVel));
+    }
+    body->w = cpfclamp(body->w, -vi->maxAngularVelocity, vi->maxAngularVelocity);
+}
+
+void pmBodySetVelocityIntegrator(cpBody *body, pmVelocityIntegrator integrator)
+{
+    // Keep the acceleration from the last velocity hook call
+    integrator.acceleration = integrator.hook ? ((pmBody *)body)->integrator.acceleration : cpvzero;
+    ((pmBody *)body)->integrator = integrator;
+    cpBodySetVelocityUpdateFunc(body, pmBodyUpdateVelocity);
+}
+
+static pmVelocityIntegrator *pmBodyGetHookIntegrator(cpBody *body)
+{
+    if (body->velocity_func != pmBodyUpdateVelocity || !((pmBody *)body)->integrator.hook)
+    {
+        return NULL;
+    }
+    return &((pmBody *)body)->integrator;
+}
+
+typedef struct pmHookBodies
+{
+    pmBatchedData *data;
+    cpBody **bodies;
+    int maxCount;
+    int count;
+} pmHookBodies;
+
+static void pmSpaceGetHookBodiesIterator(cpBody *body, void *data)
+{
+    pmHookBodies *h = (pmHookBodies *)data;
+    if (h->count < h->maxCount && pmBodyGetHookIntegrator(body) != NULL)
+    {
+        pmSpaceBodyGetIteratorFuncBatched(body, h->data);
+        h->bodies[h->count] = body;
+        h->count++;
+    }
+}
+
+// Get the data of the bodies using the velocity hook (at most maxCount of
+// them), store the bodies in the bodies array and return their count.
+int pmSpaceGetHookBodies(cpSpace *space, pmBatchedData *data, cpBody **bodies, int maxCount)
+{
+    pmHookBodies h = {data, bodies, maxCount, 0};
+    cpSpaceEachBody(space, pmSpaceGetHookBodiesIterator, &h);
+    return h.count;
+}
+
+// Set the acceleration of the bodies returned by pmSpaceGetHookBodies. Bodies
+// that no longer use the velocity hook are skipped.
+void pmBodiesSetHookAccelerations(cpBody **bodies, int count, const cpFloat *accelerations)
+{
+    for (int i = 0; i < count; i++)
+    {
+        pmVelocityIntegrator *vi = pmBodyGetHookIntegrator(bodies[i]);
+        if (vi != NULL)
+        {
+            vi->acceleration = cpv(accelerations[2 * i], accelerations[2 * i + 1]);
+        }
+    }
 }
 
 //
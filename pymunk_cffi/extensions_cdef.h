@@ -31,8 +31,38 @@ typedef enum pmBatchableArbiterFields
 	POINT_A_2 = 1 << 10,
 	POINT_B_2 = 1 << 11,
 	DISTANCE_2 = 1 << 12,
+
+	RESTITUTION = 1 << 13,
+	FRICTION = 1 << 14,
+	SURFACE_VELOCITY = 1 << 15,
 } pmBatchableArbiterFields;
 
+typedef enum pmBatchableShapeFields
+{
+	SHAPE_ID = 1 << 0,
+	SHAPE_BODY_ID = 1 << 1,
+	SHAPE_TYPE = 1 << 2,
+	SHAPE_BB = 1 << 3,
+	SHAPE_RADIUS = 1 << 4,
+	CIRCLE_CENTER = 1 << 5,
+	SEGMENT_ENDPOINTS = 1 << 6,
+	POLY_VERTICES = 1 << 7,
+} pmBatchableShapeFields;
+
+typedef enum pmCollisionEvents
+{
+	COLLISION_BEGIN = 1 << 0,
+	COLLISION_POST_SOLVE = 1 << 1,
+	COLLISION_SEPARATE = 1 << 2,
+} pmCollisionEvents;
+
+typedef enum pmCollisionRule
+{
+	COLLISION_RULE_COLLIDE = 0,
+	COLLISION_RULE_IGNORE = 1,
+	COLLISION_RULE_SENSOR = 2,
+} pmCollisionRule;
+
 typedef struct pmFloatArray pmFloatArray;
 typedef struct pmIntArray pmIntArray;
 typedef struct pmBatchedData pmBatchedData;
@@ -41,12 +71,18 @@ struct pmFloatArray
 {
 	int num, max;
 	cpFloat *arr;
+	// If set the array is never grown. Items that do not fit are dropped
+	// and counted in overflow instead.
+	int fixed, overflow;
 };
 
 struct pmIntArray
 {
 	int num, max;
 	uintptr_t *arr;
+	// If set the array is never grown. Items that do not fit are dropped
+	// and counted in overflow instead.
+	int fixed, overflow;
 };
 
 struct pmBatchedData
@@ -56,6 +92,23 @@ struct pmBatchedData
 	pmBatchableBodyFields fields;
 };
 
+typedef struct pmGlobalHandlerData pmGlobalHandlerData;
+
+struct pmGlobalHandlerData
+{
+	pmFloatArray *overridesArray;
+	pmBatchableArbiterFields overridesFields;
+	pmIntArray *eventsIntArray;
+	pmFloatArray *eventsFloatArray;
+	pmCollisionEvents events;
+	cpCollisionBeginFunc beginFunc;
+	cpCollisionPreSolveFunc preSolveFunc;
+	cpCollisionPostSolveFunc postSolveFunc;
+	cpCollisionSeparateFunc separateFunc;
+	unsigned char *rules;
+	int rulesSize;
+};
+
 pmFloatArray *pmFloatArrayNew(int size);
 void pmFloatArrayFree(pmFloatArray *arr);
 void pmFloatArrayPush(pmFloatArray *arr, cpFloat v);
@@ -70,7 +123,82 @@ uintptr_t pmIntArrayPop(pmIntArray *arr);
 
 void pmSpaceBodyGetIteratorFuncBatched(cpBody *body, void *data);
 void pmSpaceBodySetIteratorFuncBatched(cpBody *body, void *data);
+void pmBodyArrayGetBatched(cpBody **bodies, int count, void *data);
+void pmBodyArraySetBatched(cpBody **bodies, int count, void *data);
 void pmSpaceArbiterIteratorFuncBatched(cpArbiter *arbiter, void *data);
+void pmSpaceArbiterSetIteratorFuncBatched(cpArbiter *arbiter, void *data);
+void pmSpaceWrapGlobalHandler(cpSpace *space, pmGlobalHandlerData *d);
+extern cpCollisionHandler pmPythonCollisionHandler;
+int pmArbiterGetContactData(const cpArbiter *arb, cpFloat *out);
+void pmSpaceShapeGetIteratorFuncBatched(cpShape *shape, void *data);
+
+void pmSpacePointQueryBatched(cpSpace *space, const cpFloat *points, int count, cpFloat maxDistance, cpShapeFilter filter, int threads, pmBatchedData *data);
+void pmSpaceSegmentQueryBatched(cpSpace *space, const cpFloat *segments, int count, cpFloat radius, cpShapeFilter filter, int threads, pmBatchedData *data);
+void pmSpaceSegmentQueryFirstBatched(cpSpace *space, const cpFloat *segments, int count, cpFloat radius, cpShapeFilter filter, int threads, pmBatchedData *data);
+void pmSpaceBBQueryBatched(cpSpace *space, const cpFloat *bbs, int count, cpShapeFilter filter, int threads, pmBatchedData *data);
+
+int pmSpaceHasPythonCallbacks(cpSpace *space);
+void pmSpaceStoreTransforms(cpSpace *space, pmBatchedData *previous);
+void pmSpaceInterpolateBodies(cpSpace *space, pmBatchedData *previous, cpFloat alpha, pmBatchedData *data);
+void pmSpaceStepRepeated(cpSpace *space, int hasty, cpFloat dt, int steps, pmBatchedData *previous);
+void pmSpaceStepMany(cpSpace **spaces, int *hasty, pmBatchedData **previous, int count, cpFloat dt, int threads);
+
+//
+// Functions to support bulk creation of shapes
+//
+
+void pmCircleShapesNew(cpBody *body, const cpFloat *centers, const cpFloat *radii, int count, cpShape **shapes);
+void pmSegmentShapesNew(cpBody *body, const cpFloat *endpoints, cpFloat radius, int count, cpShape **shapes);
+void pmPolyShapesNew(cpBody *body, const cpFloat *vertices, int vertexCount, const int *offsets, int count, cpFloat radius, cpShape **shapes);
+
+//
+// Functions to support bulk add of shapes
+//
+
+void pmSpaceAddShapes(cpSpace *space, cpShape **shapes, int count);
+
+//
+// Functions to support static geometry
+//
+
+typedef struct pmStaticGeometry pmStaticGeometry;
+
+cpShape *pmStaticGeometryGetShape(pmStaticGeometry *g, int index);
+int pmStaticGeometryGetIndex(pmStaticGeometry *g, cpShape *shape);
+pmStaticGeometry *pmStaticGeometryNewCircles(cpBody *body, const cpFloat *centers, const cpFloat *radii, int count);
+pmStaticGeometry *pmStaticGeometryNewSegments(cpBody *body, const cpFloat *endpoints, cpFloat radius, int count);
+pmStaticGeometry *pmStaticGeometryNewPolys(cpBody *body, const cpFloat *vertices, int vertexCount, const int *offsets, int count, cpFloat radius);
+void pmStaticGeometryFree(pmStaticGeometry *g);
+void pmStaticGeometrySetProperties(pmStaticGeometry *g, cpDataPointer userData, cpFloat friction, cpFloat elasticity, cpCollisionType collisionType, cpShapeFilter filter, cpBool sensor);
+void pmSpaceAddStaticGeometry(cpSpace *space, pmStaticGeometry *g);
+void pmSpaceRemoveStaticGeometry(cpSpace *space, pmStaticGeometry *g);
+void pmStaticGeometryPointQuery(cpSpace *space, pmStaticGeometry *g, cpVect point, cpFloat maxDistance, cpShapeFilter filter, pmIntArray *indices);
+void pmStaticGeometrySegmentQuery(cpSpace *space, pmStaticGeometry *g, cpVect start, cpVect end, cpFloat radius, cpShapeFilter filter, pmIntArray *indices);
+void pmStaticGeometryBBQuery(cpSpace *space, pmStaticGeometry *g, cpBB bb, cpShapeFilter filter, pmIntArray *indices);
+
+//
+// Functions to support built-in velocity integrators
+//
+
+typedef struct pmVelocityIntegrator
+{
+	cpBool customGravity;
+	cpVect gravity;
+	cpVect attractor;
+	cpFloat attractorStrength;
+	cpFloat linearDrag;
+	cpFloat angularDrag;
+	cpFloat maxVelocity;
+	cpFloat maxAngularVelocity;
+	cpBool hook;
+	cpVect acceleration;
+} pmVelocityIntegrator;
+
+cpBody *pmBodyNew(cpFloat mass, cpFloat moment);
+void pmBodyUpdateVelocity(cpBody *body, cpVect gravity, cpFloat damping, cpFloat dt);
+void pmBodySetVelocityIntegrator(cpBody *body, pmVelocityIntegrator integrator);
+int pmSpaceGetHookBodies(cpSpace *space, pmBatchedData *data, cpBody **bodies, int maxCount);
+void pmBodiesSetHookAccelerations(cpBody **bodies, int count, const cpFloat *accelerations);
 
 //
 // Functions to support pickle of arbiters the space has cached